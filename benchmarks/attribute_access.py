@@ -0,0 +1,60 @@
+"""Benchmark of attribute access of a loaded configuration, e.g. ``config.device`` read in a training loop.
+
+Compares seconds per access of:
+
+- ``plain``: attribute of a plain object (:class:`types.SimpleNamespace`),
+- ``attribute``: attribute of a loaded :class:`~py_config_runner.ConfigObject`,
+- ``item``: item of a loaded :class:`~py_config_runner.ConfigObject`,
+- ``getattr``: attribute of a loaded :class:`~py_config_runner.ConfigObject` through ``__getattr__`` (as before
+  values were copied into the instance dictionary on load).
+
+Usage:
+
+    python benchmarks/attribute_access.py --number 1000000
+"""
+
+import argparse
+import tempfile
+import timeit
+from pathlib import Path
+from types import SimpleNamespace
+
+from py_config_runner import ConfigObject
+
+CONFIG = """
+device = "cpu"
+debug = False
+"""
+
+
+def measure(stmt, obj, number, repeats):
+    times = timeit.repeat(stmt, globals={"obj": obj}, number=number, repeat=repeats)
+    return min(times) / number
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--number", type=int, default=1000000, help="Number of accesses per run")
+    parser.add_argument("--repeats", type=int, default=5, help="Number of runs")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        config_fp = Path(tmp) / "config.py"
+        config_fp.write_text(CONFIG)
+        config = ConfigObject(config_fp)
+        config.device
+
+    plain = SimpleNamespace(device="cpu", debug=False)
+    results = {
+        "plain": measure("obj.device", plain, args.number, args.repeats),
+        "attribute": measure("obj.device", config, args.number, args.repeats),
+        "item": measure("obj['device']", config, args.number, args.repeats),
+        "getattr": measure("obj.__getattr__('device')", config, args.number, args.repeats),
+    }
+    print(f"{'access':<10} {'time (ns)':>10} {'vs plain':>9}")
+    for name, value in results.items():
+        print(f"{name:<10} {value * 1e9:>10.1f} {value / results['plain']:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
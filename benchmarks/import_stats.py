@@ -0,0 +1,93 @@
+"""Benchmark of file system stat calls made by imports with local directories of a script and a configuration.
+
+Compares imports of heavy packages (e.g. torchvision) in a fresh interpreter:
+
+- ``baseline``: no local directories,
+- ``sys.path``: cwd, configuration and script directories prepended to ``sys.path`` by each of ``--runs`` calls (as
+  ``run_script`` did before :mod:`py_config_runner.importer`),
+- ``finder``: local directories resolved by :class:`~py_config_runner.importer.LocalModuleFinder`.
+
+Stat calls are counted by wrapping the stat function of the path based import machinery.
+
+Usage:
+
+    python benchmarks/import_stats.py --modules torchvision --runs 5
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+CHILD_CODE = """
+import importlib
+import json
+import sys
+import time
+from importlib import _bootstrap_external
+
+# imported in all modes, so that the same modules are imported by the benchmark
+from py_config_runner.importer import local_modules
+
+mode, modules, search_paths, runs = sys.argv[1], sys.argv[2].split(","), sys.argv[3].split(","), int(sys.argv[4])
+if mode == "sys.path":
+    for _ in range(runs):
+        for path in reversed(search_paths):
+            sys.path.insert(0, path)
+elif mode == "finder":
+    context = local_modules(search_paths)
+    context.__enter__()
+
+num_calls = 0
+_path_stat = _bootstrap_external._path_stat
+
+
+def _counting_path_stat(path):
+    global num_calls
+    num_calls += 1
+    return _path_stat(path)
+
+
+_bootstrap_external._path_stat = _counting_path_stat
+start = time.perf_counter()
+for name in modules:
+    importlib.import_module(name)
+elapsed = time.perf_counter() - start
+_bootstrap_external._path_stat = _path_stat
+print(json.dumps({"stat_calls": num_calls, "import_time": elapsed}))
+"""
+
+
+def measure(mode, modules, search_paths, runs):
+    cmd = [sys.executable, "-c", CHILD_CODE, mode, ",".join(modules), ",".join(search_paths), str(runs)]
+    output = subprocess.run(cmd, check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modules", default="torchvision", help="Comma separated modules to import")
+    parser.add_argument("--runs", type=int, default=1, help="Number of simulated run_script calls for sys.path mode")
+    parser.add_argument("--num-files", type=int, default=20, help="Number of python files in each local directory")
+    args = parser.parse_args()
+    modules = args.modules.split(",")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        search_paths = []
+        for name in ["cwd", "configs", "scripts"]:
+            path = Path(tmp) / name
+            path.mkdir()
+            for i in range(args.num_files):
+                (path / f"{name}_module_{i}.py").write_text("")
+            search_paths.append(path.as_posix())
+
+        print(f"{'mode':<10} {'stat calls':>12} {'import time (s)':>16}")
+        for mode in ["baseline", "sys.path", "finder"]:
+            result = measure(mode, modules, search_paths, args.runs)
+            print(f"{mode:<10} {result['stat_calls']:>12} {result['import_time']:>16.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Benchmark of ConfigObject pickling modes when sending a loaded configuration to spawned processes.
+
+Compares bytes sent and spawn latency (time until the child process has accessed a configuration value) of
+``pickle_mode="state"`` (all values are pickled) and ``pickle_mode="recipe"`` (configuration is rebuilt in the child).
+
+Usage:
+
+    python benchmarks/pickle_recipe.py --size 10000000 --repeats 5
+"""
+
+import argparse
+import multiprocessing as mp
+import pickle
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from py_config_runner import ConfigObject
+
+CONFIG_TEMPLATE = """
+import numpy as np
+
+seed = 12
+data = np.random.RandomState(seed).rand({size})
+cache = [np.zeros(1000) for _ in range({num_arrays})]
+"""
+
+
+def _child(config, queue):
+    queue.put((config.seed, time.perf_counter()))
+
+
+def measure(config, repeats):
+    ctx = mp.get_context("spawn")
+    latencies = []
+    for _ in range(repeats):
+        queue = ctx.Queue()
+        start = time.perf_counter()
+        p = ctx.Process(target=_child, args=(config, queue))
+        p.start()
+        _, end = queue.get()
+        p.join()
+        latencies.append(end - start)
+    return len(pickle.dumps(config)), statistics.median(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=10_000_000, help="Number of float64 values in the config")
+    parser.add_argument("--num-arrays", type=int, default=100, help="Number of small arrays in the config")
+    parser.add_argument("--repeats", type=int, default=5, help="Number of spawned processes per mode")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        config_filepath = Path(tmp) / "bench_config.py"
+        config_filepath.write_text(CONFIG_TEMPLATE.format(size=args.size, num_arrays=args.num_arrays))
+
+        print(f"{'mode':<8} {'bytes sent':>14} {'spawn latency (s)':>18}")
+        for mode in ["state", "recipe"]:
+            config = ConfigObject(config_filepath, pickle_mode=mode)
+            # configuration is loaded in the parent process as in a training script
+            assert config.seed == 12
+            num_bytes, latency = measure(config, args.repeats)
+            print(f"{mode:<8} {num_bytes:>14} {latency:>18.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""Benchmark suite of py_config_runner hot paths.
+
+Benchmarks use synthetic configuration files generated in a temporary directory:
+
+- ``load_module``: loading a configuration file as a module,
+- ``config_first_access``: creating a configuration and accessing a value (loads the configuration file),
+- ``config_repeated_access``: accessing a value of a loaded configuration,
+- ``mutations_<N>``: loading a configuration of N assignments with mutations,
+- ``get_params_schema``, ``get_params_fields``, ``schema_validate`` and ``schema_validate_cached``: checking the
+  configuration against a schema,
+- ``run_script_cold_start`` and ``import_time``: new interpreter running a script or importing py_config_runner.
+
+Results (seconds per call) are written as JSON and can be compared with a baseline, e.g. one stored from another
+commit. Regressions larger than ``--threshold`` make the command fail.
+
+Usage (from the repository root, with py_config_runner installed):
+
+    python benchmarks/suite.py --output /tmp/results.json --compare benchmarks/baseline.json
+    # update the baseline
+    python benchmarks/suite.py --output benchmarks/baseline.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from py_config_runner import ConfigObject, Schema, get_params, load_module
+from py_config_runner.cache import CACHE_DIR_ENV_VAR
+
+MUTATIONS_SIZES = [10, 100, 1000, 10000]
+
+CONFIG_TEMPLATE = """
+import math
+
+seed = 12
+debug = False
+device = "cpu"
+learning_rate = 0.01
+num_epochs = 10
+batch_size = 32
+momentum = 0.9
+"""
+
+SCRIPT_TEMPLATE = """
+def run(config, **kwargs):
+    return config.seed
+"""
+
+
+class BenchSchema(Schema):
+    seed: int
+    debug: bool
+    device: str
+    learning_rate: float
+    num_epochs: int
+    batch_size: int
+    momentum: float
+
+
+def write_config(path: Path, num_assignments: int) -> Path:
+    lines = [CONFIG_TEMPLATE]
+    lines += [f"value_{i} = {i} * 2 + seed" for i in range(num_assignments)]
+    path.write_text("\n".join(lines) + "\n")
+    return path
+
+
+def timeit(
+    fn: Callable[[Any], Any], setup: Callable[[], Any] = lambda: None, repeats: int = 7, number: int = 1
+) -> Dict[str, float]:
+    """Method to measure seconds per call of ``fn(setup())``: each of ``repeats`` runs calls the function
+    ``number`` times with a value returned by ``setup`` (not measured) and the best and median runs are reported.
+    """
+    times = []
+    for _ in range(repeats):
+        arg = setup()
+        start = time.perf_counter()
+        for _ in range(number):
+            fn(arg)
+        times.append((time.perf_counter() - start) / number)
+    return {"min": min(times), "median": statistics.median(times)}
+
+
+def timeit_subprocess(code: str, repeats: int, cwd: Optional[Path] = None) -> Dict[str, float]:
+    def _run(_: Any) -> None:
+        subprocess.run([sys.executable, "-c", code], check=True, cwd=cwd)
+
+    return timeit(_run, repeats=repeats)
+
+
+def run_benchmarks(tmp_path: Path, repeats: int) -> Dict[str, Dict[str, float]]:
+    results = {}
+    config_fp = write_config(tmp_path / "config.py", 100)
+
+    results["load_module"] = timeit(lambda _: load_module(config_fp), repeats=repeats, number=20)
+
+    results["config_first_access"] = timeit(
+        lambda config: config.seed, setup=lambda: ConfigObject(config_fp), repeats=repeats, number=1
+    )
+
+    loaded_config = ConfigObject(config_fp)
+    loaded_config.seed
+
+    def _repeated_access(config: ConfigObject) -> None:
+        for _ in range(1000):
+            config.seed
+
+    results["config_repeated_access"] = {
+        k: v / 1000 for k, v in timeit(_repeated_access, setup=lambda: loaded_config, repeats=repeats).items()
+    }
+
+    for size in MUTATIONS_SIZES:
+        fp = write_config(tmp_path / f"config_{size}.py", size)
+        mutations = {"seed": 1, "learning_rate": 0.1, f"value_{size - 1}": -1}
+        results[f"mutations_{size}"] = timeit(
+            lambda config: config.seed, setup=lambda: ConfigObject(fp, mutations=mutations), repeats=repeats
+        )
+
+    def _validate(config: ConfigObject) -> None:
+        # validated schema is cached on the configuration
+        config.__dict__["_derived_cache"].clear()
+        BenchSchema.validate(config)
+
+    fields = [(name, field.outer_type_) for name, field in BenchSchema.__fields__.items()]
+    results["get_params_schema"] = timeit(
+        lambda config: get_params(config, BenchSchema), setup=lambda: loaded_config, repeats=repeats, number=100
+    )
+    with warnings.catch_warnings():
+        # fields are checked by a deprecated helper
+        warnings.simplefilter("ignore")
+        results["get_params_fields"] = timeit(
+            lambda config: get_params(config, fields), setup=lambda: loaded_config, repeats=repeats, number=100
+        )
+    results["schema_validate"] = timeit(_validate, setup=lambda: loaded_config, repeats=repeats, number=100)
+    results["schema_validate_cached"] = timeit(
+        lambda config: BenchSchema.validate(config), setup=lambda: loaded_config, repeats=repeats, number=100
+    )
+
+    script_fp = tmp_path / "script.py"
+    script_fp.write_text(SCRIPT_TEMPLATE)
+    code = f"from py_config_runner.runner import run_script; run_script({str(script_fp)!r}, {str(config_fp)!r})"
+    results["run_script_cold_start"] = timeit_subprocess(code, repeats=repeats, cwd=tmp_path)
+    results["import_time"] = timeit_subprocess("import py_config_runner", repeats=repeats, cwd=tmp_path)
+    results["interpreter_start"] = timeit_subprocess("pass", repeats=repeats, cwd=tmp_path)
+    return results
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> bool:
+    """Method to print ratios of median times of results and baseline. Returns False if a benchmark is slower than
+    ``threshold`` times the baseline."""
+    ok = True
+    print(f"{'benchmark':<26} {'baseline (s)':>14} {'current (s)':>14} {'ratio':>8}")
+    for name, result in results["benchmarks"].items():
+        base = baseline["benchmarks"].get(name)
+        if base is None:
+            print(f"{name:<26} {'-':>14} {result['median']:>14.3e} {'-':>8}")
+            continue
+        ratio = result["median"] / base["median"]
+        flag = ""
+        if ratio > threshold:
+            flag = "  regression"
+            ok = False
+        print(f"{name:<26} {base['median']:>14.3e} {result['median']:>14.3e} {ratio:>8.2f}{flag}")
+    return ok
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", default=None, help="Output JSON file of results")
+    parser.add_argument("--compare", default=None, help="Baseline JSON file to compare results with")
+    parser.add_argument("--threshold", type=float, default=1.5, help="Maximum ratio of current and baseline times")
+    parser.add_argument("--repeats", type=int, default=7, help="Number of measured runs per benchmark")
+    args = parser.parse_args()
+
+    # benchmarks measure compilation of configuration files
+    os.environ.pop(CACHE_DIR_ENV_VAR, None)
+    with tempfile.TemporaryDirectory() as tmp:
+        benchmarks = run_benchmarks(Path(tmp), args.repeats)
+
+    commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+    results = {
+        "commit": commit or None,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "benchmarks": benchmarks,
+    }
+    if args.output is not None:
+        Path(args.output).write_text(json.dumps(results, indent=2) + "\n")
+
+    if args.compare is not None:
+        baseline = json.loads(Path(args.compare).read_text())
+        if not compare(results, baseline, args.threshold):
+            sys.exit(1)
+    else:
+        for name, result in benchmarks.items():
+            print(f"{name:<26} {result['median']:>14.3e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,16 @@
 from py_config_runner.utils import ConfigObject, load_module
 from py_config_runner.config_utils import BaseConfigSchema, get_params, has_torch, Schema
 
-if has_torch:
-    from py_config_runner.config_utils import (
-        TorchModelConfigSchema,
-        TrainConfigSchema,
-        TrainvalConfigSchema,
-        InferenceConfigSchema,
-    )
+_TORCH_SCHEMAS = ("TorchModelConfigSchema", "TrainConfigSchema", "TrainvalConfigSchema", "InferenceConfigSchema")
+
+
+def __getattr__(name):
+    # Torch schemas are resolved lazily such that `import py_config_runner` does not import torch
+    if has_torch and name in _TORCH_SCHEMAS:
+        from py_config_runner import config_utils
+
+        return getattr(config_utils, name)
+    raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
 
 
 __version__ = "0.3.2"
@@ -1,17 +1,24 @@
 from pathlib import Path
+from typing import Any, List, Optional, Tuple
 
 import click
 
 
-@click.command()
-@click.argument("script_filepath", type=click.Path(exists=True, file_okay=True, dir_okay=False))
-@click.argument("config_filepath", type=click.Path(exists=True, file_okay=True, dir_okay=False))
-def command(script_filepath: str, config_filepath: str) -> None:
-    """Method to run experiment (defined by a script file)
+class _DefaultCommandGroup(click.Group):
+    # Group running the default command if no subcommand is given: `py_config_runner script.py config.py`
+    default_command = "run"
 
-    Args:
-        script_filepath: input script filepath
-        config_filepath: input configuration filepath
+    def parse_args(self, ctx: click.Context, args: List[str]) -> List[str]:
+        if args and args[0] not in self.commands and args[0] not in ctx.help_option_names:
+            args = [self.default_command] + args
+        return super().parse_args(ctx, args)
+
+
+@click.group(cls=_DefaultCommandGroup)
+def command() -> None:
+    """Method to run experiment (defined by a script file) with a configuration file
+
+    Usage: py_config_runner script.py config.py
     """
 
     # remove path to py_config_runner.py_config_runner module from sys.path
@@ -22,9 +29,220 @@ def command(script_filepath: str, config_filepath: str) -> None:
     if this_folder_path in sys.path:
         sys.path.remove(this_folder_path)
 
+
+@command.command("run")
+@click.argument("script_filepath", type=click.Path(exists=True, file_okay=True, dir_okay=False))
+@click.argument("config_filepath", type=click.Path(exists=True, file_okay=True, dir_okay=False))
+@click.option(
+    "--server",
+    "server_socket",
+    type=click.Path(),
+    default=None,
+    envvar="PY_CONFIG_RUNNER_SERVER",
+    help="Run on the fork server listening on this Unix socket, see 'py_config_runner serve'",
+)
+@click.option(
+    "--cache-dir",
+    type=click.Path(file_okay=False),
+    default=None,
+    help="Directory of the run cache. Finished runs with unchanged script, configuration and kwargs are skipped",
+)
+@click.option(
+    "--profile-config",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help="Write time, import time and memory delta of each top-level statement of the configuration to this JSON file",
+)
+@click.option(
+    "--watch",
+    is_flag=True,
+    default=False,
+    help="Run again on each modification of the configuration or the script, re-executing only modified statements "
+    "of the configuration and their dependants",
+)
+@click.option(
+    "--prefetch-config",
+    is_flag=True,
+    default=False,
+    help="Execute the configuration in a background thread while the script is imported",
+)
+def run_command(
+    script_filepath: str,
+    config_filepath: str,
+    server_socket: Optional[str],
+    cache_dir: Optional[str],
+    profile_config: Optional[str],
+    watch: bool,
+    prefetch_config: bool,
+) -> None:
+    """Method to run experiment (defined by a script file)
+
+    Args:
+        script_filepath: input script filepath
+        config_filepath: input configuration filepath
+        server_socket: optional path to fork server Unix socket
+        cache_dir: optional run cache directory
+        profile_config: optional path to configuration profile JSON file
+        watch: if True, run again on each modification of the configuration or the script
+        prefetch_config: if True, execute the configuration in a background thread while the script is imported
+    """
+    if server_socket is not None:
+        if cache_dir is not None or profile_config is not None or watch or prefetch_config:
+            raise click.UsageError(
+                "Option --server can not be used with --cache-dir, --profile-config, --watch or --prefetch-config"
+            )
+        from py_config_runner.server import run_on_server
+
+        returncode = run_on_server(server_socket, script_filepath, config_filepath)
+        if returncode != 0:
+            raise SystemExit(returncode)
+        return
+
+    if watch:
+        if cache_dir is not None or profile_config is not None or prefetch_config:
+            raise click.UsageError(
+                "Option --watch can not be used with --cache-dir, --profile-config or --prefetch-config"
+            )
+        from py_config_runner.watch import watch as watch_fn
+
+        try:
+            watch_fn(script_filepath, config_filepath)
+        except KeyboardInterrupt:
+            pass
+        return
+
     from py_config_runner.runner import run_script
 
-    run_script(script_filepath, config_filepath)
+    if prefetch_config and profile_config is not None:
+        raise click.UsageError("Option --prefetch-config can not be used with --profile-config")
+
+    output = run_script(
+        script_filepath,
+        config_filepath,
+        cache=cache_dir,
+        profile_config=profile_config,
+        prefetch_config=prefetch_config,
+    )
+    if cache_dir is not None and output.cached:
+        click.echo(f"Run {output.key} has already finished, skipped", err=True)
+
+
+@command.command("serve")
+@click.option("--socket", "socket_path", type=click.Path(), required=True, help="Unix socket to listen on")
+@click.option("--preload", multiple=True, help="Module to import on start-up, e.g. torch")
+def serve_command(socket_path: str, preload: Tuple[str, ...]) -> None:
+    """Method to start a fork server running experiments without paying interpreter start-up and imports
+
+    Example: py_config_runner serve --socket /tmp/pcr.sock --preload torch
+    """
+    from py_config_runner.server import serve
+
+    serve(socket_path, preload=preload)
+
+
+@command.command("sweep")
+@click.argument("script_filepath", type=click.Path(exists=True, file_okay=True, dir_okay=False))
+@click.argument("config_filepath", type=click.Path(exists=True, file_okay=True, dir_okay=False))
+@click.option(
+    "-p",
+    "--param",
+    "params",
+    multiple=True,
+    required=True,
+    help="Parameter to sweep: KEY=V1,V2,..., KEY=LOW:HIGH, KEY=log:LOW:HIGH or KEY=int:LOW:HIGH",
+)
+@click.option("--mode", type=click.Choice(["grid", "random", "sobol"]), default="grid", show_default=True)
+@click.option("-n", "--num-samples", type=int, default=10, show_default=True, help="Number of random/sobol points")
+@click.option("--seed", type=int, default=None, help="Seed of random/sobol sampling")
+@click.option("-j", "--jobs", type=int, default=1, show_default=True, help="Number of parallel workers")
+@click.option("--executor", type=click.Choice(["process", "thread"]), default="process", show_default=True)
+@click.option("-o", "--output-dir", type=click.Path(file_okay=False), default=None, help="Output directory of the runs")
+@click.option(
+    "--cache-dir",
+    type=click.Path(file_okay=False),
+    default=None,
+    help="Directory of the run cache. Finished runs with unchanged script, configuration and kwargs are skipped",
+)
+def sweep_command(
+    script_filepath: str,
+    config_filepath: str,
+    params: Tuple[str, ...],
+    mode: str,
+    num_samples: int,
+    seed: Optional[int],
+    jobs: int,
+    executor: str,
+    output_dir: Optional[str],
+    cache_dir: Optional[str],
+) -> None:
+    """Method to run experiment (defined by a script file) over a sweep of configuration parameters
+
+    Example: py_config_runner sweep training.py config.py -p learning_rate=0.1,0.01 -p batch_size=32,64 -j 4
+    """
+    from py_config_runner.sweep import grid_points, parse_param_spec, random_points, run_sweep, sobol_points
+
+    try:
+        space = dict(parse_param_spec(p) for p in params)
+        points: List[Any]
+        if mode == "grid":
+            points = grid_points(space)
+        elif mode == "random":
+            points = random_points(space, num_samples, seed=seed)
+        else:
+            points = sobol_points(space, num_samples, seed=seed)
+    except (ValueError, TypeError, RuntimeError) as e:
+        raise click.BadParameter(str(e), param_hint="--param")
+
+    records = run_sweep(
+        script_filepath, config_filepath, points, jobs=jobs, executor=executor, output_dir=output_dir, cache=cache_dir
+    )
+
+    num_failed = 0
+    for record in records:
+        click.echo(f"run {record['index']}: {record['status']} {record['params']}")
+        if record["error"] is not None:
+            num_failed += 1
+            click.echo(record["error"], err=True)
+    click.echo(f"{len(records)} runs, {num_failed} failed")
+    if num_failed > 0:
+        raise SystemExit(1)
+
+
+@command.command("index")
+@click.argument("directory", type=click.Path(exists=True, file_okay=False, dir_okay=True))
+@click.option(
+    "-q",
+    "--query",
+    "conditions",
+    multiple=True,
+    help="Condition to match: KEY OP VALUE with OP one of ==, !=, >=, <=, >, < (e.g. 'learning_rate>=0.1') or text "
+    "to search in assignments and imports (e.g. resnet)",
+)
+@click.option(
+    "--index-file",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help="Index database file. Default, DIRECTORY/.py_config_runner_index.sqlite",
+)
+def index_command(directory: str, conditions: Tuple[str, ...], index_file: Optional[str]) -> None:
+    """Method to index configuration files of a directory without executing them and to query the index
+
+    Example: py_config_runner index configs -q "learning_rate>=0.1" -q resnet
+    """
+    from py_config_runner.index import DEFAULT_INDEX_FILENAME, ConfigIndex
+
+    index_path = Path(directory) / DEFAULT_INDEX_FILENAME if index_file is None else Path(index_file)
+    index = ConfigIndex(index_path)
+    counts = index.update(directory)
+    click.echo(", ".join(f"{v} {k}" for k, v in counts.items()) + " files", err=True)
+    if not conditions:
+        return
+    try:
+        paths = index.query(*conditions)
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint="--query")
+    for path in paths:
+        click.echo(path)
 
 
 def print_script_filepath() -> None:
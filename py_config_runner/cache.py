@@ -0,0 +1,404 @@
+import hashlib
+import importlib.util
+import json
+import marshal
+import os
+import pickle
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import warnings
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from types import CodeType, ModuleType
+from typing import Any, ContextManager, Dict, Iterator, List, Optional, Tuple, Union
+
+from py_config_runner.memory import retained_size
+
+CACHE_DIR_ENV_VAR = "PY_CONFIG_RUNNER_CACHE_DIR"
+CACHE_MAX_SIZE_ENV_VAR = "PY_CONFIG_RUNNER_CACHE_MAX_SIZE"
+CACHE_VALIDATION_ENV_VAR = "PY_CONFIG_RUNNER_CACHE_VALIDATION"
+DEFAULT_MAX_SIZE = 128 * 1024 * 1024
+
+
+class CodeCache:
+    """Content-addressed on-disk cache of compiled code objects.
+
+    Entries are marshalled code objects stored as ``<cache_dir>/code/<key>.bin``. Keys are computed with
+    :meth:`make_key` from the source code, any additional parts (e.g. applied mutations) and the Python bytecode
+    version. When the total size of entries exceeds ``max_size``, least recently used entries are removed.
+
+    Code of python files is cached with :meth:`compile_file`. Similarly to ``.pyc`` files, entries of files are
+    validated either by the modification time and the size of the file (``validation="timestamp"``, the source is not
+    read if the entry is found) or by the hash of the source (``validation="hash"``).
+
+    Args:
+        cache_dir: path to the cache directory. It is created if it does not exist.
+        max_size: maximum total size in bytes of cached entries.
+        validation: validation of entries of python files, "timestamp" or "hash".
+
+    Example:
+
+    .. code-block:: python
+
+        cache = CodeCache("/tmp/cache")
+        key = cache.make_key(source)
+        code = cache.get(key)
+        if code is None:
+            code = compile(source, "<string>", "exec")
+            cache.put(key, code)
+
+    """
+
+    def __init__(
+        self, cache_dir: Union[str, Path], max_size: int = DEFAULT_MAX_SIZE, validation: str = "timestamp"
+    ) -> None:
+        if validation not in ("timestamp", "hash"):
+            raise ValueError(f"Argument validation should be 'timestamp' or 'hash', but given '{validation}'")
+        self.cache_dir = Path(cache_dir)
+        self.max_size = max_size
+        self.validation = validation
+        self._code_dir = self.cache_dir / "code"
+
+    @staticmethod
+    def make_key(source: bytes, *parts: str) -> str:
+        """Method to compute cache key from the source code and additional parts.
+
+        Args:
+            source: source code
+            parts: additional strings defining the compiled code, e.g. applied mutations
+
+        Returns:
+            hexadecimal digest
+        """
+        h = hashlib.sha256(importlib.util.MAGIC_NUMBER)
+        h.update(source)
+        for part in parts:
+            h.update(b"\0")
+            h.update(part.encode("utf-8"))
+        return h.hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self._code_dir / f"{key}.bin"
+
+    def get(self, key: str) -> Optional[CodeType]:
+        """Method to get cached code object by key. Returns None if the entry is missing or corrupted."""
+        path = self._entry_path(key)
+        try:
+            data = path.read_bytes()
+        except OSError:
+            return None
+        try:
+            code = marshal.loads(data)
+        except (EOFError, ValueError, TypeError):
+            code = None
+        if not isinstance(code, CodeType):
+            self._remove(path)
+            return None
+        try:
+            # mark entry as recently used
+            os.utime(path)
+        except OSError:
+            pass
+        return code
+
+    def put(self, key: str, code: CodeType) -> None:
+        """Method to store code object by key. Errors on writing the entry are silently ignored."""
+        data = marshal.dumps(code)
+        try:
+            self._code_dir.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self._code_dir, suffix=".tmp")
+            with os.fdopen(fd, "wb") as h:
+                h.write(data)
+            os.replace(tmp_path, self._entry_path(key))
+        except OSError:
+            return
+        self.evict()
+
+    def compile_file(self, filepath: Union[str, Path]) -> CodeType:
+        """Method to get the code object of a python file, compiled from the source if it is not cached.
+
+        Args:
+            filepath: path to python file
+
+        Returns:
+            code object with the file path as filename
+        """
+        path = Path(os.path.abspath(filepath)).as_posix()
+        source = None
+        if self.validation == "timestamp":
+            stat = os.stat(path)
+            key = self.make_key(b"", "timestamp", path, str(stat.st_mtime_ns), str(stat.st_size))
+        else:
+            with open(path, "rb") as h:
+                source = h.read()
+            key = self.make_key(source, "hash", path)
+
+        code = self.get(key)
+        if code is None:
+            if source is None:
+                with open(path, "rb") as h:
+                    source = h.read()
+            code = compile(source, path, "exec", dont_inherit=True)
+            self.put(key, code)
+        return code
+
+    def evict(self) -> None:
+        """Method to remove least recently used entries until the total size is below ``max_size``."""
+        entries = []
+        total_size = 0
+        for path in self._code_dir.glob("*.bin"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total_size += stat.st_size
+
+        entries.sort(key=lambda e: e[0])
+        for _, size, path in entries:
+            if total_size <= self.max_size:
+                break
+            self._remove(path)
+            total_size -= size
+
+    def clear(self) -> None:
+        """Method to remove all cached entries."""
+        for path in self._code_dir.glob("*.bin"):
+            self._remove(path)
+
+    @staticmethod
+    def _remove(path: Path) -> None:
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+
+def get_code_cache() -> Optional[CodeCache]:
+    """Method to get code cache configured by environment variables.
+
+    Cache is enabled if ``PY_CONFIG_RUNNER_CACHE_DIR`` is set to a directory path. Maximum cache size in bytes
+    can be set with ``PY_CONFIG_RUNNER_CACHE_MAX_SIZE`` (default, 128 MiB) and validation of cached python files
+    with ``PY_CONFIG_RUNNER_CACHE_VALIDATION``, "timestamp" (default) or "hash".
+
+    Returns:
+        code cache or None if the cache is disabled
+    """
+    cache_dir = os.environ.get(CACHE_DIR_ENV_VAR, "")
+    if not cache_dir:
+        return None
+    max_size = int(os.environ.get(CACHE_MAX_SIZE_ENV_VAR, DEFAULT_MAX_SIZE))
+    validation = os.environ.get(CACHE_VALIDATION_ENV_VAR, "") or "timestamp"
+    return CodeCache(cache_dir, max_size=max_size, validation=validation)
+
+
+class ModuleCache:
+    """In-memory LRU cache of loaded modules, see :meth:`~py_config_runner.utils.load_module`.
+
+    Entries are keyed by the resolved file path, its modification time and size, so that modified files are loaded
+    again. Size of an entry is estimated as the memory retained by module values (see
+    :meth:`~py_config_runner.memory.retained_size`). When the total size of entries exceeds ``max_size``, least
+    recently used entries are removed and modules are released if they are not referenced elsewhere. Removed modules
+    and modules larger than ``max_size`` are unregistered from ``sys.modules`` (see ``register`` argument of
+    :meth:`~py_config_runner.utils.load_module`).
+
+    Args:
+        max_size: maximum total size in bytes of cached modules.
+
+    Example:
+
+    .. code-block:: python
+
+        cache = ModuleCache(max_size=2 * 1024 ** 3)
+        module = load_module("configs/baseline.py", cache=cache)
+        # module is not executed again
+        assert load_module("configs/baseline.py", cache=cache) is module
+
+    """
+
+    def __init__(self, max_size: int = DEFAULT_MAX_SIZE) -> None:
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, Tuple[Tuple[int, int], ModuleType, int]]" = OrderedDict()
+        self._total_size = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(filepath: Union[str, Path]) -> Tuple[str, Tuple[int, int]]:
+        path = Path(filepath).resolve()
+        stat = path.stat()
+        return path.as_posix(), (stat.st_mtime_ns, stat.st_size)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size(self) -> int:
+        """Total estimated size in bytes of cached modules"""
+        return self._total_size
+
+    def get(self, filepath: Union[str, Path]) -> Optional[ModuleType]:
+        """Method to get cached module loaded from a file. Returns None if the module is missing or the file was
+        modified.
+        """
+        path, stat = self._key(filepath)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None or entry[0] != stat:
+                return None
+            self._entries.move_to_end(path)
+            return entry[1]
+
+    def put(self, filepath: Union[str, Path], module: ModuleType) -> None:
+        """Method to store module loaded from a file. Module larger than ``max_size`` is not stored."""
+        path, stat = self._key(filepath)
+        size = retained_size({k: v for k, v in module.__dict__.items() if not k.startswith("__")})
+        with self._lock:
+            self._pop(path)
+            if size > self.max_size:
+                _unregister_module(module)
+                return
+            self._entries[path] = (stat, module, size)
+            self._total_size += size
+            while self._total_size > self.max_size:
+                self._pop(next(iter(self._entries)))
+
+    def _pop(self, path: str) -> None:
+        entry = self._entries.pop(path, None)
+        if entry is not None:
+            self._total_size -= entry[2]
+            _unregister_module(entry[1])
+
+    def clear(self) -> None:
+        """Method to remove all cached modules."""
+        with self._lock:
+            for path in list(self._entries):
+                self._pop(path)
+
+
+def _unregister_module(module: ModuleType) -> None:
+    if sys.modules.get(module.__name__) is module:
+        del sys.modules[module.__name__]
+
+
+@contextmanager
+def _sqlite_connection(db_path: Path) -> Iterator[sqlite3.Connection]:
+    # Connection to a database written concurrently, e.g. by runs of a sweep. Transaction is committed or rolled
+    # back, then the connection is closed
+    conn = sqlite3.connect(db_path.as_posix(), timeout=60)
+    try:
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+class RunRecord:
+    """Record of a finished run.
+
+    Args:
+        key: run key, see :meth:`~py_config_runner.runner.run_script`
+        result: value returned by the run
+        manifest: artifacts of the run, a dictionary with keys "root" (directory path or None) and "files"
+            (list of dictionaries with keys "path", relative to the root, and "size")
+        cached: True if the run was skipped and the record is retrieved from the cache
+    """
+
+    def __init__(self, key: str, result: Any, manifest: Dict[str, Any], cached: bool = False) -> None:
+        self.key = key
+        self.result = result
+        self.manifest = manifest
+        self.cached = cached
+
+    def __repr__(self) -> str:
+        return f"RunRecord(key={self.key}, result={self.result!r}, cached={self.cached})"
+
+
+class RunCache:
+    """Index of finished runs stored in a SQLite database ``<cache_dir>/runs.sqlite``.
+
+    Args:
+        cache_dir: path to the cache directory. It is created if it does not exist.
+    """
+
+    def __init__(self, cache_dir: Union[str, Path]) -> None:
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.db_path = self.cache_dir / "runs.sqlite"
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS runs "
+                "(key TEXT PRIMARY KEY, created REAL, result BLOB, manifest TEXT, description TEXT)"
+            )
+
+    def _connect(self) -> ContextManager[sqlite3.Connection]:
+        return _sqlite_connection(self.db_path)
+
+    @staticmethod
+    def make_manifest(artifacts_dir: Optional[Union[str, Path]]) -> Dict[str, Any]:
+        """Method to list files of a run output directory."""
+        if artifacts_dir is None or not Path(artifacts_dir).is_dir():
+            return {"root": None, "files": []}
+        root = Path(artifacts_dir).resolve()
+        files = [
+            {"path": p.relative_to(root).as_posix(), "size": p.stat().st_size}
+            for p in sorted(root.rglob("*"))
+            if p.is_file()
+        ]
+        return {"root": root.as_posix(), "files": files}
+
+    def get(self, key: str) -> Optional[RunRecord]:
+        """Method to get the record of a finished run. Returns None if the run is not found or if one of its
+        artifacts is missing.
+        """
+        with self._connect() as conn:
+            row = conn.execute("SELECT result, manifest FROM runs WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        manifest = json.loads(row[1])
+        if manifest["root"] is not None:
+            root = Path(manifest["root"])
+            if not all((root / f["path"]).is_file() for f in manifest["files"]):
+                return None
+        result = None if row[0] is None else pickle.loads(row[0])
+        return RunRecord(key, result, manifest, cached=True)
+
+    def put(
+        self, key: str, result: Any, artifacts_dir: Optional[Union[str, Path]] = None, description: str = ""
+    ) -> RunRecord:
+        """Method to record a finished run. If the result can not be pickled, None is recorded instead.
+
+        Args:
+            key: run key
+            result: value returned by the run
+            artifacts_dir: optional run output directory to list in the manifest
+            description: optional description, e.g. script and configuration paths
+
+        Returns:
+            run record
+        """
+        try:
+            result_blob: Optional[bytes] = pickle.dumps(result)
+        except Exception as e:
+            warnings.warn(f"Run result can not be pickled and is recorded as None: {e}")
+            result_blob = None
+        manifest = self.make_manifest(artifacts_dir)
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO runs (key, created, result, manifest, description) VALUES (?, ?, ?, ?, ?)",
+                (key, time.time(), result_blob, json.dumps(manifest), description),
+            )
+        return RunRecord(key, result, manifest)
+
+    def keys(self) -> List[str]:
+        """Method to get keys of recorded runs."""
+        with self._connect() as conn:
+            return [row[0] for row in conn.execute("SELECT key FROM runs ORDER BY created")]
+
+    def remove(self, key: str) -> None:
+        """Method to remove the record of a run."""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM runs WHERE key = ?", (key,))
@@ -1,19 +1,17 @@
+import importlib.util
 from numbers import Number
 from collections.abc import Iterable
-from typing import Any, Union, Optional, Sequence, Type, Dict
+from typing import Any, List, Union, Optional, Sequence, Type, Dict
 from pydantic import BaseModel
 
-try:
-    import torch
-    from torch.utils.data import DataLoader
-
-    has_torch = True
-except ImportError:
-    has_torch = False
+# torch is imported only when one of the torch schemas is requested, see ``__getattr__`` below
+has_torch = importlib.util.find_spec("torch") is not None
 
 from py_config_runner.utils import ConfigObject
 from py_config_runner.deprecated import assert_config, BASE_CONFIG, get_params as deprecated_get_params
 
+_missing = object()
+
 
 class Schema(BaseModel):
     """Base class for all custom configuration schemas
@@ -51,7 +49,33 @@ class Schema(BaseModel):
 
     @classmethod
     def validate(cls, config: ConfigObject) -> "Schema":
-        return cls(**config)
+        """Method to validate the configuration against the schema.
+
+        Only the fields declared by the schema are read from the configuration. Validated schema is cached on the
+        configuration object and validated again only when one of the schema fields is set or deleted.
+
+        Args:
+            config: configuration object
+
+        Returns:
+            validated schema instance
+        """
+        if isinstance(config, ConfigObject):
+            result = config._get_derived(("validate", cls))
+            if result is not None:
+                return result
+
+        aliases = [field.alias for field in cls.__fields__.values()]
+        values = {}
+        for alias in aliases:
+            value = config.get(alias, _missing)
+            if value is not _missing:
+                values[alias] = value
+        result = cls(**values)
+
+        if isinstance(config, ConfigObject):
+            config._set_derived(("validate", cls), aliases, result)
+        return result
 
 
 class BaseConfigSchema(Schema):
@@ -67,8 +91,13 @@ class BaseConfigSchema(Schema):
     debug: bool = False
 
 
-if has_torch:
-    from py_config_runner.deprecated import TORCH_DL_BASE_CONFIG, TRAIN_CONFIG, TRAINVAL_CONFIG, INFERENCE_CONFIG
+_TORCH_SCHEMAS = ("TorchModelConfigSchema", "TrainConfigSchema", "TrainvalConfigSchema", "InferenceConfigSchema")
+_DEPRECATED_TORCH_CONFIGS = ("TORCH_DL_BASE_CONFIG", "TRAIN_CONFIG", "TRAINVAL_CONFIG", "INFERENCE_CONFIG")
+
+
+def _build_torch_schemas() -> Dict[str, Any]:
+    import torch
+    from torch.utils.data import DataLoader
 
     class TorchModelConfigSchema(BaseConfigSchema):
         """Base configuration schema with a PyTorch model. Derived from
@@ -133,6 +162,35 @@ if has_torch:
         data_loader: Union[DataLoader, Iterable]
         weights_path: str
 
+    schemas = {
+        "TorchModelConfigSchema": TorchModelConfigSchema,
+        "TrainConfigSchema": TrainConfigSchema,
+        "TrainvalConfigSchema": TrainvalConfigSchema,
+        "InferenceConfigSchema": InferenceConfigSchema,
+    }
+    for name, schema in schemas.items():
+        schema.__qualname__ = name
+    return schemas
+
+
+def __getattr__(name: str) -> Any:
+    # Torch schemas are created on first access to avoid importing torch with py_config_runner
+    if has_torch and name in _TORCH_SCHEMAS:
+        globals().update(_build_torch_schemas())
+        return globals()[name]
+    if has_torch and name in _DEPRECATED_TORCH_CONFIGS:
+        from py_config_runner import deprecated
+
+        return getattr(deprecated, name)
+    raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+
+
+def __dir__() -> List[str]:
+    names = list(globals())
+    if has_torch:
+        names += _TORCH_SCHEMAS + _DEPRECATED_TORCH_CONFIGS
+    return sorted(set(names))
+
 
 def get_params(config: ConfigObject, required_fields: Union[Type[Schema], Sequence]) -> Dict:
     """Method to convert configuration into a dictionary matching `required_fields`.
@@ -146,6 +204,9 @@ def get_params(config: ConfigObject, required_fields: Union[Type[Schema], Sequen
     Returns:
         a dictionary
 
+    For a Schema class, the result is cached on the configuration object and recomputed when one of the schema fields
+    is set or deleted.
+
     Example:
 
     .. code-block:: python
@@ -183,9 +244,16 @@ def get_params(config: ConfigObject, required_fields: Union[Type[Schema], Sequen
     if not (isinstance(required_fields, type) and issubclass(required_fields, Schema)):
         raise ValueError("Argument required_fields should be a class (not instance) derived from Schema")
 
+    if isinstance(config, ConfigObject):
+        params = config._get_derived(("get_params", required_fields))
+        if params is not None:
+            return dict(params)
+
     result = required_fields.validate(config)
     params = {}
-    for k, v in result.dict().items():
+    # Read validated fields as is: `result.dict()` would copy nested values only to get their length or type name
+    for k in result.__fields__:
+        v = getattr(result, k)
         if isinstance(v, (Number, str, bool)):
             params[k] = v
         elif hasattr(v, "__len__"):
@@ -195,4 +263,6 @@ def get_params(config: ConfigObject, required_fields: Union[Type[Schema], Sequen
         elif hasattr(v, "__class__"):
             params[k] = v.__class__.__name__
 
-    return params
+    if isinstance(config, ConfigObject):
+        config._set_derived(("get_params", required_fields), required_fields.__fields__, params)
+    return dict(params)
@@ -1,15 +1,10 @@
+import importlib.util
 import logging
 import warnings
 from collections.abc import Iterable, Sequence
 from numbers import Integral, Number
 
-try:
-    import torch
-    from torch.utils.data import DataLoader
-
-    has_torch = True
-except ImportError:
-    has_torch = False
+has_torch = importlib.util.find_spec("torch") is not None
 
 
 LOGGING_FORMATTER = logging.Formatter("%(asctime)s|%(name)s|%(levelname)s| %(message)s")
@@ -134,7 +129,13 @@ BASE_CONFIG = (
 )
 
 
-if has_torch:
+_TORCH_CONFIGS = ("TORCH_DL_BASE_CONFIG", "TRAIN_CONFIG", "TRAINVAL_CONFIG", "INFERENCE_CONFIG")
+
+
+def _build_torch_configs():
+    import torch
+    from torch.utils.data import DataLoader
+
     TORCH_DL_BASE_CONFIG = BASE_CONFIG + (
         ("device", str),
         ("model", torch.nn.Module),
@@ -158,3 +159,18 @@ if has_torch:
         ("weights", str),
         ("training_run_uuid", str),
     )
+
+    return {
+        "TORCH_DL_BASE_CONFIG": TORCH_DL_BASE_CONFIG,
+        "TRAIN_CONFIG": TRAIN_CONFIG,
+        "TRAINVAL_CONFIG": TRAINVAL_CONFIG,
+        "INFERENCE_CONFIG": INFERENCE_CONFIG,
+    }
+
+
+def __getattr__(name):
+    # torch is imported on first access to a torch-based config
+    if has_torch and name in _TORCH_CONFIGS:
+        globals().update(_build_torch_configs())
+        return globals()[name]
+    raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
@@ -0,0 +1,576 @@
+import __future__
+import ast
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Mapping, Optional, Set
+
+if TYPE_CHECKING:
+    from py_config_runner.profiler import StatementProfiler
+
+# Names whose usage makes static analysis of the configuration unreliable
+_UNSAFE_NAMES = {"exec", "eval", "globals", "locals", "vars", "__import__"}
+
+
+class _NameCollector(ast.NodeVisitor):
+    # Collects names bound, read and mutated by a top-level statement.
+    # Names read inside function and lambda bodies are read at call time and are collected as deferred uses.
+
+    def __init__(self) -> None:
+        # ordered set of names
+        self.defines: Dict[str, None] = {}
+        self.uses: Set[str] = set()
+        self.deferred_uses: Set[str] = set()
+        self.has_side_effects = False
+        self.defines_unknown = False
+        self.is_unsafe = False
+        self._deferred_depth = 0
+        self._local_depth = 0
+
+    @property
+    def _is_module_scope(self) -> bool:
+        return self._deferred_depth == 0 and self._local_depth == 0
+
+    def _use(self, name: str) -> None:
+        if self._deferred_depth > 0:
+            self.deferred_uses.add(name)
+        else:
+            self.uses.add(name)
+
+    def _define(self, name: str) -> None:
+        if self._is_module_scope:
+            self.defines[name] = None
+
+    def visit_Name(self, node: ast.Name) -> None:
+        if isinstance(node.ctx, ast.Load):
+            self._use(node.id)
+            if node.id in _UNSAFE_NAMES:
+                self.is_unsafe = True
+                self.defines_unknown = True
+        else:
+            self._define(node.id)
+
+    def _visit_mutated_target(self, node: Any) -> None:
+        # x.a = 1, x[0] = 1 or del x.a mutate the object bound to x
+        if not isinstance(node.ctx, ast.Load):
+            base = node.value
+            while isinstance(base, (ast.Attribute, ast.Subscript)):
+                base = base.value
+            if isinstance(base, ast.Name):
+                self._define(base.id)
+        self.generic_visit(node)
+
+    def visit_Attribute(self, node: ast.Attribute) -> None:
+        self._visit_mutated_target(node)
+
+    def visit_Subscript(self, node: ast.Subscript) -> None:
+        self._visit_mutated_target(node)
+
+    def visit_AugAssign(self, node: ast.AugAssign) -> None:
+        if isinstance(node.target, ast.Name):
+            self._use(node.target.id)
+        self.generic_visit(node)
+
+    def visit_Import(self, node: ast.Import) -> None:
+        for alias in node.names:
+            self._define(alias.asname or alias.name.split(".")[0])
+
+    def visit_ImportFrom(self, node: ast.ImportFrom) -> None:
+        for alias in node.names:
+            if alias.name == "*":
+                # unknown names are defined
+                self.has_side_effects = True
+                self.defines_unknown = True
+            else:
+                self._define(alias.asname or alias.name)
+
+    def _visit_function(self, node: Any) -> None:
+        self._define(node.name)
+        for decorator in node.decorator_list:
+            self.visit(decorator)
+        self.visit(node.args)
+        if node.returns is not None:
+            self.visit(node.returns)
+        self._deferred_depth += 1
+        for stmt in node.body:
+            self.visit(stmt)
+        self._deferred_depth -= 1
+
+    def visit_FunctionDef(self, node: ast.FunctionDef) -> None:
+        self._visit_function(node)
+
+    def visit_AsyncFunctionDef(self, node: ast.AsyncFunctionDef) -> None:
+        self._visit_function(node)
+
+    def visit_arguments(self, node: ast.arguments) -> None:
+        # only default values and annotations are evaluated at definition time
+        for default in node.defaults + [d for d in node.kw_defaults if d is not None]:
+            self.visit(default)
+        for arg in getattr(node, "posonlyargs", []) + node.args + node.kwonlyargs + [node.vararg, node.kwarg]:
+            if arg is not None and arg.annotation is not None:
+                self.visit(arg.annotation)
+
+    def visit_Lambda(self, node: ast.Lambda) -> None:
+        self.visit(node.args)
+        self._deferred_depth += 1
+        self.visit(node.body)
+        self._deferred_depth -= 1
+
+    def visit_ClassDef(self, node: ast.ClassDef) -> None:
+        self._define(node.name)
+        self._local_depth += 1
+        self.generic_visit(node)
+        self._local_depth -= 1
+
+    def _visit_comprehension(self, node: Any) -> None:
+        self._local_depth += 1
+        self.generic_visit(node)
+        self._local_depth -= 1
+
+    visit_ListComp = _visit_comprehension
+    visit_SetComp = _visit_comprehension
+    visit_DictComp = _visit_comprehension
+    visit_GeneratorExp = _visit_comprehension
+
+    def visit_ExceptHandler(self, node: ast.ExceptHandler) -> None:
+        if node.name:
+            self._define(node.name)
+        self.generic_visit(node)
+
+    def visit_Expr(self, node: ast.Expr) -> None:
+        # Expression statements (e.g. function calls) are executed for their side effects
+        if self._deferred_depth == 0 and not isinstance(node.value, ast.Constant):
+            self.has_side_effects = True
+        self.generic_visit(node)
+
+    def visit_Global(self, node: ast.Global) -> None:
+        self.is_unsafe = True
+
+    def visit_Nonlocal(self, node: ast.Nonlocal) -> None:
+        self.is_unsafe = True
+
+
+def _future_flags(module: ast.Module) -> int:
+    # Compiler flags of `from __future__ import ...` statements: statements compiled separately behave as in the module
+    flags = 0
+    for node in module.body:
+        if isinstance(node, ast.ImportFrom) and node.module == "__future__":
+            for alias in node.names:
+                feature = getattr(__future__, alias.name, None)
+                if feature is not None:
+                    flags |= feature.compiler_flag
+    return flags
+
+
+class Statement:
+    """Top-level statement of a configuration module.
+
+    Args:
+        index: index of the statement in the module body
+        node: statement AST node
+        filename: filename used to compile the statement
+        flags: compiler flags of ``__future__`` imports of the module
+    """
+
+    def __init__(self, index: int, node: ast.stmt, filename: str = "<string>", flags: int = 0) -> None:
+        self.index = index
+        self.node = node
+        self.filename = filename
+        self.flags = flags
+        collector = _NameCollector()
+        collector.visit(node)
+        self.defined_names = list(collector.defines)
+        self.defines = set(self.defined_names)
+        self.uses = collector.uses
+        self.deferred_uses = collector.deferred_uses
+        self.is_barrier = collector.has_side_effects
+        self.defines_unknown = collector.defines_unknown
+        self.is_unsafe = collector.is_unsafe
+        self._code: Any = None
+
+    @property
+    def lineno(self) -> int:
+        return self.node.lineno
+
+    @property
+    def code(self) -> Any:
+        """Compiled statement"""
+        if self._code is None:
+            module = ast.Module(body=[self.node], type_ignores=[])
+            self._code = compile(module, self.filename, "exec", flags=self.flags, dont_inherit=True)
+        return self._code
+
+    def __repr__(self) -> str:
+        return f"Statement(index={self.index}, lineno={self.lineno}, defines={sorted(self.defines)})"
+
+
+class StatementGraph:
+    """Dependency graph between top-level statements of a configuration module.
+
+    A statement depends on earlier statements that bind names it reads (including names read by the functions it
+    may call), bind or mutate names it binds and read names it rebinds. Statements with side effects like expression
+    statements (e.g. ``torch.manual_seed(seed)``) or star imports are barriers: they are executed after all previous
+    statements and before all following statements. These ordering dependencies are kept apart from data
+    dependencies (:attr:`data_dependencies`), so that a change propagates to a barrier only through the names it
+    reads. As they may modify objects in place (e.g. ``items.append(3)``), barriers rebind names bound by previous
+    statements that they read. Statements reading a name rebound by a barrier depend on previous statements reading
+    it, e.g. statements drawing random numbers after ``random.seed(0)`` keep their order. If the module uses
+    ``global``, ``exec``, ``eval`` and similar, all statements are executed sequentially.
+
+    Args:
+        module: parsed configuration module
+        filename: filename used to compile statements
+
+    Example:
+
+    .. code-block:: python
+
+        graph = StatementGraph(ast.parse(source))
+        # indices of statements to execute in order to compute `seed`
+        print(graph.slice(["seed"]))
+
+    """
+
+    def __init__(self, module: ast.Module, filename: str = "<string>") -> None:
+        self.filename = filename
+        flags = _future_flags(module)
+        self.statements = [Statement(i, node, filename, flags) for i, node in enumerate(module.body)]
+        self.is_sliceable = not any(s.is_unsafe for s in self.statements)
+        self.defines_unknown = any(s.defines_unknown for s in self.statements)
+        self.dependencies: List[Set[int]] = []
+        self.data_dependencies: List[Set[int]] = []
+        self._last_producers: Dict[str, int] = {}
+        self._slices: Dict[str, Optional[List[int]]] = {}
+        self._dependants: Optional[List[Set[int]]] = None
+        self._data_dependants: Optional[List[Set[int]]] = None
+        self._build()
+
+    def __len__(self) -> int:
+        return len(self.statements)
+
+    def _resolve_reads(self, names: Iterable[str]) -> Set[str]:
+        # add names read by functions defined so far which may be called by the statement
+        reads = set(names)
+        stack = list(reads)
+        while stack:
+            producer = self._last_producers.get(stack.pop())
+            if producer is None:
+                continue
+            for name in self.statements[producer].deferred_uses:
+                if name not in reads:
+                    reads.add(name)
+                    stack.append(name)
+        return reads
+
+    def _build(self) -> None:
+        readers: Dict[str, List[int]] = {}
+        last_barrier = None
+        since_barrier: List[int] = []
+        for stmt in self.statements:
+            i = stmt.index
+            # ordering dependencies are added to data dependencies below
+            deps: Set[int] = set()
+            if last_barrier is not None:
+                deps.add(last_barrier)
+            data_deps: Set[int] = set()
+
+            reads: Set[str] = set()
+            if not self.is_sliceable:
+                deps.update(since_barrier)
+                data_deps.update(deps)
+            elif stmt.is_barrier:
+                deps.update(since_barrier)
+                # Barrier may modify in place objects it reads (e.g. items.append(3) or model.to(device)), directly or
+                # by calling functions: it rebinds names bound so far that it reads
+                for name in sorted(self._resolve_reads(stmt.uses)):
+                    if name in self._last_producers:
+                        data_deps.add(self._last_producers[name])
+                        if name not in stmt.defines:
+                            stmt.defined_names.append(name)
+                            stmt.defines.add(name)
+                for name in stmt.defines:
+                    if name in self._last_producers:
+                        data_deps.add(self._last_producers[name])
+            else:
+                reads = self._resolve_reads(stmt.uses)
+                for name in reads:
+                    if name in self._last_producers:
+                        producer = self._last_producers[name]
+                        data_deps.add(producer)
+                        if self.statements[producer].is_barrier:
+                            # object modified by a barrier may hold a state, e.g. random after random.seed(0):
+                            # statements using it are executed in order
+                            data_deps.update(readers.get(name, ()))
+                for name in stmt.defines:
+                    if name in self._last_producers:
+                        data_deps.add(self._last_producers[name])
+                    data_deps.update(readers.get(name, ()))
+            data_deps.discard(i)
+            deps.update(data_deps)
+            deps.discard(i)
+            self.dependencies.append(deps)
+            self.data_dependencies.append(data_deps)
+
+            for name in reads:
+                readers.setdefault(name, []).append(i)
+            for name in stmt.defines:
+                self._last_producers[name] = i
+                readers[name] = []
+
+            if stmt.is_barrier or not self.is_sliceable:
+                last_barrier = i
+                since_barrier = []
+            else:
+                since_barrier.append(i)
+
+    @property
+    def dependants(self) -> List[Set[int]]:
+        """Indices of statements directly depending on each statement"""
+        if self._dependants is None:
+            self._dependants = [set() for _ in self.statements]
+            for i, deps in enumerate(self.dependencies):
+                for j in deps:
+                    self._dependants[j].add(i)
+        return self._dependants
+
+    @property
+    def data_dependants(self) -> List[Set[int]]:
+        """Indices of statements directly depending on values of each statement"""
+        if self._data_dependants is None:
+            self._data_dependants = [set() for _ in self.statements]
+            for i, deps in enumerate(self.data_dependencies):
+                for j in deps:
+                    self._data_dependants[j].add(i)
+        return self._data_dependants
+
+    def binds(self, name: str) -> bool:
+        """Method to check whether a name can be bound by the module statements."""
+        return self.defines_unknown or name in self._last_producers
+
+    def producer(self, name: str) -> Optional[int]:
+        """Method to get the index of the last statement binding a name, or None if no statement binds it."""
+        return self._last_producers.get(name)
+
+    def affected(self, indices: Iterable[int]) -> List[int]:
+        """Method to get sorted indices of given statements and all statements depending on their values, directly
+        or transitively. Functions defined by unaffected statements and reading names bound by affected statements
+        when called are also affected. Ordering dependencies are not followed: a barrier is affected only if it
+        reads an affected name, e.g. ``random.seed(seed)`` is not affected by a learning rate defined above it.
+        """
+        output: Set[int] = set()
+        stack = list(indices)
+        while stack:
+            while stack:
+                i = stack.pop()
+                if i not in output:
+                    output.add(i)
+                    stack.extend(self.data_dependants[i])
+            names = set().union(*(self.statements[i].defines for i in output))
+            stack = [s.index for s in self.statements if s.index not in output and s.deferred_uses & names]
+        return sorted(output)
+
+    def closure(self, indices: Iterable[int], data_only: bool = False) -> List[int]:
+        """Method to get sorted indices of given statements and all statements they depend on. If ``data_only`` is
+        True, only data dependencies are followed.
+        """
+        dependencies = self.data_dependencies if data_only else self.dependencies
+        output = set()
+        stack = list(indices)
+        while stack:
+            i = stack.pop()
+            if i not in output:
+                output.add(i)
+                stack.extend(dependencies[i])
+        return sorted(output)
+
+    def slice(self, names: Iterable[str]) -> Optional[List[int]]:
+        """Method to get sorted indices of statements to execute in order to compute given names.
+
+        Args:
+            names: names to compute
+
+        Returns:
+            list of statement indices or None if a name is not bound by any statement
+        """
+        producers: List[int] = []
+        for name in names:
+            if name not in self._slices:
+                producer = self._last_producers.get(name)
+                self._slices[name] = None if producer is None else self.closure([producer])
+            if self._slices[name] is None:
+                return None
+            producers.extend(self._slices[name])  # type: ignore[arg-type]
+        return sorted(set(producers))
+
+
+class StatementExecutor:
+    """Executes statements of a :class:`StatementGraph` into a namespace. Each statement is executed at most once.
+
+    In parallel mode, statements that do not depend on each other are executed concurrently on a thread pool.
+    This speeds up configurations where slow statements release the GIL (e.g. I/O, numpy or torch computations).
+    Once statements are executed, names in the namespace are ordered as in a sequential execution.
+
+    Statements using a global state seeded by an expression statement (e.g. ``random.seed(0)`` or
+    ``torch.manual_seed(seed)``) depend on each other and are executed in order, see :class:`StatementGraph`. Other
+    shared states are not detected: e.g. values drawn from a random generator created by an assignment
+    (``rng = np.random.default_rng(0)``) may differ from a sequential execution.
+
+    Args:
+        graph: statement graph
+        namespace: globals used to execute statements
+        parallel: if True, independent statements are executed concurrently
+        max_workers: maximum number of threads in parallel mode. By default, it is defined by
+            :class:`concurrent.futures.ThreadPoolExecutor`.
+        profiler: optional :class:`~py_config_runner.profiler.StatementProfiler` measuring executed statements.
+            Profiling is not supported in parallel mode.
+    """
+
+    def __init__(
+        self,
+        graph: StatementGraph,
+        namespace: Dict[str, Any],
+        parallel: bool = False,
+        max_workers: Optional[int] = None,
+        profiler: Optional["StatementProfiler"] = None,
+    ) -> None:
+        if parallel and profiler is not None:
+            raise ValueError("Statements can not be profiled in parallel mode")
+        self.graph = graph
+        self.namespace = namespace
+        self.parallel = parallel
+        self.max_workers = max_workers
+        self.profiler = profiler
+        self.executed: Set[int] = set()
+
+    @property
+    def done(self) -> bool:
+        return len(self.executed) == len(self.graph)
+
+    def run(self, indices: Iterable[int]) -> List[int]:
+        """Method to execute given statements, skipping already executed ones. Statements that given statements
+        depend on should be either executed or given.
+
+        Returns:
+            indices of executed statements
+        """
+        indices = sorted(set(indices) - self.executed)
+        if self.parallel and len(indices) > 1:
+            self._run_parallel(indices)
+        else:
+            for i in indices:
+                self._run_statement(i)
+        return indices
+
+    def _run_statement(self, i: int) -> None:
+        stmt = self.graph.statements[i]
+        if self.profiler is not None:
+            with self.profiler.measure(stmt):
+                exec(stmt.code, self.namespace)
+        else:
+            exec(stmt.code, self.namespace)
+        self.executed.add(i)
+
+    def _run_parallel(self, indices: List[int]) -> None:
+        names_before = list(self.namespace)
+        num_deps = {i: len(self.graph.dependencies[i] - self.executed) for i in indices}
+        ready = [i for i in indices if num_deps[i] == 0]
+        running: Dict[Future, int] = {}
+        errors: Dict[int, BaseException] = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="py_config_runner") as pool:
+            while ready or running:
+                for i in ready:
+                    running[pool.submit(self._run_statement, i)] = i
+                ready = []
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    i = running.pop(future)
+                    exc = future.exception()
+                    if exc is not None:
+                        errors[i] = exc
+                        continue
+                    if errors:
+                        # do not schedule new statements after a failure
+                        continue
+                    for j in self.graph.dependants[i]:
+                        if j in num_deps:
+                            num_deps[j] -= 1
+                            if num_deps[j] == 0:
+                                ready.append(j)
+                ready.sort()
+        self._reorder_namespace(names_before)
+        if errors:
+            raise errors[min(errors)]
+
+    def _reorder_namespace(self, names_before: List[str]) -> None:
+        # Deterministic order of names: names bound before, then names bound by statements in order
+        order = {name: None for name in names_before}
+        for stmt in self.graph.statements:
+            if stmt.index in self.executed:
+                order.update((name, None) for name in stmt.defined_names if name not in order)
+        ordered = {name: self.namespace[name] for name in order if name in self.namespace}
+        ordered.update(self.namespace)
+        self.namespace.clear()
+        self.namespace.update(ordered)
+
+    def run_for(self, names: Iterable[str]) -> List[int]:
+        """Method to execute statements required to compute given names. If a name is not bound by any statement,
+        all statements are executed.
+        """
+        indices = self.graph.slice(names)
+        if indices is None:
+            indices = list(range(len(self.graph)))
+        return self.run(indices)
+
+    def run_all(self) -> List[int]:
+        """Method to execute all remaining statements."""
+        return self.run(range(len(self.graph)))
+
+    def rerun(
+        self, affected: Iterable[int], values: Mapping[str, Any], is_kept: Callable[[str, int], bool]
+    ) -> List[int]:
+        """Method to execute given statements, e.g. affected by a change, reusing previously computed values of other
+        statements. Statements that are not affected are executed again if they are required by executed statements
+        and their values are not kept, e.g. imports or names rebound later. Statements preceding an executed barrier
+        are executed again, as the barrier may have modified their values in place (e.g. ``items.append(3)``).
+        Barriers are executed again only if executed statements read names they rebind, e.g. ``random.seed(0)`` is
+        not executed again for a statement not drawing random numbers.
+
+        Args:
+            affected: indices of statements to execute, see :meth:`StatementGraph.affected`
+            values: previously computed values by name
+            is_kept: function ``is_kept(name, index)`` returning True if ``values[name]`` holds the value bound by
+                the statement of given index and the statement is the last binding the name
+
+        Returns:
+            indices of executed statements
+        """
+        to_run = set(affected)
+
+        def _is_reusable(stmt: Statement, last_barrier: int) -> bool:
+            # values computed before an executed barrier may have been modified in place by it
+            if stmt.index in to_run or stmt.is_barrier or stmt.index < last_barrier:
+                return False
+            return all(is_kept(name, stmt.index) for name in stmt.defines)
+
+        while True:
+            last_barrier = max((i for i in to_run if self.graph.statements[i].is_barrier), default=-1)
+            required = {
+                i
+                for i in self.graph.closure(to_run, data_only=True)
+                if not _is_reusable(self.graph.statements[i], last_barrier)
+            }
+            if required <= to_run:
+                break
+            to_run |= required
+
+        reused: Dict[str, Any] = {}
+        for stmt in self.graph.statements:
+            if stmt.index not in to_run:
+                reused.update((name, values[name]) for name in stmt.defines if is_kept(name, stmt.index))
+
+        names_before = list(self.namespace)
+        self.namespace.update(reused)
+        self.executed.update(i for i in range(len(self.graph)) if i not in to_run)
+        executed = self.run(to_run)
+        # Values rebound by executed statements before their last binding
+        self.namespace.update(reused)
+        self._reorder_namespace(names_before)
+        return executed
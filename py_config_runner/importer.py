@@ -0,0 +1,127 @@
+import importlib.abc
+import importlib.machinery
+import multiprocessing.spawn
+import os
+import sys
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Callable, Iterator, List, Optional, Sequence, Set, Union
+
+_lock = threading.Lock()
+_active_finders: List["LocalModuleFinder"] = []
+_original_get_preparation_data: Optional[Callable] = None
+
+
+class LocalModuleFinder(importlib.abc.MetaPathFinder):
+    """Meta path finder resolving top-level modules of given directories, e.g. directories of a script and of a
+    configuration file, without adding them to ``sys.path``.
+
+    Names of modules and packages of the directories are listed once, other imports are passed to the next finders
+    without accessing the file system. Similarly to directories prepended to ``sys.path``, local modules take
+    precedence over installed packages, but not over built-in modules. Call :func:`importlib.invalidate_caches` to
+    find modules created after the finder.
+
+    Args:
+        search_paths: directories to search modules in, in order.
+
+    Example:
+
+    .. code-block:: python
+
+        with local_modules(["scripts", "configs"]):
+            module = importlib.import_module("my_module")
+
+    """
+
+    def __init__(self, search_paths: Sequence[Union[str, Path]]) -> None:
+        self.search_paths: List[str] = []
+        for path in search_paths:
+            path = Path(path).resolve().as_posix()
+            if path not in self.search_paths:
+                self.search_paths.append(path)
+        self._names = self._list_names()
+
+    def _list_names(self) -> Set[str]:
+        suffixes = importlib.machinery.all_suffixes()
+        names = set()
+        for path in self.search_paths:
+            try:
+                entries = list(os.scandir(path))
+            except OSError:
+                continue
+            for entry in entries:
+                if entry.is_dir():
+                    name = entry.name
+                elif any(entry.name.endswith(s) for s in suffixes):
+                    name = entry.name.split(".", 1)[0]
+                else:
+                    continue
+                if name.isidentifier():
+                    names.add(name)
+        return names
+
+    def find_spec(
+        self, fullname: str, path: Optional[Sequence[str]] = None, target: Optional[ModuleType] = None
+    ) -> Optional[importlib.machinery.ModuleSpec]:
+        # submodules are found by the parent package __path__
+        if path is not None or fullname not in self._names:
+            return None
+        spec = importlib.machinery.PathFinder.find_spec(fullname, self.search_paths)
+        if spec is not None and spec.loader is None:
+            # Namespace package: a regular package found in sys.path has a priority, as for sys.path entries
+            regular_spec = importlib.machinery.PathFinder.find_spec(fullname)
+            if regular_spec is not None and regular_spec.loader is not None:
+                return None
+        return spec
+
+    def invalidate_caches(self) -> None:
+        self._names = self._list_names()
+
+
+def _get_preparation_data(name: str) -> Any:
+    # Spawned processes do not inherit meta path finders: local directories are added to their sys.path
+    assert _original_get_preparation_data is not None
+    data = _original_get_preparation_data(name)
+    with _lock:
+        search_paths = [p for finder in _active_finders for p in finder.search_paths]
+    data["sys_path"] = search_paths + [p for p in data.get("sys_path", sys.path) if p not in search_paths]
+    return data
+
+
+@contextmanager
+def local_modules(search_paths: Sequence[Union[str, Path]]) -> Iterator[LocalModuleFinder]:
+    """Context manager to import modules from given directories, see :class:`LocalModuleFinder`. The finder is
+    removed from ``sys.meta_path`` on exit. Processes spawned in the context (e.g. with ``multiprocessing`` spawn
+    start method) find local modules too.
+
+    Args:
+        search_paths: directories to search modules in, in order.
+
+    Returns:
+        installed finder
+    """
+    global _original_get_preparation_data
+
+    finder = LocalModuleFinder(search_paths)
+    with _lock:
+        # before the path based finder, after built-in and frozen modules finders
+        index = next(
+            (i for i, f in enumerate(sys.meta_path) if f is importlib.machinery.PathFinder), len(sys.meta_path)
+        )
+        sys.meta_path.insert(index, finder)
+        if not _active_finders:
+            _original_get_preparation_data = multiprocessing.spawn.get_preparation_data
+            multiprocessing.spawn.get_preparation_data = _get_preparation_data  # type: ignore[assignment]
+        _active_finders.append(finder)
+    try:
+        yield finder
+    finally:
+        with _lock:
+            _active_finders.remove(finder)
+            if finder in sys.meta_path:
+                sys.meta_path.remove(finder)
+            if not _active_finders:
+                multiprocessing.spawn.get_preparation_data = _original_get_preparation_data  # type: ignore[assignment]
+                _original_get_preparation_data = None
@@ -0,0 +1,285 @@
+import ast
+import json
+import os
+import re
+import sqlite3
+from pathlib import Path
+from typing import Any, ContextManager, Dict, List, Optional, Set, Tuple, Union
+
+from py_config_runner.cache import _sqlite_connection
+
+DEFAULT_INDEX_FILENAME = ".py_config_runner_index.sqlite"
+
+_CONDITION_PATTERN = re.compile(r"^\s*([A-Za-z_][A-Za-z0-9_]*)\s*(==|!=|>=|<=|>|<)\s*(.+?)\s*$")
+
+_SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER, error TEXT)",
+    "CREATE TABLE IF NOT EXISTS assignments "
+    "(path TEXT, name TEXT, lineno INTEGER, source TEXT, value TEXT, num_value REAL, PRIMARY KEY (path, name))",
+    "CREATE TABLE IF NOT EXISTS imports (path TEXT, module TEXT, name TEXT)",
+    "CREATE INDEX IF NOT EXISTS assignments_name ON assignments (name, num_value)",
+    "CREATE INDEX IF NOT EXISTS imports_path ON imports (path)",
+]
+
+
+def parse_config_file(filepath: Union[str, Path]) -> Dict[str, Any]:
+    """Method to extract top-level assignments and imports of a configuration file without executing it.
+
+    Only the last top-level assignment of a name is kept. Values of assignments are extracted if they are python
+    literals (see :func:`ast.literal_eval`), otherwise only their source code is kept.
+
+    Args:
+        filepath: path to configuration file
+
+    Returns:
+        dictionary with keys "assignments" (name to dictionary with keys "lineno", "source" and "value", missing
+        for non-literal values) and "imports" (list of pairs of module and imported name, None for ``import module``)
+
+    Example:
+
+    .. code-block:: python
+
+        # baseline.py: from torchvision.models import resnet50; learning_rate = 0.1; model = resnet50()
+        info = parse_config_file("baseline.py")
+        # info["assignments"]["learning_rate"] == {"lineno": 1, "source": "0.1", "value": 0.1}
+        # info["imports"] == [("torchvision.models", "resnet50")]
+
+    """
+    source = Path(filepath).read_text()
+    tree = ast.parse(source)
+    assignments: Dict[str, Dict[str, Any]] = {}
+    imports: List[Tuple[str, Optional[str]]] = []
+    for node in tree.body:
+        if isinstance(node, (ast.Assign, ast.AnnAssign)) and node.value is not None:
+            targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+            for target in targets:
+                if not isinstance(target, ast.Name):
+                    continue
+                record: Dict[str, Any] = {
+                    "lineno": node.lineno,
+                    "source": _source_segment(source, node.value),
+                }
+                try:
+                    record["value"] = ast.literal_eval(node.value)
+                except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError):
+                    pass
+                # the last assignment defines the value
+                assignments.pop(target.id, None)
+                assignments[target.id] = record
+        elif isinstance(node, ast.Import):
+            imports.extend((alias.name, None) for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            module = "." * node.level + (node.module or "")
+            imports.extend((module, alias.name) for alias in node.names)
+    return {"assignments": assignments, "imports": imports}
+
+
+def _source_segment(source: str, node: ast.expr) -> str:
+    if hasattr(ast, "get_source_segment"):
+        return ast.get_source_segment(source, node) or ""
+    # Python 3.7: whole line of the node
+    return source.splitlines()[node.lineno - 1].strip()
+
+
+def _to_json(value: Any) -> Optional[str]:
+    try:
+        return json.dumps(value, sort_keys=True)
+    except (TypeError, ValueError):
+        # e.g. sets, complex numbers or bytes
+        return json.dumps(repr(value))
+
+
+def _to_number(value: Any) -> Optional[float]:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return float(value)
+
+
+class ConfigIndex:
+    """Persistent index of configuration files built by static analysis, configuration files are never executed.
+
+    Index stores top-level assignments and imports of configuration files (see :meth:`parse_config_file`) in a
+    SQLite database. Calling :meth:`update` parses only new and modified files (by modification time and size) and
+    removes deleted ones.
+
+    Args:
+        index_path: path to the index database file. It is created if it does not exist.
+
+    Example:
+
+    .. code-block:: python
+
+        index = ConfigIndex("/tmp/configs_index.sqlite")
+        index.update("configs")
+        paths = index.query("learning_rate >= 0.1", "resnet")
+
+    """
+
+    def __init__(self, index_path: Union[str, Path]) -> None:
+        self.index_path = Path(index_path)
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            for statement in _SCHEMA:
+                conn.execute(statement)
+
+    def _connect(self) -> ContextManager[sqlite3.Connection]:
+        return _sqlite_connection(self.index_path)
+
+    def update(self, directory: Union[str, Path]) -> Dict[str, int]:
+        """Method to index python files of a directory, recursively. Hidden directories and ``__pycache__`` are
+        skipped.
+
+        Args:
+            directory: directory with configuration files
+
+        Returns:
+            dictionary with numbers of "added", "updated", "removed" and "unchanged" files
+        """
+        root = Path(directory).resolve()
+        if not root.is_dir():
+            raise ValueError(f"Path '{root.as_posix()}' should be a directory")
+
+        stats = {}
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = sorted(d for d in dirnames if not d.startswith(".") and d != "__pycache__")
+            for filename in filenames:
+                if filename.endswith(".py"):
+                    st = os.stat(os.path.join(dirpath, filename))
+                    stats[Path(dirpath, filename).as_posix()] = (st.st_mtime_ns, st.st_size)
+
+        counts = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0}
+        with self._connect() as conn:
+            prefix = root.as_posix().rstrip("/") + "/"
+            indexed = {
+                path: (mtime_ns, size)
+                for path, mtime_ns, size in conn.execute(
+                    "SELECT path, mtime_ns, size FROM files WHERE substr(path, 1, ?) = ?", (len(prefix), prefix)
+                )
+            }
+            for path in sorted(set(indexed) - set(stats)):
+                self._remove(conn, path)
+                counts["removed"] += 1
+            for path, stat in sorted(stats.items()):
+                if indexed.get(path) == stat:
+                    counts["unchanged"] += 1
+                    continue
+                counts["updated" if path in indexed else "added"] += 1
+                self._remove(conn, path)
+                self._add(conn, path, stat)
+        return counts
+
+    @staticmethod
+    def _remove(conn: sqlite3.Connection, path: str) -> None:
+        for table in ("files", "assignments", "imports"):
+            conn.execute(f"DELETE FROM {table} WHERE path = ?", (path,))
+
+    @staticmethod
+    def _add(conn: sqlite3.Connection, path: str, stat: Tuple[int, int]) -> None:
+        try:
+            info = parse_config_file(path)
+        except (SyntaxError, ValueError, UnicodeDecodeError) as e:
+            conn.execute("INSERT INTO files VALUES (?, ?, ?, ?)", (path, stat[0], stat[1], f"{type(e).__name__}: {e}"))
+            return
+        conn.execute("INSERT INTO files VALUES (?, ?, ?, ?)", (path, stat[0], stat[1], None))
+        conn.executemany(
+            "INSERT INTO assignments VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    path,
+                    name,
+                    record["lineno"],
+                    record["source"],
+                    _to_json(record["value"]) if "value" in record else None,
+                    _to_number(record.get("value")),
+                )
+                for name, record in info["assignments"].items()
+            ],
+        )
+        conn.executemany(
+            "INSERT INTO imports VALUES (?, ?, ?)", [(path, module, name) for module, name in info["imports"]]
+        )
+
+    def paths(self) -> List[str]:
+        """Method to get paths of indexed files."""
+        with self._connect() as conn:
+            return [row[0] for row in conn.execute("SELECT path FROM files ORDER BY path")]
+
+    def get(self, path: Union[str, Path]) -> Dict[str, Any]:
+        """Method to get indexed assignments and imports of a file, see :meth:`parse_config_file`.
+
+        Args:
+            path: path to indexed file
+
+        Returns:
+            dictionary with keys "assignments", "imports" and "error" (None if the file was parsed)
+        """
+        path = Path(path).resolve().as_posix()
+        with self._connect() as conn:
+            row = conn.execute("SELECT error FROM files WHERE path = ?", (path,)).fetchone()
+            if row is None:
+                raise ValueError(f"File '{path}' is not indexed")
+            assignments = {}
+            for name, lineno, source, value in conn.execute(
+                "SELECT name, lineno, source, value FROM assignments WHERE path = ? ORDER BY lineno", (path,)
+            ):
+                record: Dict[str, Any] = {"lineno": lineno, "source": source}
+                if value is not None:
+                    record["value"] = json.loads(value)
+                assignments[name] = record
+            imports = [tuple(r) for r in conn.execute("SELECT module, name FROM imports WHERE path = ?", (path,))]
+        return {"assignments": assignments, "imports": imports, "error": row[0]}
+
+    def query(self, *conditions: str) -> List[str]:
+        """Method to find indexed files matching all given conditions.
+
+        Condition is either a comparison of a top-level literal value ``KEY OP VALUE``, where ``OP`` is one of ``==``,
+        ``!=``, ``>=``, ``<=``, ``>``, ``<`` and ``VALUE`` is a python literal (otherwise, a string), e.g.
+        ``learning_rate >= 0.1`` or ``optimizer == 'sgd'``, or a text to search (case-insensitive) in the source
+        code of assignments and in imports, e.g. ``resnet``.
+
+        Args:
+            conditions: conditions to match
+
+        Returns:
+            sorted list of paths of matching files
+        """
+        matches: Optional[Set[str]] = None
+        with self._connect() as conn:
+            for condition in conditions:
+                paths = self._match(conn, condition)
+                matches = paths if matches is None else matches & paths
+                if not matches:
+                    return []
+            if matches is None:
+                matches = {row[0] for row in conn.execute("SELECT path FROM files")}
+        return sorted(matches)
+
+    @staticmethod
+    def _match(conn: sqlite3.Connection, condition: str) -> Set[str]:
+        m = _CONDITION_PATTERN.match(condition)
+        if m is None:
+            pattern = f"%{condition.strip()}%"
+            rows = conn.execute(
+                "SELECT path FROM assignments WHERE source LIKE ? OR name LIKE ? "
+                "UNION SELECT path FROM imports WHERE module LIKE ? OR name LIKE ?",
+                (pattern, pattern, pattern, pattern),
+            )
+            return {row[0] for row in rows}
+
+        name, op, raw_value = m.groups()
+        try:
+            value = ast.literal_eval(raw_value)
+        except (ValueError, SyntaxError):
+            value = raw_value
+        number = _to_number(value)
+        if number is not None:
+            rows = conn.execute(f"SELECT path FROM assignments WHERE name = ? AND num_value {op} ?", (name, number))
+        elif op in ("==", "!="):
+            sql_op = "=" if op == "==" else "!="
+            rows = conn.execute(
+                f"SELECT path FROM assignments WHERE name = ? AND value IS NOT NULL AND value {sql_op} ?",
+                (name, _to_json(value)),
+            )
+        else:
+            raise ValueError(f"Operator '{op}' requires a number, but given '{raw_value}' in condition '{condition}'")
+        return {row[0] for row in rows}
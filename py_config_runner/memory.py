@@ -0,0 +1,168 @@
+import gc
+import sys
+import types
+from typing import Any, Dict, Hashable, List, Mapping, Tuple
+
+# Objects that are not followed: their content is shared by the whole program
+_SKIPPED_TYPES = (
+    type,
+    types.ModuleType,
+    types.FunctionType,
+    types.BuiltinFunctionType,
+    types.MethodType,
+    types.CodeType,
+    types.FrameType,
+)
+
+
+def _is_ndarray(obj: Any) -> bool:
+    np = sys.modules.get("numpy")
+    return np is not None and isinstance(obj, np.ndarray)
+
+
+def _is_tensor(obj: Any) -> bool:
+    # torch is not imported if the configuration does not use it
+    torch = sys.modules.get("torch")
+    return torch is not None and isinstance(obj, torch.Tensor)
+
+
+def _ndarray_buffer(arr: Any) -> Tuple[Hashable, int]:
+    # Views share the memory of the array owning the data
+    root = arr
+    while _is_ndarray(root.base):
+        root = root.base
+    if root.base is None:
+        return ("ndarray", id(root)), int(root.nbytes)
+    # data is owned by another object, e.g. bytes or mmap
+    return ("ndarray", id(root.base)), int(arr.nbytes)
+
+
+def _tensor_buffer(tensor: Any) -> Tuple[Hashable, int, bool]:
+    if hasattr(tensor, "untyped_storage"):
+        storage = tensor.untyped_storage()
+    else:
+        storage = tensor.storage()
+    nbytes = storage.nbytes() if callable(getattr(storage, "nbytes", None)) else storage.size() * storage.element_size()
+    is_cpu = tensor.device.type == "cpu"
+    return ("tensor", tensor.device.type, storage.data_ptr()), int(nbytes), is_cpu
+
+
+def _collect(root: Any) -> Dict[Hashable, Tuple[int, bool, bool]]:
+    # Returns reachable objects and data buffers of root: id -> (size in bytes, True if in host memory,
+    # True if sharing the object is meaningful, i.e. it is not an atomic object like None, small int or string)
+    found: Dict[Hashable, Tuple[int, bool, bool]] = {}
+    stack = [root]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in found:
+            continue
+        try:
+            found[id(obj)] = (sys.getsizeof(obj), True, gc.is_tracked(obj))
+        except TypeError:
+            found[id(obj)] = (0, True, gc.is_tracked(obj))
+
+        if isinstance(obj, _SKIPPED_TYPES):
+            continue
+
+        if _is_ndarray(obj):
+            key, nbytes = _ndarray_buffer(obj)
+            # sys.getsizeof counts owned data, which is accounted as the buffer
+            found[id(obj)] = (max(found[id(obj)][0] - (nbytes if obj.base is None else 0), 0), True, True)
+            found[key] = (nbytes, True, True)
+            if obj.dtype.hasobject:
+                stack.extend(obj.ravel().tolist())
+            continue
+
+        if _is_tensor(obj):
+            key, nbytes, is_cpu = _tensor_buffer(obj)
+            found[key] = (nbytes, is_cpu, True)
+            grad = getattr(obj, "grad", None)
+            if grad is not None:
+                stack.append(grad)
+            stack.extend(getattr(obj, "__dict__", {}).values())
+            continue
+
+        stack.extend(r for r in gc.get_referents(obj) if not isinstance(r, type))
+    return found
+
+
+def _length(value: Any) -> Any:
+    if isinstance(value, (str, bytes)) or _is_ndarray(value) or _is_tensor(value) or isinstance(value, type):
+        return None
+    try:
+        return len(value)
+    except Exception:
+        return None
+
+
+def retained_size(obj: Any) -> int:
+    """Method to estimate the number of bytes in host memory reachable from an object, see :meth:`memory_report`.
+
+    Args:
+        obj: object to measure
+
+    Returns:
+        size in bytes
+    """
+    return sum(nbytes for nbytes, is_host, _ in _collect(obj).values() if is_host)
+
+
+def memory_report(values: Mapping[str, Any]) -> List[Dict[str, Any]]:
+    """Method to estimate memory retained by each value of a mapping, e.g. a loaded configuration.
+
+    Sizes are approximate: python objects are measured with :func:`sys.getsizeof` and followed with
+    :func:`gc.get_referents`, data of numpy arrays and torch tensors (including model parameters and buffers) are
+    counted once per underlying buffer, so that views and tensors shared between values are not counted twice.
+    Classes, modules and functions are not followed.
+
+    Args:
+        values: mapping of names to values
+
+    Returns:
+        list of records sorted by size with keys "key", "type", "size" (bytes in host memory reachable from the
+        value), "exclusive_size" (bytes not reachable from other values), "device_size" (bytes of tensors on
+        accelerators), "length" (``len(value)`` for containers and datasets, otherwise None) and "shared_with" (names
+        of values sharing memory with the value)
+
+    Example:
+
+    .. code-block:: python
+
+        for record in memory_report(config)[:5]:
+            print(record["key"], record["size"], record["exclusive_size"], record["shared_with"])
+
+    """
+    collected = {key: _collect(value) for key, value in values.items()}
+
+    owners: Dict[Hashable, List[str]] = {}
+    for key, found in collected.items():
+        for obj_id in found:
+            owners.setdefault(obj_id, []).append(key)
+
+    records = []
+    for key, found in collected.items():
+        size = exclusive_size = device_size = 0
+        shared_with: Dict[str, None] = {}
+        for obj_id, (nbytes, is_host, is_shareable) in found.items():
+            obj_owners = owners[obj_id]
+            if is_shareable and len(obj_owners) > 1:
+                shared_with.update((k, None) for k in obj_owners if k != key)
+            if not is_host:
+                device_size += nbytes
+                continue
+            size += nbytes
+            if len(obj_owners) == 1:
+                exclusive_size += nbytes
+        value = values[key]
+        records.append(
+            {
+                "key": key,
+                "type": f"{type(value).__module__}.{type(value).__qualname__}",
+                "size": size,
+                "exclusive_size": exclusive_size,
+                "device_size": device_size,
+                "length": _length(value),
+                "shared_with": sorted(shared_with),
+            }
+        )
+    return sorted(records, key=lambda r: r["size"], reverse=True)
@@ -0,0 +1,124 @@
+import builtins
+import json
+import linecache
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+from py_config_runner.graph import Statement
+
+
+class StatementProfiler:
+    """Profiler of top-level statements executed by :class:`~py_config_runner.graph.StatementExecutor`.
+
+    For each executed statement, profiler records wall time, time spent in import statements and memory allocated by
+    the statement and still retained after it (measured with :mod:`tracemalloc`). Note that memory tracing slows down
+    the execution, use ``trace_memory=False`` to measure only timings.
+
+    Args:
+        trace_memory: if True, memory allocations are traced.
+
+    Example:
+
+    .. code-block:: python
+
+        config = ConfigObject("/path/to/baseline.py", profile="/tmp/config_profile.json")
+        config.model
+        for record in config.profile_report()[:5]:
+            print(record["lineno"], record["wall_time"], record["statement"])
+
+    """
+
+    def __init__(self, trace_memory: bool = True) -> None:
+        self.trace_memory = trace_memory
+        self.records: List[Dict[str, Any]] = []
+
+    @contextmanager
+    def measure(self, stmt: Statement) -> Iterator[None]:
+        """Context manager measuring the execution of a statement."""
+        import_time = 0.0
+        depth = 0
+        original_import = builtins.__import__
+
+        def _timed_import(*args: Any, **kwargs: Any) -> Any:
+            nonlocal import_time, depth
+            if depth > 0:
+                # nested imports are accounted by the outermost one
+                return original_import(*args, **kwargs)
+            depth += 1
+            start = time.perf_counter()
+            try:
+                return original_import(*args, **kwargs)
+            finally:
+                import_time += time.perf_counter() - start
+                depth -= 1
+
+        owns_tracing = self.trace_memory and not tracemalloc.is_tracing()
+        if owns_tracing:
+            tracemalloc.start()
+        memory_before = tracemalloc.get_traced_memory()[0] if self.trace_memory else 0
+
+        builtins.__import__ = _timed_import
+        start = time.perf_counter()
+        error = None
+        try:
+            yield
+        except BaseException as e:
+            error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            wall_time = time.perf_counter() - start
+            builtins.__import__ = original_import
+            memory_delta = memory_peak = None
+            if self.trace_memory:
+                memory_current, peak = tracemalloc.get_traced_memory()
+                memory_delta = memory_current - memory_before
+                if owns_tracing:
+                    memory_peak = peak
+                    tracemalloc.stop()
+            self.records.append(
+                {
+                    "index": stmt.index,
+                    "lineno": stmt.lineno,
+                    "statement": linecache.getline(stmt.filename, stmt.lineno).strip(),
+                    "names": list(stmt.defined_names),
+                    "wall_time": wall_time,
+                    "import_time": import_time,
+                    "memory_delta": memory_delta,
+                    "memory_peak": memory_peak,
+                    "error": error,
+                }
+            )
+
+    def report(self, sort_by: str = "wall_time") -> List[Dict[str, Any]]:
+        """Method to get records of executed statements.
+
+        Args:
+            sort_by: record key to sort by in descending order, e.g. "wall_time", "import_time" or "memory_delta".
+
+        Returns:
+            list of records with keys "index", "lineno", "statement" (first source line), "names" (names defined by
+            the statement), "wall_time" and "import_time" (in seconds), "memory_delta" and "memory_peak" (in bytes,
+            None if not measured) and "error" (None if the statement succeeded)
+        """
+        if self.records and sort_by not in self.records[0]:
+            raise ValueError(f"Argument sort_by should be one of {list(self.records[0])}, but given '{sort_by}'")
+        return sorted(self.records, key=lambda r: r[sort_by] if r[sort_by] is not None else 0, reverse=True)
+
+    def dump(self, filepath: Union[str, Path], config_filepath: Optional[Union[str, Path]] = None) -> None:
+        """Method to write the report to a JSON file.
+
+        Args:
+            filepath: output JSON file path
+            config_filepath: optional profiled configuration file path to write in the report
+        """
+        output = {
+            "config_filepath": None if config_filepath is None else Path(config_filepath).as_posix(),
+            "total_time": sum(r["wall_time"] for r in self.records),
+            "total_import_time": sum(r["import_time"] for r in self.records),
+            "statements": self.report(),
+        }
+        with Path(filepath).open("w") as h:
+            json.dump(output, h, indent=2)
@@ -1,36 +1,223 @@
+import asyncio
+import functools
+import hashlib
 import os
 import sys
 import inspect
 
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, ContextManager, List, Mapping, Optional, Sequence, Union
+
+from py_config_runner.cache import RunCache
+from py_config_runner.importer import LocalModuleFinder, local_modules
+from py_config_runner.utils import find_local_imports, load_module, ConfigObject
+
+
+def run_script(
+    script_file: str,
+    config_file: str,
+    mutations: Optional[Mapping] = None,
+    cache: Optional[Union[str, Path, RunCache]] = None,
+    profile_config: Optional[Union[str, Path]] = None,
+    prefetch_config: bool = False,
+    **kwargs: Any,
+) -> Any:
+    """Method to run experiment (defined by a script file)
 
-from py_config_runner.utils import load_module, ConfigObject
+    Script's ``run`` method can be a coroutine function, ``async def run(config, **kwargs)``. In this case, it is
+    executed in a new event loop with :func:`asyncio.run`. To run several coroutines in the same event loop, see
+    :meth:`run_script_async` and :meth:`run_scripts_concurrently`.
 
+    Modules of the current working directory, the configuration and the script directories can be imported during
+    the run, see :meth:`~py_config_runner.importer.local_modules`. These directories are not added to ``sys.path``.
 
-def run_script(script_file: str, config_file: str, **kwargs: Any) -> None:
-    """Method to run experiment (defined by a script file)
+    If ``cache`` is provided, finished runs are memoized: run key is a hash of the script source, the configuration
+    :meth:`~py_config_runner.ConfigObject.fingerprint` (source, mutations), sources of local modules imported by the
+    script and ``kwargs`` (by their ``repr``). If a run with the same key has already finished, the script is not
+    executed and the recorded run is returned. Artifacts of the run are listed from the directory passed as
+    ``output_path`` kwarg, if any, and the run is executed again if one of them is missing.
 
     Args:
-        script_filepath: input script filepath. Script should contain ``run(config, **kwargs)`` method.
-        config_filepath: input configuration filepath
+        script_file: input script filepath. Script should contain ``run(config, **kwargs)`` method.
+        config_file: input configuration filepath
+        mutations: dict of mutations to apply to the configuration, see :class:`~py_config_runner.ConfigObject`.
+        cache: optional cache directory or :class:`~py_config_runner.cache.RunCache` to memoize finished runs.
+        profile_config: optional JSON file path to write the profile of the configuration file execution, see
+            ``profile`` argument of :class:`~py_config_runner.ConfigObject`.
+        prefetch_config: if True, configuration is loaded in a background thread while the script is imported, see
+            :meth:`~py_config_runner.ConfigObject.prefetch`. Can not be used with ``profile_config``.
+        kwargs: kwargs to pass to ``run`` method.
+
+    Returns:
+        output of ``run`` method or, if ``cache`` is provided, :class:`~py_config_runner.cache.RunRecord` with
+        output of ``run`` method as ``result``
+
+    Example:
+
+    .. code-block:: python
+
+        record = run_script("training.py", "configs/baseline.py", cache="/tmp/runs", output_path="/tmp/output")
+        print(record.cached, record.result, record.manifest["files"])
+
     """
-    # Add config path and current working directory to sys.path to correctly load the configuration
+    if prefetch_config and profile_config is not None:
+        # profiler measures imports of all threads
+        raise ValueError("Arguments prefetch_config and profile_config can not be used together")
+
     script_filepath = Path(script_file)
     config_filepath = Path(config_file)
-    sys.path.insert(0, script_filepath.resolve().parent.as_posix())
-    sys.path.insert(0, config_filepath.resolve().parent.as_posix())
-    sys.path.insert(0, os.getcwd())
+    with _local_modules(script_filepath, config_filepath):
+        # Lazy setup configuration
+        profile = False if profile_config is None else profile_config
+        config = ConfigObject(config_filepath, mutations=mutations, profile=profile, script_filepath=script_filepath)
+
+        run_key = None
+        if cache is not None:
+            if not isinstance(cache, RunCache):
+                cache = RunCache(cache)
+            run_key = _run_key(script_filepath, config, kwargs)
+            record = cache.get(run_key)
+            if record is not None:
+                return record
+
+        if prefetch_config:
+            config.prefetch()
+        run_fn = _load_run(script_filepath)
+        if inspect.iscoroutinefunction(run_fn):
+            output = asyncio.run(run_fn(config, **kwargs))
+        else:
+            output = run_fn(config, **kwargs)
+
+        if cache is not None:
+            assert isinstance(cache, RunCache) and run_key is not None
+            description = f"{script_filepath.as_posix()} {config_filepath.as_posix()}"
+            return cache.put(run_key, output, artifacts_dir=kwargs.get("output_path"), description=description)
+        return output
+
+
+async def run_script_async(
+    script_file: Union[str, Path], config_file: Union[str, Path], mutations: Optional[Mapping] = None, **kwargs: Any
+) -> Any:
+    """Coroutine to run experiment (defined by a script file) in the running event loop.
+
+    If script's ``run`` method is a coroutine function, it is awaited. Otherwise, it is executed in the default
+    executor of the event loop (a thread pool), so that it does not block other coroutines.
 
-    module = load_module(script_filepath)
-    _check_script(module)
+    Args:
+        script_file: input script filepath. Script should contain ``run(config, **kwargs)`` or
+            ``async def run(config, **kwargs)`` method.
+        config_file: input configuration filepath
+        mutations: dict of mutations to apply to the configuration, see :class:`~py_config_runner.ConfigObject`.
+        kwargs: kwargs to pass to ``run`` method.
 
-    run_fn = module.__dict__["run"]
+    Returns:
+        output of ``run`` method
+
+    Example:
+
+    .. code-block:: python
+
+        async def main():
+            return await asyncio.gather(
+                run_script_async("export.py", "configs/a.py"), run_script_async("evaluate.py", "configs/b.py")
+            )
+
+        outputs = asyncio.run(main())
 
-    # Lazy setup configuration
-    config = ConfigObject(config_filepath, script_filepath=script_filepath)
+    """
+    script_filepath = Path(script_file)
+    config_filepath = Path(config_file)
+    with _local_modules(script_filepath, config_filepath):
+        config = ConfigObject(config_filepath, mutations=mutations, script_filepath=script_filepath)
+        return await _await_run(_load_run(script_filepath), config, kwargs)
+
+
+def run_scripts_concurrently(
+    script_file: Union[str, Path],
+    config_files: Sequence[Union[str, Path]],
+    mutations: Optional[Mapping] = None,
+    return_exceptions: bool = False,
+    **kwargs: Any,
+) -> List[Any]:
+    """Method to run a script with several configurations concurrently in one event loop.
+
+    Script is loaded once and its ``run`` method is called with each configuration, see :meth:`run_script_async`.
+    This is useful for I/O-bound scripts, e.g. data export or evaluation with a remote service, defining
+    ``async def run(config, **kwargs)``.
+
+    Args:
+        script_file: input script filepath. Script should contain ``run(config, **kwargs)`` or
+            ``async def run(config, **kwargs)`` method.
+        config_files: input configuration filepaths
+        mutations: dict of mutations to apply to each configuration, see :class:`~py_config_runner.ConfigObject`.
+        return_exceptions: if True, exceptions raised by runs are returned as outputs instead of being raised. By
+            default, the first exception is raised and other runs are cancelled.
+        kwargs: kwargs to pass to ``run`` method.
 
-    run_fn(config, **kwargs)
+    Returns:
+        list of outputs of ``run`` method, in the order of ``config_files``
+
+    Example:
+
+    .. code-block:: python
+
+        outputs = run_scripts_concurrently("scripts/export.py", ["configs/a.py", "configs/b.py"])
+
+    """
+    script_filepath = Path(script_file)
+    config_filepaths = [Path(p) for p in config_files]
+    # configuration modules with the same name would replace each other in sys.modules
+    isolated = len({p.stem for p in config_filepaths}) < len(config_filepaths)
+    configs = [
+        ConfigObject(p, mutations=mutations, isolated=isolated, script_filepath=script_filepath)
+        for p in config_filepaths
+    ]
+
+    async def _run_all() -> List[Any]:
+        tasks = [asyncio.ensure_future(_await_run(run_fn, config, kwargs)) for config in configs]
+        try:
+            return await asyncio.gather(*tasks, return_exceptions=return_exceptions)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    with _local_modules(script_filepath, *config_filepaths):
+        run_fn = _load_run(script_filepath)
+        return asyncio.run(_run_all())
+
+
+def _load_run(script_filepath: Path) -> Callable:
+    # script is registered in sys.modules, so that its functions can be pickled, e.g. to spawn processes
+    module = load_module(script_filepath, register=True)
+    _check_script(module)
+    return module.__dict__["run"]
+
+
+async def _await_run(run_fn: Callable, config: ConfigObject, kwargs: Mapping[str, Any]) -> Any:
+    if inspect.iscoroutinefunction(run_fn):
+        return await run_fn(config, **kwargs)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, functools.partial(run_fn, config, **kwargs))
+
+
+def _local_modules(script_filepath: Path, *config_filepaths: Path) -> ContextManager[LocalModuleFinder]:
+    # Modules of the current working directory, configuration and script directories are importable during the run
+    search_paths = [Path(os.getcwd())] + [p.resolve().parent for p in config_filepaths]
+    return local_modules(search_paths + [script_filepath.resolve().parent])
+
+
+def _run_key(script_filepath: Path, config: ConfigObject, kwargs: Mapping[str, Any]) -> str:
+    search_paths = [Path(os.getcwd()), script_filepath.resolve().parent]
+    h = hashlib.sha256(script_filepath.read_bytes())
+    h.update(config.fingerprint().encode("utf-8"))
+    modules_hashes = sorted(
+        hashlib.sha256(p.read_bytes()).hexdigest() for p in find_local_imports(script_filepath, search_paths)
+    )
+    for module_hash in modules_hashes:
+        h.update(module_hash.encode("utf-8"))
+    for key in sorted(kwargs):
+        h.update(f"\0{key}={kwargs[key]!r}".encode("utf-8"))
+    return h.hexdigest()
 
 
 def _check_script(module):
@@ -0,0 +1,200 @@
+import array
+import importlib
+import json
+import os
+import select
+import signal
+import socket
+import sys
+import traceback
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence, Tuple, Union
+
+SERVER_ENV_VAR = "PY_CONFIG_RUNNER_SERVER"
+
+_MAX_MESSAGE_SIZE = 1 << 20
+
+
+def _check_platform() -> None:
+    if not (hasattr(os, "fork") and hasattr(socket, "AF_UNIX")):
+        raise RuntimeError("Fork server is supported only on platforms with fork and Unix sockets")
+
+
+def _recv_message(conn: socket.socket, num_fds: int = 0) -> Tuple[Dict[str, Any], list]:
+    data = b""
+    fds: list = []
+    fds_size = socket.CMSG_LEN(num_fds * array.array("i").itemsize) if num_fds > 0 else 0
+    while not data.endswith(b"\n"):
+        chunk, ancdata, _, _ = conn.recvmsg(_MAX_MESSAGE_SIZE, fds_size)
+        if not chunk:
+            raise ConnectionError("Connection closed before receiving a message")
+        data += chunk
+        for level, kind, cmsg_data in ancdata:
+            if level == socket.SOL_SOCKET and kind == socket.SCM_RIGHTS:
+                a = array.array("i")
+                a.frombytes(cmsg_data[: len(cmsg_data) - (len(cmsg_data) % a.itemsize)])
+                fds.extend(a)
+    return json.loads(data.decode("utf-8")), fds
+
+
+def _send_message(conn: socket.socket, message: Dict[str, Any], fds: Sequence[int] = ()) -> None:
+    data = json.dumps(message).encode("utf-8") + b"\n"
+    ancdata = []
+    if len(fds) > 0:
+        ancdata = [(socket.SOL_SOCKET, socket.SCM_RIGHTS, array.array("i", fds))]
+    conn.sendmsg([data], ancdata)
+
+
+def _run_child(request: Dict[str, Any], fds: Sequence[int]) -> int:
+    # executed in the forked child process
+    from py_config_runner.runner import run_script
+
+    try:
+        for target_fd, fd in zip((0, 1, 2), fds):
+            os.dup2(fd, target_fd)
+        os.chdir(request["cwd"])
+        os.environ.clear()
+        os.environ.update(request["env"])
+        sys.argv = [request["script_filepath"], request["config_filepath"]]
+        run_script(request["script_filepath"], request["config_filepath"])
+        return 0
+    except SystemExit as e:
+        return e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    except BaseException:
+        traceback.print_exc()
+        return 1
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+
+
+def serve(socket_path: Union[str, Path], preload: Sequence[str] = (), poll_interval: float = 0.1) -> None:
+    """Method to start a fork server running scripts with configurations.
+
+    Server imports ``preload`` modules once, listens on a Unix socket and runs each request from
+    :meth:`run_on_server` in a forked child process. Requested runs therefore skip interpreter start-up and imports
+    of preloaded modules. The child process uses the current working directory, environment variables and standard
+    streams of the client. Server runs until it is interrupted with SIGINT or SIGTERM.
+
+    Args:
+        socket_path: path to the Unix socket to listen on
+        preload: names of modules to import on start-up, e.g. ``["torch", "torchvision"]``
+        poll_interval: interval in seconds to check for finished child processes
+
+    Example:
+
+    .. code-block:: bash
+
+        py_config_runner serve --socket /tmp/py_config_runner.sock --preload torch --preload torchvision &
+        py_config_runner --server /tmp/py_config_runner.sock scripts/training.py configs/baseline.py
+
+    """
+    _check_platform()
+    for name in preload:
+        importlib.import_module(name)
+
+    socket_path = Path(socket_path)
+    if socket_path.exists():
+        socket_path.unlink()
+
+    def _stop(signum: int, frame: Any) -> None:
+        raise KeyboardInterrupt()
+
+    signal.signal(signal.SIGTERM, _stop)
+
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    children: Dict[int, socket.socket] = {}
+    try:
+        listener.bind(socket_path.as_posix())
+        os.chmod(socket_path.as_posix(), 0o600)
+        listener.listen()
+        while True:
+            ready, _, _ = select.select([listener], [], [], poll_interval)
+            if ready:
+                conn, _ = listener.accept()
+                pid = _handle_connection(listener, conn)
+                if pid is not None:
+                    children[pid] = conn
+            _reap_children(children)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        listener.close()
+        for conn in children.values():
+            conn.close()
+        if socket_path.exists():
+            socket_path.unlink()
+
+
+def _handle_connection(listener: socket.socket, conn: socket.socket) -> Optional[int]:
+    try:
+        request, fds = _recv_message(conn, num_fds=3)
+    except (ConnectionError, ValueError):
+        conn.close()
+        return None
+
+    pid = os.fork()
+    if pid == 0:
+        listener.close()
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        code = 1
+        try:
+            code = _run_child(request, fds)
+        finally:
+            os._exit(code)
+
+    for fd in fds:
+        os.close(fd)
+    return pid
+
+
+def _reap_children(children: Dict[int, socket.socket]) -> None:
+    for pid in list(children):
+        try:
+            finished_pid, status = os.waitpid(pid, os.WNOHANG)
+        except ChildProcessError:
+            finished_pid, status = pid, 1 << 8
+        if finished_pid == 0:
+            continue
+        if os.WIFSIGNALED(status):
+            returncode = -os.WTERMSIG(status)
+        else:
+            returncode = os.WEXITSTATUS(status)
+        conn = children.pop(pid)
+        try:
+            _send_message(conn, {"returncode": returncode})
+        except OSError:
+            pass
+        conn.close()
+
+
+def run_on_server(
+    socket_path: Union[str, Path],
+    script_filepath: Union[str, Path],
+    config_filepath: Union[str, Path],
+    fds: Sequence[int] = (0, 1, 2),
+) -> int:
+    """Method to run experiment (defined by a script file) on a fork server started with :meth:`serve`.
+
+    Args:
+        socket_path: path to the server Unix socket
+        script_filepath: input script filepath
+        config_filepath: input configuration filepath
+        fds: file descriptors to use as stdin, stdout and stderr of the run. By default, standard streams of the
+            current process.
+
+    Returns:
+        return code of the run
+    """
+    _check_platform()
+    request = {
+        "script_filepath": Path(script_filepath).resolve().as_posix(),
+        "config_filepath": Path(config_filepath).resolve().as_posix(),
+        "cwd": os.getcwd(),
+        "env": dict(os.environ),
+    }
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+        conn.connect(Path(socket_path).as_posix())
+        _send_message(conn, request, fds=fds)
+        response, _ = _recv_message(conn)
+    return int(response["returncode"])
@@ -0,0 +1,181 @@
+import mmap
+import os
+import pickle
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+from py_config_runner.snapshot import MIN_BUFFER_SIZE, dumps
+
+_ALIGNMENT = 64
+
+
+class SharedBuffers:
+    """Shared memory segment holding out-of-band buffers of a pickled object, see
+    :meth:`~py_config_runner.snapshot.dumps`. The segment is owned by the process creating it: it is removed by
+    :meth:`release` (or when the object is garbage collected), processes having loaded the object keep their
+    mapping.
+
+    Numpy arrays copied into the segment (and arrays they are views of) are made read-only, so that the shared copy
+    can not become stale. Given ``previous`` shared buffers, read-only arrays already shared by them are not copied
+    again: e.g. pickling an object again after adding a value only copies the data of the new value. Other buffers,
+    e.g. data of CPU tensors which can not be made read-only, are copied each time. Arrays are writable again once
+    released.
+
+    Args:
+        obj: object to pickle
+        min_buffer_size: size in bytes of the smallest buffer to share
+        previous: optional shared buffers of a previous version of the object. Their read-only arrays are moved to
+            this object, their segment should not be released while this object is used.
+
+    Example:
+
+    .. code-block:: python
+
+        shared = SharedBuffers({"data": np.random.rand(10000, 1000)})
+        # send shared.data to other processes, e.g. as argument of a spawned process
+        values = load_shared(shared.data)
+        # data array is not copied again
+        new_shared = SharedBuffers({"data": values["data"], "other": 1}, previous=shared)
+
+    """
+
+    def __init__(
+        self, obj: Any, min_buffer_size: int = MIN_BUFFER_SIZE, previous: Optional["SharedBuffers"] = None
+    ) -> None:
+        if sys.version_info < (3, 8):
+            raise RuntimeError("Shared memory is not supported on Python versions < 3.8")
+        from multiprocessing import shared_memory
+
+        # id of array -> (array, location of its data [segment name, segment size, start, nbytes], locked arrays)
+        self._arrays: Dict[int, Tuple[Any, List[Any], List[Any]]] = {}
+        shared_arrays = {} if previous is None else previous._arrays
+        # arrays are pickled as writable, as unpickled arrays are read-only if their buffer is
+        _make_writable([a for e in shared_arrays.values() for a in e[2]])
+        try:
+            payload, buffers = dumps(obj, min_buffer_size=min_buffer_size)
+        finally:
+            for array in [a for e in shared_arrays.values() for a in e[2]]:
+                array.setflags(write=False)
+        locations: List[List[Any]] = []
+        copied: List[Tuple[memoryview, List[Any]]] = []
+        offset = 0
+        for buffer in buffers:
+            raw = buffer.raw()
+            exporter = raw.obj
+            entry = shared_arrays.get(id(exporter))
+            if entry is not None and entry[0] is exporter and not exporter.flags.writeable:
+                self._arrays[id(exporter)] = entry
+                locations.append(entry[1])
+                continue
+            offset += -offset % _ALIGNMENT
+            location: List[Any] = [None, None, offset, raw.nbytes]
+            copied.append((raw, location))
+            locations.append(location)
+            offset += raw.nbytes
+
+        self.segment: Optional[shared_memory.SharedMemory] = None
+        if offset > 0:
+            self.segment = shared_memory.SharedMemory(create=True, size=offset)
+            segment_buffer = self.segment.buf
+            assert segment_buffer is not None
+            for raw, location in copied:
+                start, nbytes = location[2:]
+                segment_buffer[start : start + nbytes] = raw  # noqa: E203
+                location[:2] = [self.segment.name, offset]
+                locked = _make_read_only(raw.obj)
+                if locked is not None:
+                    self._arrays[id(raw.obj)] = (raw.obj, location, locked)
+        if previous is not None:
+            # arrays not used anymore are made writable
+            _make_writable([a for k, entry in previous._arrays.items() if k not in self._arrays for a in entry[2]])
+            previous._arrays = {}
+
+        segments: Dict[str, Tuple[int, int]] = {}
+        for name, size, _, _ in locations:
+            segments.setdefault(name, (len(segments), size))
+        self.data: Dict[str, Any] = {
+            "payload": payload,
+            "segments": [(name, size) for name, (_, size) in segments.items()],
+            "buffers": [(segments[name][0], start, nbytes) for name, _, start, nbytes in locations],
+        }
+
+    def release(self) -> None:
+        """Method to remove the shared memory segment and make shared arrays writable again."""
+        _make_writable([a for entry in self._arrays.values() for a in entry[2]])
+        self._arrays = {}
+        if self.segment is not None:
+            self.segment.close()
+            self.segment.unlink()
+            self.segment = None
+
+    def __del__(self) -> None:
+        try:
+            self.release()
+        except Exception:
+            pass
+
+
+def _make_read_only(array: Any) -> Optional[List[Any]]:
+    # Numpy array and arrays it is a view of are made read-only. Returns arrays made read-only or None if the data
+    # can be modified otherwise, e.g. a tensor viewed as an array
+    arrays = []
+    base = array
+    while hasattr(base, "setflags") and hasattr(base, "base"):
+        arrays.append(base)
+        base = base.base
+    torch = sys.modules.get("torch")
+    if not arrays or (torch is not None and isinstance(base, torch.Tensor)):
+        return None
+    locked = [a for a in arrays if a.flags.writeable]
+    for a in locked:
+        a.setflags(write=False)
+    return locked
+
+
+def _make_writable(arrays: List[Any]) -> None:
+    # arrays are made writable after the arrays they are views of
+    def _depth(array: Any) -> int:
+        depth = 0
+        while getattr(array, "base", None) is not None:
+            array = array.base
+            depth += 1
+        return depth
+
+    for array in sorted(arrays, key=_depth):
+        try:
+            array.setflags(write=True)
+        except ValueError:
+            # view of an array which is still shared
+            pass
+
+
+def _map_segment(name: str, size: int) -> mmap.mmap:
+    # Segment is mapped without multiprocessing.shared_memory, so that it is not registered in the resource tracker,
+    # which would remove the segment owned by another process. Mapping is removed once buffers are released.
+    if sys.platform == "win32":
+        return mmap.mmap(-1, size, tagname=name, access=mmap.ACCESS_COPY)
+    import _posixshmem
+
+    fd = _posixshmem.shm_open("/" + name.lstrip("/"), os.O_RDONLY, mode=0o600)
+    try:
+        return mmap.mmap(fd, size, access=mmap.ACCESS_COPY)
+    finally:
+        os.close(fd)
+
+
+def load_shared(data: Dict[str, Any]) -> Any:
+    """Method to load an object shared with :class:`SharedBuffers`.
+
+    The shared memory segment is mapped copy-on-write: buffers are not copied and pages are shared between processes
+    until they are modified, modifications are private to the process.
+
+    Args:
+        data: ``data`` attribute of :class:`SharedBuffers`
+
+    Returns:
+        unpickled object
+    """
+    # each segment is mapped once, so that arrays sharing data still share it
+    mapped = [memoryview(_map_segment(name, size)) for name, size in data["segments"]]
+    buffers = [mapped[i][start : start + nbytes] for i, start, nbytes in data["buffers"]]  # noqa: E203
+    return pickle.loads(data["payload"], buffers=buffers)
@@ -0,0 +1,237 @@
+import io
+import mmap
+import os
+import pickle
+import sys
+import tempfile
+import types
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+SNAPSHOT_VERSION = 1
+BUFFERS_SUFFIX = ".buffers"
+# Buffers smaller than this are stored in the pickle stream
+MIN_BUFFER_SIZE = 4096
+_ALIGNMENT = 64
+
+
+def _rebuild_tensor(
+    storage: Any,
+    dtype: Any,
+    size: Tuple[int, ...],
+    stride: Tuple[int, ...],
+    offset: int,
+    requires_grad: bool,
+    kind: str,
+) -> Any:
+    import torch
+
+    # storage is an array of bytes, tensors sharing a storage share the same array
+    tensor = torch.from_numpy(storage).view(dtype).as_strided(size, stride, offset)
+    if kind == "parameter":
+        return torch.nn.Parameter(tensor, requires_grad=requires_grad)
+    return tensor.requires_grad_(requires_grad)
+
+
+class BufferPickler(pickle.Pickler):
+    """Pickler with protocol 5 out-of-band buffers for numpy arrays and CPU tensors.
+
+    Data of numpy arrays (and other objects supporting :class:`pickle.PickleBuffer`) larger than ``min_buffer_size``
+    is passed to ``buffer_callback`` instead of being copied into the pickle stream. CPU tensors (including
+    ``torch.nn.Parameter``) are pickled as views of their storage bytes, so that their data is an out-of-band buffer
+    too and tensors sharing a storage still share it after unpickling. Other tensors are pickled by torch.
+
+    Functions, classes and instances of classes defined in ``exclude_modules`` raise :class:`pickle.PicklingError`,
+    e.g. objects of a configuration module registered in ``sys.modules``: they would be pickled by reference to a
+    module that other processes can not import.
+
+    Args:
+        file: binary file to write to
+        buffer_callback: function called with each out-of-band :class:`pickle.PickleBuffer`
+        min_buffer_size: size in bytes of the smallest out-of-band buffer
+        exclude_modules: names of modules whose objects can not be pickled
+    """
+
+    def __init__(
+        self,
+        file: Any,
+        buffer_callback: Callable[[pickle.PickleBuffer], Any],
+        min_buffer_size: int = MIN_BUFFER_SIZE,
+        exclude_modules: Sequence[str] = (),
+    ) -> None:
+        def _callback(buffer: pickle.PickleBuffer) -> bool:
+            if buffer.raw().nbytes < min_buffer_size:
+                # in-band
+                return True
+            buffer_callback(buffer)
+            return False
+
+        super().__init__(file, protocol=5, buffer_callback=_callback)
+        self._storages: Dict[int, Any] = {}
+        self._exclude_modules = set(exclude_modules)
+
+    def reducer_override(self, obj: Any) -> Any:
+        if self._exclude_modules:
+            is_definition = isinstance(obj, (type, types.FunctionType))
+            module = getattr(obj, "__module__", None) if is_definition else type(obj).__module__
+            if module in self._exclude_modules:
+                raise pickle.PicklingError(f"Can't pickle {obj!r}: it is defined in module '{module}'")
+        torch = sys.modules.get("torch")
+        if torch is None or type(obj) not in (torch.Tensor, torch.nn.Parameter):
+            return NotImplemented
+        if obj.device.type != "cpu" or obj.layout != torch.strided or obj.is_quantized or not hasattr(obj, "is_conj"):
+            return NotImplemented
+        if obj.is_conj() or obj.is_neg() or not hasattr(obj, "untyped_storage"):
+            return NotImplemented
+        storage = obj.untyped_storage()
+        # keep the array alive while pickling: arrays are memoized by id
+        if storage.data_ptr() not in self._storages:
+            self._storages[storage.data_ptr()] = torch.empty(0, dtype=torch.uint8).set_(storage).numpy()
+        kind = "parameter" if isinstance(obj, torch.nn.Parameter) else "tensor"
+        args = (
+            self._storages[storage.data_ptr()],
+            obj.dtype,
+            tuple(obj.size()),
+            tuple(obj.stride()),
+            obj.storage_offset(),
+            obj.requires_grad,
+            kind,
+        )
+        return _rebuild_tensor, args
+
+
+def dumps(
+    obj: Any, min_buffer_size: int = MIN_BUFFER_SIZE, exclude_modules: Sequence[str] = ()
+) -> Tuple[bytes, List[pickle.PickleBuffer]]:
+    """Method to pickle an object with out-of-band buffers, see :class:`BufferPickler`.
+
+    Args:
+        obj: object to pickle
+        min_buffer_size: size in bytes of the smallest out-of-band buffer
+        exclude_modules: names of modules whose objects can not be pickled
+
+    Returns:
+        pickled data and out-of-band buffers, to pass to :func:`pickle.loads` as ``buffers``
+    """
+    buffers: List[pickle.PickleBuffer] = []
+    output = io.BytesIO()
+    BufferPickler(output, buffers.append, min_buffer_size=min_buffer_size, exclude_modules=exclude_modules).dump(obj)
+    return output.getvalue(), buffers
+
+
+def _check_version() -> None:
+    if sys.version_info < (3, 8):
+        raise RuntimeError("Snapshots are not supported on Python versions < 3.8")
+
+
+def _find_unpicklable(values: Mapping[str, Any], exclude_modules: Sequence[str]) -> List[str]:
+    unpicklable = []
+    for key, value in values.items():
+        try:
+            dumps(value, exclude_modules=exclude_modules)
+        except Exception:
+            unpicklable.append(key)
+    return unpicklable
+
+
+def dump_snapshot(
+    filepath: Union[str, Path],
+    values: Mapping[str, Any],
+    state: Optional[Mapping] = None,
+    exclude_modules: Sequence[str] = (),
+) -> List[str]:
+    """Method to write values into a snapshot file and its buffers sidecar file ``<filepath>.buffers``.
+
+    Values are pickled together, so that objects shared between values are shared after loading. Values that can
+    not be pickled are skipped, including values holding functions, classes or instances of classes defined in
+    ``exclude_modules`` (see :class:`BufferPickler`). Data of numpy arrays and CPU tensors is written into the
+    sidecar file which is memory-mapped by :func:`load_snapshot`.
+
+    Args:
+        filepath: output snapshot file path
+        values: mapping of names to values
+        state: optional picklable metadata to store with the values
+        exclude_modules: names of modules whose objects are skipped, e.g. the configuration module
+
+    Returns:
+        names of skipped values
+    """
+    _check_version()
+    values = dict(values)
+    try:
+        payload, buffers = dumps(values, exclude_modules=exclude_modules)
+        skipped: List[str] = []
+    except Exception:
+        skipped = _find_unpicklable(values, exclude_modules)
+        payload, buffers = dumps({k: v for k, v in values.items() if k not in skipped}, exclude_modules=exclude_modules)
+
+    filepath = Path(filepath)
+    filepath.parent.mkdir(parents=True, exist_ok=True)
+    layout: List[Tuple[int, int]] = []
+    buffers_path = filepath.with_name(filepath.name + BUFFERS_SUFFIX)
+    _atomic_write(buffers_path, lambda h: _write_buffers(h, buffers, layout))
+    header = {
+        "version": SNAPSHOT_VERSION,
+        "state": state,
+        "skipped": skipped,
+        "buffers": layout,
+        "buffers_size": layout[-1][0] + layout[-1][1] if layout else 0,
+        "payload": payload,
+    }
+    _atomic_write(filepath, lambda h: pickle.dump(header, h, protocol=pickle.HIGHEST_PROTOCOL))
+    return skipped
+
+
+def _write_buffers(h: Any, buffers: Sequence[pickle.PickleBuffer], layout: List[Tuple[int, int]]) -> None:
+    offset = 0
+    for buffer in buffers:
+        data = buffer.raw()
+        padding = -offset % _ALIGNMENT
+        h.write(b"\0" * padding)
+        offset += padding
+        h.write(data)
+        layout.append((offset, data.nbytes))
+        offset += data.nbytes
+
+
+def _atomic_write(path: Path, write_fn: Callable[[Any], None]) -> None:
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as h:
+            write_fn(h)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def load_snapshot(filepath: Union[str, Path]) -> Dict[str, Any]:
+    """Method to read a snapshot written by :func:`dump_snapshot`.
+
+    The buffers sidecar file is memory-mapped copy-on-write: data of numpy arrays and CPU tensors is read from disk
+    on access and shared between processes loading the same snapshot. Modifications of the loaded arrays are not
+    written to the file.
+
+    Args:
+        filepath: snapshot file path
+
+    Returns:
+        dictionary with keys "values", "state" and "skipped" (names of values that were not stored)
+    """
+    _check_version()
+    filepath = Path(filepath)
+    with filepath.open("rb") as h:
+        header = pickle.load(h)
+    if not isinstance(header, dict) or header.get("version") != SNAPSHOT_VERSION:
+        raise ValueError(f"File '{filepath.as_posix()}' is not a snapshot of version {SNAPSHOT_VERSION}")
+
+    buffers: List[memoryview] = [memoryview(b"") for _ in header["buffers"]]
+    if header["buffers_size"] > 0:
+        buffers_path = filepath.with_name(filepath.name + BUFFERS_SUFFIX)
+        with buffers_path.open("rb") as h:
+            if os.fstat(h.fileno()).st_size != header["buffers_size"]:
+                raise ValueError(f"Buffers file '{buffers_path.as_posix()}' does not match the snapshot")
+            mapped = memoryview(mmap.mmap(h.fileno(), 0, access=mmap.ACCESS_COPY))
+        buffers = [mapped[offset : offset + nbytes] for offset, nbytes in header["buffers"]]  # noqa: E203
+    values = pickle.loads(header["payload"], buffers=buffers)
+    return {"values": values, "state": header["state"], "skipped": header["skipped"]}
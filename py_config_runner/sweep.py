@@ -0,0 +1,320 @@
+import ast
+import itertools
+import json
+import math
+import random
+import traceback
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+from py_config_runner.runner import run_script
+
+
+class Choice:
+    """Parameter taking one of the given values.
+
+    Args:
+        values: sequence of values
+    """
+
+    def __init__(self, values: Sequence) -> None:
+        if len(values) < 1:
+            raise ValueError("Argument values should not be empty")
+        self.values = list(values)
+
+    def from_unit(self, u: float) -> Any:
+        """Method to map a number from [0, 1) to a parameter value"""
+        return self.values[min(int(u * len(self.values)), len(self.values) - 1)]
+
+    def __repr__(self) -> str:
+        return f"Choice({self.values})"
+
+
+class Uniform:
+    """Float parameter uniformly distributed between ``low`` and ``high``.
+
+    Args:
+        low: lower bound
+        high: upper bound
+    """
+
+    def __init__(self, low: float, high: float) -> None:
+        if not low < high:
+            raise ValueError(f"Lower bound should be smaller than upper bound, but given {low} and {high}")
+        self.low = low
+        self.high = high
+
+    def from_unit(self, u: float) -> Any:
+        """Method to map a number from [0, 1) to a parameter value"""
+        return float(self.low + u * (self.high - self.low))
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.low}, {self.high})"
+
+
+class LogUniform(Uniform):
+    """Float parameter log-uniformly distributed between positive ``low`` and ``high``, e.g. a learning rate.
+
+    Args:
+        low: lower bound
+        high: upper bound
+    """
+
+    def __init__(self, low: float, high: float) -> None:
+        super().__init__(low, high)
+        if low <= 0:
+            raise ValueError(f"Lower bound should be positive, but given {low}")
+
+    def from_unit(self, u: float) -> Any:
+        log_low, log_high = math.log(self.low), math.log(self.high)
+        return float(math.exp(log_low + u * (log_high - log_low)))
+
+
+class IntUniform(Uniform):
+    """Integer parameter uniformly distributed between ``low`` and ``high`` (inclusive).
+
+    Args:
+        low: lower bound
+        high: upper bound
+    """
+
+    def from_unit(self, u: float) -> Any:
+        return min(int(self.low + u * (self.high - self.low + 1)), int(self.high))
+
+
+Space = Mapping[str, Union[Sequence, Choice, Uniform]]
+
+
+def _to_distribution(key: str, value: Any) -> Union[Choice, Uniform]:
+    if isinstance(value, (Choice, Uniform)):
+        return value
+    if isinstance(value, Sequence) and not isinstance(value, str):
+        return Choice(value)
+    raise TypeError(f"Parameter '{key}' should be a sequence of values, Choice or Uniform, but given {type(value)}")
+
+
+def grid_points(space: Space) -> List[Dict[str, Any]]:
+    """Method to create all combinations of parameters values.
+
+    Args:
+        space: mapping of config keys to sequences of values or :class:`Choice`
+
+    Returns:
+        list of mutations
+
+    Example:
+
+    .. code-block:: python
+
+        points = grid_points({"learning_rate": [0.1, 0.01], "batch_size": [32, 64]})
+        # [{"learning_rate": 0.1, "batch_size": 32}, {"learning_rate": 0.1, "batch_size": 64}, ...]
+    """
+    values = []
+    for key, value in space.items():
+        dist = _to_distribution(key, value)
+        if not isinstance(dist, Choice):
+            raise ValueError(f"Grid search supports only sequences of values, but given {dist} for '{key}'")
+        values.append(dist.values)
+    return [dict(zip(space.keys(), combination)) for combination in itertools.product(*values)]
+
+
+def random_points(space: Space, num_samples: int, seed: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Method to sample parameters values at random.
+
+    Args:
+        space: mapping of config keys to sequences of values, :class:`Choice`, :class:`Uniform`,
+            :class:`LogUniform` or :class:`IntUniform`
+        num_samples: number of points to sample
+        seed: random seed
+
+    Returns:
+        list of mutations
+    """
+    dists = {key: _to_distribution(key, value) for key, value in space.items()}
+    rng = random.Random(seed)
+    return [{key: dist.from_unit(rng.random()) for key, dist in dists.items()} for _ in range(num_samples)]
+
+
+def sobol_points(space: Space, num_samples: int, seed: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Method to sample parameters values from a Sobol low-discrepancy sequence. Requires scipy.
+
+    Args:
+        space: mapping of config keys to sequences of values, :class:`Choice`, :class:`Uniform`,
+            :class:`LogUniform` or :class:`IntUniform`
+        num_samples: number of points to sample. Sobol sequence is balanced if it is a power of 2.
+        seed: seed of the sequence scrambling. If None, sequence is not scrambled.
+
+    Returns:
+        list of mutations
+    """
+    try:
+        from scipy.stats import qmc
+    except ImportError:
+        raise RuntimeError("Sobol sampling requires scipy to be installed: pip install scipy")
+
+    dists = {key: _to_distribution(key, value) for key, value in space.items()}
+    sampler = qmc.Sobol(d=len(dists), scramble=seed is not None, seed=seed)
+    samples = sampler.random(num_samples)
+    return [{key: dist.from_unit(float(u)) for (key, dist), u in zip(dists.items(), sample)} for sample in samples]
+
+
+def parse_param_spec(spec: str) -> Tuple[str, Union[List, Uniform]]:
+    """Method to parse parameter specification from command line.
+
+    Specification is ``KEY=VALUES``, where ``VALUES`` is either comma-separated values (``lr=0.1,0.01``),
+    ``LOW:HIGH`` for uniform distribution (``momentum=0.8:0.99``), ``log:LOW:HIGH`` for log-uniform
+    distribution (``lr=log:1e-4:1e-1``) or ``int:LOW:HIGH`` for integer uniform distribution (``depth=int:2:8``).
+    Values are parsed as python literals, otherwise as strings. Values with colons are not bounds of a distribution
+    unless the bounds are numbers, e.g. ``device=cuda:0,cuda:1`` or ``device=cuda:0``.
+
+    Args:
+        spec: parameter specification
+
+    Returns:
+        config key and sequence of values or distribution
+    """
+    if "=" not in spec:
+        raise ValueError(f"Parameter specification should be KEY=VALUES, but given '{spec}'")
+    key, values = spec.split("=", 1)
+    key = key.strip()
+    parts = values.split(":")
+    if "," not in values and len(parts) in (2, 3):
+        dist_types = {"log": LogUniform, "int": IntUniform, None: Uniform}
+        prefix = parts[0].strip() if len(parts) == 3 else None
+        bounds = [_parse_value(v) for v in parts[-2:]]
+        if prefix in dist_types and all(isinstance(b, (int, float)) and not isinstance(b, bool) for b in bounds):
+            return key, dist_types[prefix](*bounds)
+    return key, [_parse_value(v) for v in values.split(",")]
+
+
+def _parse_value(value: str) -> Any:
+    value = value.strip()
+    try:
+        return ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        return value
+
+
+def _run_point(
+    script_file: str,
+    config_file: str,
+    index: int,
+    params: Dict[str, Any],
+    output_path: Optional[Path],
+    kwargs: Dict[str, Any],
+    cache: Optional[Union[str, Path]] = None,
+) -> Dict[str, Any]:
+    record: Dict[str, Any] = {
+        "index": index,
+        "params": params,
+        "output_path": None if output_path is None else output_path.as_posix(),
+        "status": "success",
+        "error": None,
+    }
+    if output_path is not None:
+        output_path.mkdir(parents=True, exist_ok=True)
+        with (output_path / "params.json").open("w") as h:
+            json.dump(params, h, indent=2, default=repr)
+        kwargs = dict(kwargs, output_path=output_path)
+
+    try:
+        output = run_script(script_file, config_file, mutations=params, cache=cache, **kwargs)
+        if cache is not None and output.cached:
+            record["status"] = "cached"
+    except (Exception, SystemExit) as e:
+        record["status"] = "failed"
+        record["error"] = traceback.format_exc()
+        if isinstance(e, SystemExit):
+            record["error"] = f"Run exited with code {e.code}\n" + record["error"]
+        if output_path is not None:
+            with (output_path / "error.txt").open("w") as h:
+                h.write(record["error"])
+    return record
+
+
+def run_sweep(
+    script_file: Union[str, Path],
+    config_file: Union[str, Path],
+    points: Sequence[Mapping[str, Any]],
+    jobs: int = 1,
+    executor: str = "process",
+    output_dir: Optional[Union[str, Path]] = None,
+    cache: Optional[Union[str, Path]] = None,
+    **kwargs: Any,
+) -> List[Dict[str, Any]]:
+    """Method to run a script with a configuration mutated by each of given points.
+
+    Each point is run with :meth:`~py_config_runner.runner.run_script` on a pool of processes or threads. Workers
+    are reused between points, so that imports done by the script and the configuration are paid once per worker.
+    A failing run (including a run calling ``sys.exit``) does not stop the sweep: its traceback is recorded in the
+    output.
+
+    Args:
+        script_file: input script filepath. Script should contain ``run(config, **kwargs)`` method.
+        config_file: input configuration filepath
+        points: mutations to apply to the configuration, see :meth:`grid_points`, :meth:`random_points`,
+            :meth:`sobol_points`.
+        jobs: number of parallel workers
+        executor: type of workers: "process" or "thread"
+        output_dir: optional output directory. If provided, each run gets an output directory
+            ``output_dir/run_XXXX`` with ``params.json`` (and ``error.txt`` on failure) passed to ``run`` method as
+            ``output_path`` kwarg. Summary of the sweep is written to ``output_dir/sweep.json``.
+        cache: optional cache directory to memoize finished runs, see :meth:`~py_config_runner.runner.run_script`.
+            Relaunched sweep skips already finished points.
+        kwargs: kwargs to pass to ``run`` method.
+
+    Returns:
+        list of records with keys "index", "params", "output_path", "status" ("success", "cached" or "failed") and
+        "error"
+
+    Example:
+
+    .. code-block:: python
+
+        from py_config_runner.sweep import grid_points, run_sweep
+
+        points = grid_points({"learning_rate": [0.1, 0.01], "batch_size": [32, 64]})
+        records = run_sweep("training.py", "configs/baseline.py", points, jobs=4, output_dir="/tmp/sweep")
+    """
+    pool_types = {"process": ProcessPoolExecutor, "thread": ThreadPoolExecutor}
+    if executor not in pool_types:
+        raise ValueError(f"Argument executor should be one of {list(pool_types)}, but given '{executor}'")
+    if jobs < 1:
+        raise ValueError(f"Argument jobs should be positive, but given {jobs}")
+
+    script_file = Path(script_file).resolve().as_posix()
+    config_file = Path(config_file).resolve().as_posix()
+    output_path = None if output_dir is None else Path(output_dir)
+
+    pool: Executor = pool_types[executor](max_workers=jobs)
+    with pool:
+        futures = []
+        for i, params in enumerate(points):
+            run_output_path = None if output_path is None else output_path / f"run_{i:04d}"
+            future = pool.submit(_run_point, script_file, config_file, i, dict(params), run_output_path, kwargs, cache)
+            futures.append((future, params, run_output_path))
+
+        records = []
+        for i, (future, params, run_output_path) in enumerate(futures):
+            try:
+                records.append(future.result())
+            except KeyboardInterrupt:
+                raise
+            except BaseException:
+                # e.g. worker process crashed
+                records.append(
+                    {
+                        "index": i,
+                        "params": dict(params),
+                        "output_path": None if run_output_path is None else run_output_path.as_posix(),
+                        "status": "failed",
+                        "error": traceback.format_exc(),
+                    }
+                )
+
+    if output_path is not None:
+        output_path.mkdir(parents=True, exist_ok=True)
+        with (output_path / "sweep.json").open("w") as h:
+            json.dump(records, h, indent=2, default=repr)
+    return records
@@ -1,12 +1,23 @@
 import ast
+import hashlib
+import importlib.machinery
+import importlib.util
 import inspect
+import os
 import sys
-from importlib.machinery import SourceFileLoader
+import threading
+import warnings
 
 from collections.abc import MutableMapping
 from pathlib import Path
-from typing import Any, Iterator, Mapping, Dict, Optional, Union
-
+from typing import Any, Iterable, Iterator, List, Mapping, Dict, Optional, Sequence, Union
+
+from py_config_runner.cache import CodeCache, ModuleCache, get_code_cache
+from py_config_runner.graph import StatementExecutor, StatementGraph
+from py_config_runner.memory import memory_report
+from py_config_runner.profiler import StatementProfiler
+from py_config_runner.sharing import SharedBuffers, load_shared
+from py_config_runner.snapshot import dump_snapshot, load_snapshot
 from py_config_runner.deprecated import (
     LOGGING_FORMATTER,
     setup_logger,
@@ -15,11 +26,35 @@ from py_config_runner.deprecated import (
 )
 
 
-def load_module(filepath: Union[str, Path]) -> Any:
+class _CachedSourceLoader(importlib.machinery.SourceFileLoader):
+    # Source loader reading compiled code from the code cache instead of __pycache__ next to the file
+    def __init__(self, fullname: str, path: str, code_cache: CodeCache) -> None:
+        super().__init__(fullname, path)
+        self.code_cache = code_cache
+
+    def get_code(self, fullname: str) -> Any:
+        return self.code_cache.compile_file(self.get_filename(fullname))
+
+
+def load_module(filepath: Union[str, Path], register: bool = True, cache: Optional[ModuleCache] = None) -> Any:
     """Method to load module from file path
 
+    By default, module is registered in ``sys.modules`` under the file name without extension, so that functions and
+    classes defined in the module can be pickled by reference, e.g. when a configuration is sent to spawned
+    processes.
+
+    If ``PY_CONFIG_RUNNER_CACHE_DIR`` environment variable is set, compiled code of the file is stored in the cache
+    directory, see :meth:`~py_config_runner.cache.get_code_cache`.
+
     Args:
         filepath: path to module to load
+        register: if True (default), module is registered in ``sys.modules`` under the file name without extension,
+            replacing a module with the same name. If False, module is isolated: it is registered only while it is
+            executed (e.g. for dataclasses) and the previous module with the same name is restored, so that modules
+            with the same file name do not clash and a module is released once it is not referenced. Note that
+            functions and classes defined in an isolated module can not be pickled by reference.
+        cache: optional :class:`~py_config_runner.cache.ModuleCache` to reuse modules loaded from unmodified files.
+            Cached modules are shared between calls, modifications of their values are visible to next calls.
 
     """
     filepath = Path(filepath)
@@ -29,7 +64,117 @@ def load_module(filepath: Union[str, Path]) -> Any:
     if not filepath.is_file():
         raise ValueError(f"Path '{filepath.as_posix()}' should be a file")
 
-    return SourceFileLoader(filepath.stem, filepath.as_posix()).load_module()  # type: ignore[call-arg]
+    if cache is not None:
+        module = cache.get(filepath)
+        if module is not None:
+            if register:
+                sys.modules[module.__name__] = module
+            return module
+
+    code_cache = get_code_cache()
+    loader = None if code_cache is None else _CachedSourceLoader(filepath.stem, filepath.as_posix(), code_cache)
+    spec = importlib.util.spec_from_file_location(filepath.stem, filepath.as_posix(), loader=loader)
+    if spec is None or spec.loader is None:
+        raise ValueError(f"File '{filepath.as_posix()}' can not be loaded as a python module")
+    module = importlib.util.module_from_spec(spec)
+    previous = sys.modules.get(spec.name)
+    sys.modules[spec.name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        _restore_module(spec.name, previous)
+        raise
+    if not register:
+        _restore_module(spec.name, previous)
+
+    if cache is not None:
+        cache.put(filepath, module)
+    return module
+
+
+def _restore_module(name: str, previous: Any) -> None:
+    if previous is None:
+        sys.modules.pop(name, None)
+    else:
+        sys.modules[name] = previous
+
+
+def find_local_imports(filepath: Union[str, Path], search_paths: Sequence[Union[str, Path]]) -> List[Path]:
+    """Method to find local modules imported by a python file, directly or transitively. Modules are searched
+    statically (without importing them) in ``search_paths``, in order, as python does with ``sys.path``. Modules
+    outside of ``search_paths`` (e.g. installed packages) are ignored.
+
+    Args:
+        filepath: path to python file
+        search_paths: directories to search imported modules in
+
+    Returns:
+        sorted list of paths to imported local modules
+    """
+    dirs = [Path(p).resolve() for p in search_paths]
+    filepath = Path(filepath).resolve()
+    found = {filepath}
+    stack = [filepath]
+    while stack:
+        path = stack.pop()
+        for module_path in _find_imported_modules(path, dirs):
+            if module_path not in found:
+                found.add(module_path)
+                stack.append(module_path)
+    found.remove(filepath)
+    return sorted(found)
+
+
+def _find_imported_modules(filepath: Path, dirs: List[Path]) -> List[Path]:
+    try:
+        tree = ast.parse(filepath.read_bytes())
+    except (OSError, SyntaxError, ValueError):
+        return []
+
+    output = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                output.extend(_resolve_module(alias.name, dirs))
+        elif isinstance(node, ast.ImportFrom):
+            names = [alias.name for alias in node.names if alias.name != "*"]
+            if node.level > 0:
+                # relative import from a package
+                base = filepath.parent
+                for _ in range(node.level - 1):
+                    base = base.parent
+                module = node.module or ""
+                output.extend(_resolve_module(module, [base], names=names))
+            elif node.module is not None:
+                output.extend(_resolve_module(node.module, dirs, names=names))
+    return output
+
+
+def _resolve_module(name: str, dirs: List[Path], names: Sequence[str] = ()) -> List[Path]:
+    # Finds files executed by `import name` or `from name import names`: packages __init__ and module files
+    parts = [p for p in name.split(".") if p]
+    for base in dirs:
+        output = []
+        path = base
+        for part in parts:
+            path = path / part
+            if (path / "__init__.py").is_file():
+                output.append(path / "__init__.py")
+            elif path.with_suffix(".py").is_file():
+                output.append(path.with_suffix(".py"))
+                break
+            elif not path.is_dir():
+                output = []
+                break
+        # `from package import module`
+        for n in names:
+            if (path / n / "__init__.py").is_file():
+                output.append(path / n / "__init__.py")
+            elif (path / f"{n}.py").is_file():
+                output.append(path / f"{n}.py")
+        if output:
+            return output
+    return []
 
 
 class ConfigObject(MutableMapping):
@@ -39,6 +184,34 @@ class ConfigObject(MutableMapping):
         config_filepath: path to python configuration file
         mutations: dict of mutations to apply to the configuration
             python file before loading. See example below.
+        lazy: if True, configuration file is evaluated per key: accessing a key executes only top-level statements
+            required to compute it. See example below.
+        parallel: if True or a number of threads, top-level statements of the configuration file that do not
+            depend on each other are executed concurrently on a thread pool. Statements using a global random state
+            seeded by an expression statement (e.g. ``torch.manual_seed(seed)``) are executed in order, other shared
+            states like a random generator created by an assignment are not ordered. See
+            :class:`~py_config_runner.graph.StatementExecutor` for details.
+        pickle_mode: how the configuration is pickled, e.g. when it is sent to spawned processes. If "state"
+            (default), all configuration values are pickled. If "recipe", only ``config_filepath``, mutations, kwargs
+            and values set or deleted after loading are pickled and the configuration file is executed again on first
+            access in the unpickling process. If "shared_memory", data of numpy arrays and CPU tensors of the loaded
+            configuration is moved into shared memory segments (see :class:`~py_config_runner.sharing.SharedBuffers`)
+            and mapped copy-on-write by unpickling processes instead of being copied. Shared numpy arrays become
+            read-only and are moved once, data of tensors is copied each time the configuration is pickled. Segments
+            are owned by this configuration: they are removed by :meth:`release_shared_memory` or when the
+            configuration is garbage collected. Not loaded configuration is pickled as with "state". See example
+            below.
+        profile: if True or a JSON file path, each top-level statement of the configuration file is profiled with
+            :class:`~py_config_runner.profiler.StatementProfiler` (wall time, import time and memory delta) and
+            the report is available with :meth:`profile_report`. If a path is given, the report is written to it
+            once the configuration is loaded. Can not be combined with ``parallel``. See example below.
+        isolated: if True, the configuration module is not registered in ``sys.modules`` (see ``register`` argument
+            of :meth:`load_module`), so that configuration files with the same name do not clash and the module is
+            released once it is not referenced. Functions and classes defined in the configuration file can not be
+            pickled by reference.
+        module_cache: optional :class:`~py_config_runner.cache.ModuleCache` to reuse the module loaded from the
+            unmodified configuration file, see :meth:`load_module`. Values are shared between configurations using
+            the same cache. Not used with mutations, lazy, parallel or profiled loading.
         kwargs: kwargs to pass to the config object. Note that for colliding keys retained value is
             the one from ``config_filepath``.
 
@@ -95,9 +268,105 @@ class ConfigObject(MutableMapping):
         Mutation can not be a class instance or other complex python object.
         The following **wont** work: ``mutations={"model": MyModel()}``.
 
+    Example with lazy evaluation:
+
+    .. code-block:: python
+
+        # baseline.py configuration file
+
+        seed = 12
+        learning_rate = 0.01
+
+        train_loader = get_train_loader("/path/to/dataset")
+        model = MyModel()
+        optimizer = SGD(model.parameters(), lr=learning_rate)
+
+    .. code-block:: python
+
+        config = ConfigObject("/path/to/baseline.py", lazy=True)
+        # Only `seed = 12` statement is executed
+        print(config.seed)
+        # Statements defining model, learning_rate and optimizer are executed, train_loader is not created
+        print(config.optimizer)
+
+    In lazy mode, statements are assumed to change only names they assign or mutate (e.g. ``x = ...``,
+    ``x.a = ...``, ``x[0] = ...``). Expression statements like ``torch.manual_seed(seed)`` are executed with all
+    statements preceding them and are assumed to modify the names they read, e.g. ``items.append(3)`` is executed
+    to compute ``items``. Iterating over the configuration, checking for a key, modifying or printing the
+    configuration executes all remaining statements.
+
+    Example with parallel execution:
+
+    .. code-block:: python
+
+        # Data loaders and model are created concurrently
+        config = ConfigObject("/path/to/baseline.py", parallel=4)
+        print(config.model)
+
+    Example with recipe pickling:
+
+    .. code-block:: python
+
+        config = ConfigObject("/path/to/baseline.py", mutations=mutations, pickle_mode="recipe")
+        config.output_path = "/tmp/output"
+
+        # Model, optimizer, dataloaders etc are not pickled, each process creates them from the configuration file.
+        # config.output_path is pickled.
+        with idist.Parallel(backend="gloo", nproc_per_node=8) as parallel:
+            parallel.run(training, config)
+
+    Note that with "recipe" pickling mode, configuration file should create the same values in each process, e.g.
+    random seeds should be set before creating models.
+
+    Example with shared memory pickling:
+
+    .. code-block:: python
+
+        # train_dataset.data is a large numpy array
+        config = ConfigObject("/path/to/baseline.py", pickle_mode="shared_memory")
+        config.train_dataset
+
+        # Arrays are copied once into a shared memory segment, spawned processes map it without copying. Arrays are
+        # read-only until the segment is released.
+        with idist.Parallel(backend="gloo", nproc_per_node=8) as parallel:
+            parallel.run(training, config)
+        config.release_shared_memory()
+
+    Example with profiling:
+
+    .. code-block:: python
+
+        config = ConfigObject("/path/to/baseline.py", profile="/tmp/config_profile.json")
+        print(config.model)
+        # Slowest statements first
+        for record in config.profile_report()[:5]:
+            print(record["lineno"], record["wall_time"], record["import_time"], record["statement"])
+
+    Example with prefetching:
+
+    .. code-block:: python
+
+        config = ConfigObject("/path/to/baseline.py")
+        # Configuration is executed in a background thread while the script imports its dependencies
+        config.prefetch()
+        import torch
+        # Waits for the end of the configuration execution
+        print(config.model)
+
     """
 
-    def __init__(self, config_filepath: Union[str, Path], mutations: Optional[Mapping] = None, **kwargs: Any) -> None:
+    def __init__(
+        self,
+        config_filepath: Union[str, Path],
+        mutations: Optional[Mapping] = None,
+        lazy: bool = False,
+        parallel: Union[bool, int] = False,
+        pickle_mode: str = "state",
+        profile: Union[bool, str, Path] = False,
+        isolated: bool = False,
+        module_cache: Optional[ModuleCache] = None,
+        **kwargs: Any,
+    ) -> None:
         if mutations is not None:
             if not (sys.version_info.major >= 3 and sys.version_info.minor >= 7):
                 raise RuntimeError("Mutations are not supported on Python versions < 3.7")
@@ -106,79 +375,481 @@ class ConfigObject(MutableMapping):
 
             mutations = _ConstMutator.to_mutations_ast(mutations)
 
+        if pickle_mode not in ("state", "recipe", "shared_memory"):
+            raise ValueError(
+                f"Argument pickle_mode should be 'state', 'recipe' or 'shared_memory', got '{pickle_mode}'"
+            )
+
+        if profile is not False and parallel:
+            raise ValueError("Arguments profile and parallel can not be used together")
+
         super().__init__()
         self.__dict__["_is_loaded"] = False
         self.__dict__["_mutations"] = mutations
+        self.__dict__["_lazy"] = lazy
+        self.__dict__["_parallel"] = parallel
+        self.__dict__["_executor"] = None
+        self.__dict__["_pickle_mode"] = pickle_mode
+        self.__dict__["_profiler"] = StatementProfiler() if profile is not False else None
+        self.__dict__["_profile_path"] = None if isinstance(profile, bool) else profile
+        self.__dict__["_isolated"] = isolated
+        self.__dict__["_module_cache"] = module_cache
+        # Values set or deleted after loading
+        self.__dict__["_overrides"] = {}
+        self.__dict__["_deleted"] = set()
+        # Values derived from the configuration, e.g. by get_params: key -> (config keys used, value)
+        self.__dict__["_derived_cache"] = {}
+        # Shared memory segments of pickled values: last one and previous ones
+        self.__dict__["_shared_buffers"] = None
+        self.__dict__["_stale_shared_buffers"] = []
+        # Background loading started by prefetch: {"thread": ..., "error": ...}
+        self.__dict__["_prefetch"] = None
+        # Names of values copied into the instance dictionary once loaded, see _set_loaded
+        self.__dict__["_promoted"] = set()
         self.__dict__["__internal_config_object_data_dict__"] = {"config_filepath": config_filepath}
         self.__dict__["__internal_config_object_data_dict__"].update(kwargs)
+        self.__dict__["_init_data"] = dict(self.__dict__["__internal_config_object_data_dict__"])
 
     def __getattr__(self, item: Any) -> Any:
-        self._load_if_not()
+        self._load_if_not(item)
         return self.__internal_config_object_data_dict__[item]
 
     def __setattr__(self, name: str, value: Any) -> None:
-        self._load_if_not()
-        self.__internal_config_object_data_dict__[name] = value
+        self.__setitem__(name, value)
 
     def __len__(self) -> int:
         self._load_if_not()
         return len(self.__internal_config_object_data_dict__)
 
     def __getitem__(self, item: Any) -> Any:
-        self._load_if_not()
+        self._load_if_not(item)
         return self.__internal_config_object_data_dict__[item]
 
     def __setitem__(self, name: Any, value: Any) -> None:
         self._load_if_not()
         self.__internal_config_object_data_dict__[name] = value
+        self.__dict__["_overrides"][name] = value
+        self.__dict__["_deleted"].discard(name)
+        self._promote(name, value)
+        self._invalidate_derived(name)
 
     def __delitem__(self, key) -> None:
         self._load_if_not()
         del self.__internal_config_object_data_dict__[key]
+        self.__dict__["_overrides"].pop(key, None)
+        self.__dict__["_deleted"].add(key)
+        if key in self.__dict__["_promoted"]:
+            self.__dict__["_promoted"].remove(key)
+            del self.__dict__[key]
+        self._invalidate_derived(key)
+
+    def fingerprint(self) -> str:
+        """Method to compute a content fingerprint of the configuration without loading it.
+
+        Fingerprint is a hash of the configuration file source, mutations, kwargs (by their ``repr``) and sources of
+        local modules imported by the configuration file, directly or transitively. Local modules are searched in the
+        current working directory, the configuration file directory and the script directory (if ``script_filepath``
+        was provided) as :meth:`~py_config_runner.runner.run_script` does. Values set after construction are not
+        taken into account.
+
+        Returns:
+            hexadecimal digest
+        """
+        init_data = self.__dict__["_init_data"]
+        cfpath = Path(init_data["config_filepath"])
+        search_paths = [Path(os.getcwd()), cfpath.resolve().parent]
+        if "script_filepath" in init_data:
+            search_paths.append(Path(init_data["script_filepath"]).resolve().parent)
+
+        h = hashlib.sha256(_read_config_source(cfpath).encode("utf-8"))
+        mutations = self.__dict__["_mutations"]
+        if mutations is not None:
+            h.update(_ConstMutator.dump_mutations(mutations).encode("utf-8"))
+        for key in sorted(k for k in init_data if k != "config_filepath"):
+            h.update(f"\0{key}={init_data[key]!r}".encode("utf-8"))
+        # local modules are hashed by content to not depend on their location
+        modules_hashes = sorted(
+            hashlib.sha256(p.read_bytes()).hexdigest() for p in find_local_imports(cfpath, search_paths)
+        )
+        for module_hash in modules_hashes:
+            h.update(module_hash.encode("utf-8"))
+        return h.hexdigest()
+
+    def prefetch(self) -> None:
+        """Method to start loading the configuration in a background thread, e.g. while the script imports its
+        dependencies. Next access to the configuration waits for the end of the loading and raises the exception if
+        the loading failed. Note that the configuration file is executed in another thread, it should not rely on
+        thread-local state, e.g. ``torch.cuda.set_device``.
+        """
+        if self.__dict__["_is_loaded"] or self.__dict__["_prefetch"] is not None:
+            return
+        prefetch: Dict[str, Any] = {"error": None}
+
+        def _load() -> None:
+            try:
+                self._load_if_not()
+            except BaseException as e:
+                prefetch["error"] = e
+
+        prefetch["thread"] = threading.Thread(target=_load, name="py_config_runner-prefetch", daemon=True)
+        self.__dict__["_prefetch"] = prefetch
+        prefetch["thread"].start()
+
+    def _wait_prefetch(self) -> None:
+        prefetch = self.__dict__["_prefetch"]
+        if prefetch is None or prefetch["thread"] is threading.current_thread():
+            return
+        prefetch["thread"].join()
+        self.__dict__["_prefetch"] = None
+        if prefetch["error"] is not None:
+            raise prefetch["error"]
+
+    def profile_report(self, sort_by: str = "wall_time") -> List[Dict[str, Any]]:
+        """Method to get the profile of executed statements of the configuration file. Configuration should be
+        created with ``profile`` argument.
+
+        Args:
+            sort_by: record key to sort by in descending order, e.g. "wall_time", "import_time" or "memory_delta".
+
+        Returns:
+            list of records, see :meth:`~py_config_runner.profiler.StatementProfiler.report`
+        """
+        profiler = self.__dict__["_profiler"]
+        if profiler is None:
+            raise RuntimeError("Configuration is not profiled, please create it with profile=True")
+        return profiler.report(sort_by=sort_by)
+
+    def derive(self, mutations: Mapping) -> "ConfigObject":
+        """Method to create a configuration with additional mutations, reusing values of this configuration.
+
+        Only top-level statements depending, directly or transitively, on mutated names are executed again, see
+        :meth:`~py_config_runner.graph.StatementGraph.affected`. Values computed by other statements are shared with
+        this configuration (not copied). Statements that are not affected are also executed again if their values are
+        required and were not kept, e.g. imports or values rebound later in the configuration file, or if they precede
+        an expression statement executed again (e.g. ``model.to(device)``), as it may modify values in place. Values
+        set or deleted after loading this configuration are set or deleted in the derived configuration. This
+        configuration is loaded if it was not. If the configuration file uses ``global``, ``exec``, ``eval`` and
+        similar, the whole configuration file is executed again.
+
+        Args:
+            mutations: dict of mutations to apply in addition to mutations of this configuration
+
+        Returns:
+            derived configuration
+
+        Example:
+
+        .. code-block:: python
+
+            config = ConfigObject("/path/to/baseline.py")
+            print(config.optimizer)
+            # Optimizer is created again, model and data loaders are reused
+            new_config = config.derive({"learning_rate": 0.05})
+            assert new_config.train_loader is config.train_loader
+
+        """
+        if not isinstance(mutations, Mapping):
+            raise TypeError(f"Argument mutations should be a mapping, got {type(mutations)}")
+        self._load_if_not()
+
+        init_data = dict(self.__dict__["_init_data"])
+        cfpath = Path(init_data.pop("config_filepath"))
+        parent_mutations = self.__dict__["_mutations"] or {}
+        new_mutations = _ConstMutator.to_mutations_ast(mutations)
+        changed = {
+            k
+            for k, v in new_mutations.items()
+            if k not in parent_mutations or ast.dump(v) != ast.dump(parent_mutations[k])
+        }
+        merged_mutations = dict(parent_mutations)
+        merged_mutations.update(new_mutations)
+
+        derived = ConfigObject(
+            cfpath,
+            lazy=self.__dict__["_lazy"],
+            parallel=self.__dict__["_parallel"],
+            pickle_mode=self.__dict__["_pickle_mode"],
+            isolated=self.__dict__["_isolated"],
+            module_cache=self.__dict__["_module_cache"],
+            **init_data,
+        )
+        derived.__dict__["_mutations"] = merged_mutations
+        derived.__dict__["_overrides"] = dict(self.__dict__["_overrides"])
+        derived.__dict__["_deleted"] = set(self.__dict__["_deleted"])
+
+        graph = StatementGraph(_parse_config(cfpath, merged_mutations), cfpath.as_posix())
+        if not graph.is_sliceable or graph.defines_unknown:
+            return derived
+
+        data = self.__internal_config_object_data_dict__
+        unavailable = set(self.__dict__["_overrides"]) | self.__dict__["_deleted"]
+        affected = graph.affected(_ConstMutator.find_mutated(graph.statements, changed))
+
+        def _is_kept(name: str, index: int) -> bool:
+            # value of the name computed by the statement is the final value kept by this configuration
+            return graph.producer(name) == index and name in data and name not in unavailable
+
+        namespace: Dict[str, Any] = {"__name__": cfpath.stem, "__file__": cfpath.as_posix()}
+        parallel = self.__dict__["_parallel"]
+        executor = StatementExecutor(
+            graph, namespace, parallel=bool(parallel), max_workers=None if isinstance(parallel, bool) else parallel
+        )
+        executor.rerun(affected, data, _is_kept)
+
+        derived._update_data(namespace)
+        derived._set_loaded()
+        return derived
+
+    def snapshot(self, filepath: Union[str, Path]) -> List[str]:
+        """Method to write values of the configuration into a snapshot file, see
+        :meth:`~py_config_runner.snapshot.dump_snapshot`. Configuration is loaded if it was not. Data of numpy arrays
+        and CPU tensors is written into the sidecar file ``<filepath>.buffers``, memory-mapped by
+        :meth:`from_snapshot`.
+
+        Values that can not be pickled and values holding functions, classes or instances of classes defined in the
+        configuration file (which can not be imported by other processes) are not stored and are computed again by
+        :meth:`from_snapshot`.
+
+        Args:
+            filepath: output snapshot file path
+
+        Returns:
+            names of values that are not stored
+
+        Example:
+
+        .. code-block:: python
+
+            config = ConfigObject("/path/to/baseline.py")
+            config.snapshot("/tmp/baseline.snapshot")
+
+            # e.g. in another process, datasets are not created again
+            config = ConfigObject.from_snapshot("/tmp/baseline.snapshot")
+            print(config.train_dataset)
+
+        """
+        self._load_if_not()
+        state = {
+            "init_data": self.__dict__["_init_data"],
+            "mutations": self.__dict__["_mutations"],
+            "lazy": self.__dict__["_lazy"],
+            "parallel": self.__dict__["_parallel"],
+            "pickle_mode": self.__dict__["_pickle_mode"],
+            "isolated": self.__dict__["_isolated"],
+            "overrides": list(self.__dict__["_overrides"]),
+            "deleted": self.__dict__["_deleted"],
+            "fingerprint": self.fingerprint(),
+        }
+        cfpath = Path(self.__dict__["_init_data"]["config_filepath"])
+        return dump_snapshot(filepath, self.__internal_config_object_data_dict__, state, exclude_modules=[cfpath.stem])
+
+    @classmethod
+    def from_snapshot(cls, filepath: Union[str, Path]) -> "ConfigObject":
+        """Method to create a loaded configuration from a snapshot written by :meth:`snapshot`.
+
+        Stored values are used as they are and the configuration file is not executed, except for statements
+        computing values that could not be stored and statements depending on them (see :meth:`derive`). If the
+        configuration file was modified since the snapshot, a warning is emitted as these values are computed from
+        the modified file.
+
+        Args:
+            filepath: snapshot file path
+
+        Returns:
+            loaded configuration
+        """
+        snapshot = load_snapshot(filepath)
+        values, state, skipped = snapshot["values"], snapshot["state"], snapshot["skipped"]
+        init_data = dict(state["init_data"])
+        cfpath = Path(init_data.pop("config_filepath"))
+        config = cls(
+            cfpath,
+            lazy=state["lazy"],
+            parallel=state["parallel"],
+            pickle_mode=state["pickle_mode"],
+            isolated=state.get("isolated", False),
+            **init_data,
+        )
+        config.__dict__["_mutations"] = state["mutations"]
+        config.__dict__["_overrides"] = {k: values[k] for k in state["overrides"] if k in values}
+        config.__dict__["_deleted"] = set(state["deleted"])
+
+        lost_overrides = [k for k in state["overrides"] if k not in values]
+        if lost_overrides:
+            warnings.warn(f"Values {lost_overrides} set after loading the configuration could not be restored")
+        if not skipped:
+            config._update_data(values)
+            config._set_loaded()
+            return config
+
+        if config.fingerprint() != state["fingerprint"]:
+            warnings.warn(
+                f"Configuration file '{cfpath.as_posix()}' was modified since the snapshot, values {skipped} are "
+                "computed from the modified file"
+            )
+        graph = StatementGraph(_parse_config(cfpath, state["mutations"]), cfpath.as_posix())
+        if not graph.is_sliceable or graph.defines_unknown:
+            # whole configuration file is executed on access
+            return config
+
+        produced = [graph.producer(name) for name in skipped]
+        affected = graph.affected(i for i in produced if i is not None)
+
+        def _is_kept(name: str, index: int) -> bool:
+            return graph.producer(name) == index and name in values
+
+        namespace: Dict[str, Any] = {"__name__": cfpath.stem, "__file__": cfpath.as_posix()}
+        executor = StatementExecutor(graph, namespace)
+        executor.rerun(affected, values, _is_kept)
+        config._update_data(namespace)
+        config._set_loaded()
+        return config
+
+    def memory_report(self) -> List[Dict[str, Any]]:
+        """Method to estimate memory retained by each value of the configuration. Configuration is loaded if it was
+        not.
+
+        Returns:
+            list of records sorted by size, see :meth:`~py_config_runner.memory.memory_report`
+
+        Example:
+
+        .. code-block:: python
+
+            config = ConfigObject("/path/to/baseline.py")
+            for record in config.memory_report()[:5]:
+                print(record["key"], record["size"], record["exclusive_size"], record["shared_with"])
+
+        """
+        self._load_if_not()
+        return memory_report(self.__internal_config_object_data_dict__)
+
+    def _get_derived(self, key: Any) -> Any:
+        # Returns a value derived from the configuration, or None if it is not cached
+        entry = self.__dict__["_derived_cache"].get(key)
+        return None if entry is None else entry[1]
+
+    def _set_derived(self, key: Any, config_keys: Iterable, value: Any) -> None:
+        # Caches a value derived from given configuration keys. It is invalidated when one of them is set or deleted
+        self.__dict__["_derived_cache"][key] = (frozenset(config_keys), value)
+
+    def release_shared_memory(self) -> None:
+        """Method to remove shared memory segments created when pickling the configuration with "shared_memory"
+        pickle mode and make shared arrays writable again. Processes having unpickled the configuration keep their
+        mapping, configuration pickled after the call creates a new segment.
+        """
+        for shared in self.__dict__["_stale_shared_buffers"] + [self.__dict__["_shared_buffers"]]:
+            if shared is not None:
+                shared.release()
+        self.__dict__["_shared_buffers"] = None
+        self.__dict__["_stale_shared_buffers"] = []
+
+    def _invalidate_derived(self, name: Any) -> None:
+        cache = self.__dict__["_derived_cache"]
+        for key in [k for k, (config_keys, _) in cache.items() if name in config_keys]:
+            del cache[key]
 
     def __iter__(self) -> Iterator:
         self._load_if_not()
         return iter(self.__internal_config_object_data_dict__)
 
     def get(self, item: Any, default_value: Optional[Any] = None) -> Any:
-        self._load_if_not()
+        self._load_if_not(item)
         return self.__internal_config_object_data_dict__.get(item, default_value)
 
     def __contains__(self, item: Any) -> bool:
         self._load_if_not()
         return item in self.__internal_config_object_data_dict__
 
-    def _load_if_not(self) -> None:
+    def _load_if_not(self, key: Optional[Any] = None) -> None:
+        if self.__dict__["_is_loaded"]:
+            return
+        self._wait_prefetch()
         if self.__dict__["_is_loaded"]:
             return
+        if self.__dict__["_lazy"] or self.__dict__["_parallel"] or self.__dict__["_profiler"] is not None:
+            self._load_statements(key)
+            return
         cfpath = self.__internal_config_object_data_dict__["config_filepath"]
         mutations = self.__dict__["_mutations"]
         if mutations is None or len(mutations) < 1:
-            mod_obj = load_module(cfpath)
+            mod_obj = load_module(cfpath, register=not self.__dict__["_isolated"], cache=self.__dict__["_module_cache"])
             _config = mod_obj.__dict__
         else:
             _config = self._apply_mutations_and_load(cfpath, mutations)
 
+        self._update_data(_config)
+        self._set_loaded()
+
+    def _update_data(self, _config: Mapping) -> None:
         config_dict = {k: v for k, v in _config.items() if not (k.startswith("__") or inspect.ismodule(v))}
-        self.__internal_config_object_data_dict__.update(config_dict)
+        data = self.__internal_config_object_data_dict__
+        data.update(config_dict)
+        # Values set or deleted before pickling with "recipe" mode
+        data.update(self.__dict__["_overrides"])
+        for key in self.__dict__["_deleted"]:
+            data.pop(key, None)
+
+    def _set_loaded(self) -> None:
+        # Values are copied into the instance dictionary, so that attribute access of a loaded configuration is a
+        # plain attribute lookup without __getattr__ call
+        for name, value in self.__internal_config_object_data_dict__.items():
+            self._promote(name, value)
         self.__dict__["_is_loaded"] = True
 
+    def _promote(self, name: Any, value: Any) -> None:
+        # Internal attributes and methods keep precedence over configuration values, as with __getattr__
+        promoted = self.__dict__["_promoted"]
+        if name in promoted or (isinstance(name, str) and name not in self.__dict__ and not hasattr(type(self), name)):
+            self.__dict__[name] = value
+            promoted.add(name)
+
+    def _load_statements(self, key: Optional[Any] = None) -> None:
+        executor = self.__dict__["_executor"]
+        if executor is None:
+            cfpath = Path(self.__internal_config_object_data_dict__["config_filepath"])
+            graph = StatementGraph(_parse_config(cfpath, self.__dict__["_mutations"]), cfpath.as_posix())
+            namespace = {"__name__": cfpath.stem, "__file__": cfpath.as_posix()}
+            parallel = self.__dict__["_parallel"]
+            max_workers = None if isinstance(parallel, bool) else parallel
+            executor = StatementExecutor(
+                graph, namespace, parallel=bool(parallel), max_workers=max_workers, profiler=self.__dict__["_profiler"]
+            )
+            self.__dict__["_executor"] = executor
+
+        if isinstance(key, str) and self.__dict__["_lazy"]:
+            if not executor.graph.binds(key):
+                # key is not defined by the configuration file, e.g. config_filepath, kwargs or missing key
+                return
+            executed = executor.run_for([key])
+        else:
+            executed = executor.run_all()
+
+        if executed:
+            self._update_data(executor.namespace)
+        if executor.done:
+            self._set_loaded()
+            self.__dict__["_executor"] = None
+            if self.__dict__["_profile_path"] is not None:
+                config_filepath = self.__dict__["_init_data"]["config_filepath"]
+                self.__dict__["_profiler"].dump(self.__dict__["_profile_path"], config_filepath=config_filepath)
+
     def _apply_mutations_and_load(self, filepath: Union[str, Path], mutations: Mapping) -> Mapping:
         filepath = Path(filepath)
-        if not filepath.exists():
-            raise ValueError(f"File '{filepath.as_posix()}' is not found")
-
-        if not filepath.is_file():
-            raise ValueError(f"Path '{filepath.as_posix()}' should be a file")
+        config_source = _read_config_source(filepath)
 
-        with filepath.open("r") as h:
-            config_source = h.read()
+        # Compiled mutated config is cached on disk if PY_CONFIG_RUNNER_CACHE_DIR is set
+        code_cache = get_code_cache()
+        compiled_obj = None
+        if code_cache is not None:
+            cache_key = code_cache.make_key(config_source.encode("utf-8"), _ConstMutator.dump_mutations(mutations))
+            compiled_obj = code_cache.get(cache_key)
 
-        ast_obj = ast.parse(config_source)
-        mutator = _ConstMutator(mutations)
-        mutator.visit(ast_obj)
-        mutator.validate()
-        compiled_obj = compile(ast_obj, "<string>", "exec")
+        if compiled_obj is None:
+            ast_obj = _parse_config(filepath, mutations, config_source)
+            compiled_obj = compile(ast_obj, "<string>", "exec")
+            if code_cache is not None:
+                code_cache.put(cache_key, compiled_obj)
 
         config: Dict[str, Any] = {}
         # Config is passed as globals
@@ -195,11 +866,70 @@ class ConfigObject(MutableMapping):
         return "\n".join(output)
 
     def __getstate__(self):
+        self._wait_prefetch()
         state = self.__dict__.copy()
+        # Promoted values are copied again from the data dict when unpickled
+        for name in state["_promoted"]:
+            del state[name]
+        state["_promoted"] = set()
+        # Partially evaluated lazy config is evaluated again in another process
+        state["_executor"] = None
+        state["_derived_cache"] = {}
+        # Module cache is local to the process
+        state["_module_cache"] = None
+        state["_shared_buffers"] = None
+        state["_stale_shared_buffers"] = []
+        if state["_pickle_mode"] == "shared_memory" and state["_is_loaded"]:
+            # values are pickled again as they may have been modified in place, shared arrays are not copied again
+            values = {"data": state["__internal_config_object_data_dict__"], "overrides": state["_overrides"]}
+            previous = self.__dict__["_shared_buffers"]
+            shared = SharedBuffers(values, previous=previous)
+            # previous segment is kept until released: it can still be mapped by spawned processes
+            if previous is not None and previous.segment is not None:
+                self.__dict__["_stale_shared_buffers"].append(previous)
+            self.__dict__["_shared_buffers"] = shared
+            state["_shared_data"] = shared.data
+            state["__internal_config_object_data_dict__"] = None
+            state["_overrides"] = None
+        if state["_pickle_mode"] == "recipe":
+            state["_is_loaded"] = False
+            if state["_profiler"] is not None:
+                state["_profiler"] = StatementProfiler(state["_profiler"].trace_memory)
+            state["__internal_config_object_data_dict__"] = dict(state["_init_data"])
         return state
 
     def __setstate__(self, state):
+        shared_data = state.pop("_shared_data", None)
+        if shared_data is not None:
+            values = load_shared(shared_data)
+            state["__internal_config_object_data_dict__"] = values["data"]
+            state["_overrides"] = values["overrides"]
         self.__dict__.update(state)
+        if self.__dict__["_is_loaded"]:
+            self._set_loaded()
+
+
+def _read_config_source(filepath: Path) -> str:
+    if not filepath.exists():
+        raise ValueError(f"File '{filepath.as_posix()}' is not found")
+
+    if not filepath.is_file():
+        raise ValueError(f"Path '{filepath.as_posix()}' should be a file")
+
+    with filepath.open("r") as h:
+        return h.read()
+
+
+def _parse_config(filepath: Path, mutations: Optional[Mapping], config_source: Optional[str] = None) -> ast.Module:
+    if config_source is None:
+        config_source = _read_config_source(filepath)
+
+    ast_obj = ast.parse(config_source)
+    if mutations is not None and len(mutations) > 0:
+        mutator = _ConstMutator(mutations)
+        mutator.visit(ast_obj)
+        mutator.validate()
+    return ast_obj
 
 
 class _ConstMutator(ast.NodeTransformer):
@@ -223,6 +953,22 @@ class _ConstMutator(ast.NodeTransformer):
             output[key] = value_ast.body[0].value  # type: ignore[attr-defined]
         return output
 
+    @staticmethod
+    def find_mutated(statements: Iterable[Any], names: Iterable[str]) -> List[int]:
+        # indices of statements whose value is replaced by a mutation of one of the names, see visit_Assign
+        names = set(names)
+        output = []
+        for stmt in statements:
+            node = stmt.node
+            if isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+                if node.targets[0].id in names:
+                    output.append(stmt.index)
+        return output
+
+    @staticmethod
+    def dump_mutations(mutations_ast: Mapping) -> str:
+        return "\n".join(f"{key}={ast.dump(value)}" for key, value in sorted(mutations_ast.items()))
+
     def __init__(self, mutations_ast: Mapping):
         self.mutations = mutations_ast
         self._used_mutations = set(self.mutations)
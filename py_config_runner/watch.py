@@ -0,0 +1,207 @@
+import ast
+import asyncio
+import difflib
+import inspect
+import time
+import traceback
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Union
+
+from py_config_runner.graph import StatementExecutor, StatementGraph
+from py_config_runner.runner import _load_run, _local_modules
+from py_config_runner.utils import ConfigObject, _parse_config, _read_config_source
+
+
+def diff_statements(old_graph: StatementGraph, new_graph: StatementGraph) -> Dict[int, int]:
+    """Method to match unchanged top-level statements of two versions of a configuration module.
+
+    Statements are compared by their AST (ignoring formatting, comments and line numbers). A matched statement is
+    considered changed if it depends on values of different statements, e.g. if a name it reads is bound by another
+    statement.
+
+    Args:
+        old_graph: statement graph of the previous version
+        new_graph: statement graph of the new version
+
+    Returns:
+        mapping of indices of unchanged statements in the new version to their indices in the previous version
+    """
+    old_dumps = [ast.dump(s.node) for s in old_graph.statements]
+    new_dumps = [ast.dump(s.node) for s in new_graph.statements]
+    matcher = difflib.SequenceMatcher(a=old_dumps, b=new_dumps, autojunk=False)
+    matched = {}
+    for block in matcher.get_matching_blocks():
+        for k in range(block.size):
+            matched[block.b + k] = block.a + k
+
+    output = {}
+    for new_index, old_index in matched.items():
+        deps = {matched.get(i) for i in new_graph.data_dependencies[new_index]}
+        if deps == old_graph.data_dependencies[old_index]:
+            output[new_index] = old_index
+    return output
+
+
+class ConfigWatcher:
+    """Keeps a loaded configuration up to date with its configuration file.
+
+    When the configuration file changes, :meth:`reload` executes only new or modified top-level statements and the
+    statements depending on them (see :meth:`diff_statements` and
+    :meth:`~py_config_runner.graph.StatementGraph.affected`). Values of other statements are reused: e.g. a dataset
+    is not loaded again if only the optimizer definition changed. Note that values are reused as they are, including
+    in-place modifications made by the script, e.g. a model trained by the previous run.
+
+    Args:
+        config_filepath: path to python configuration file
+        mutations: dict of mutations to apply to the configuration, see :class:`~py_config_runner.ConfigObject`.
+        kwargs: kwargs to pass to the config object.
+
+    Example:
+
+    .. code-block:: python
+
+        watcher = ConfigWatcher("configs/baseline.py")
+        run(watcher.config)
+        while True:
+            if watcher.changed():
+                print("Recomputed:", watcher.reload())
+                run(watcher.config)
+            time.sleep(0.5)
+
+    """
+
+    def __init__(self, config_filepath: Union[str, Path], mutations: Optional[Mapping] = None, **kwargs: Any) -> None:
+        self.config_filepath = Path(config_filepath)
+        self._kwargs = kwargs
+        self.config = ConfigObject(self.config_filepath, mutations=mutations, **kwargs)
+        self._source = _read_config_source(self.config_filepath)
+        self._failed_source: Optional[str] = None
+
+    def changed(self) -> bool:
+        """Method to check whether the configuration file was modified since the last load (or the last failed
+        reload).
+        """
+        try:
+            source = _read_config_source(self.config_filepath)
+        except (OSError, ValueError):
+            # e.g. file is being replaced by the editor
+            return False
+        return source != self._source and source != self._failed_source
+
+    def reload(self) -> List[str]:
+        """Method to update the configuration from the modified configuration file. If execution of the
+        configuration fails, the current configuration is kept.
+
+        Returns:
+            names bound by new or modified statements and statements depending on them
+        """
+        config = self.config
+        try:
+            config._load_if_not()
+            is_loaded = True
+        except Exception:
+            # previous version is broken, new version is executed entirely
+            is_loaded = False
+        new_source = _read_config_source(self.config_filepath)
+        try:
+            return self._reload(config, new_source, is_loaded)
+        except BaseException:
+            self._failed_source = new_source
+            raise
+
+    def _reload(self, config: ConfigObject, new_source: str, is_loaded: bool) -> List[str]:
+        mutations = config.__dict__["_mutations"]
+        filename = self.config_filepath.as_posix()
+        old_graph = StatementGraph(_parse_config(self.config_filepath, mutations, self._source), filename)
+        new_graph = StatementGraph(_parse_config(self.config_filepath, mutations, new_source), filename)
+
+        new_config = ConfigObject(self.config_filepath, **self._kwargs)
+        new_config.__dict__["_mutations"] = mutations
+        if not (is_loaded and new_graph.is_sliceable and not new_graph.defines_unknown):
+            new_config._load_if_not()
+            self.config, self._source = new_config, new_source
+            return [n for s in new_graph.statements for n in s.defined_names]
+
+        unchanged = diff_statements(old_graph, new_graph)
+        affected = new_graph.affected(i for i in range(len(new_graph)) if i not in unchanged)
+        data = config.__internal_config_object_data_dict__
+        unavailable = set(config.__dict__["_overrides"]) | config.__dict__["_deleted"]
+
+        def _is_kept(name: str, index: int) -> bool:
+            if index not in unchanged or new_graph.producer(name) != index:
+                return False
+            return old_graph.producer(name) == unchanged[index] and name in data and name not in unavailable
+
+        namespace: Dict[str, Any] = {"__name__": self.config_filepath.stem, "__file__": filename}
+        executor = StatementExecutor(new_graph, namespace)
+        executor.rerun(affected, data, _is_kept)
+        new_config._update_data(namespace)
+        new_config._set_loaded()
+        self.config, self._source = new_config, new_source
+        return [n for i in affected for n in new_graph.statements[i].defined_names]
+
+
+def watch(
+    script_file: Union[str, Path],
+    config_file: Union[str, Path],
+    mutations: Optional[Mapping] = None,
+    poll_interval: float = 0.5,
+    max_runs: Optional[int] = None,
+    **kwargs: Any,
+) -> None:
+    """Method to run experiment (defined by a script file) again each time the configuration or the script file is
+    modified. Interpreter, imported modules and configuration values are kept between runs: only modified statements
+    of the configuration and statements depending on them are executed again, see :class:`ConfigWatcher`. Script
+    file is loaded again before each run. Errors are printed and do not stop watching.
+
+    Args:
+        script_file: input script filepath. Script should contain ``run(config, **kwargs)`` method.
+        config_file: input configuration filepath
+        mutations: dict of mutations to apply to the configuration, see :class:`~py_config_runner.ConfigObject`.
+        poll_interval: interval in seconds between checks of files modifications
+        max_runs: optional maximum number of runs, by default, runs until interrupted.
+        kwargs: kwargs to pass to ``run`` method.
+
+    Example:
+
+    .. code-block:: bash
+
+        py_config_runner --watch scripts/training.py configs/baseline.py
+
+    """
+    script_filepath = Path(script_file)
+    config_filepath = Path(config_file)
+    with _local_modules(script_filepath, config_filepath) as finder:
+        watcher = ConfigWatcher(config_filepath, mutations=mutations, script_filepath=script_filepath)
+
+        num_runs = 0
+        while True:
+            script_mtime = script_filepath.stat().st_mtime_ns
+            # modified files can import new local modules
+            finder.invalidate_caches()
+            try:
+                run_fn = _load_run(script_filepath)
+                if inspect.iscoroutinefunction(run_fn):
+                    asyncio.run(run_fn(watcher.config, **kwargs))
+                else:
+                    run_fn(watcher.config, **kwargs)
+            except Exception:
+                traceback.print_exc()
+            num_runs += 1
+            if max_runs is not None and num_runs >= max_runs:
+                return
+
+            print(f"Watching {config_filepath.as_posix()} and {script_filepath.as_posix()} for changes", flush=True)
+            while True:
+                time.sleep(poll_interval)
+                if watcher.changed():
+                    try:
+                        names = watcher.reload()
+                    except Exception:
+                        # wait for the next modification
+                        traceback.print_exc()
+                        continue
+                    print(f"Configuration changed, recomputed: {', '.join(names)}", flush=True)
+                    break
+                if script_filepath.stat().st_mtime_ns != script_mtime:
+                    break
@@ -0,0 +1,231 @@
+import marshal
+import sys
+
+import pytest
+
+from py_config_runner import ConfigObject
+from py_config_runner import load_module
+from py_config_runner.cache import CodeCache, ModuleCache, RunCache, get_code_cache
+
+
+def test_code_cache_get_put(dirname):
+    cache = CodeCache(dirname)
+    key = cache.make_key(b"a = 1")
+    assert cache.get(key) is None
+
+    code = compile("a = 1", "<string>", "exec")
+    cache.put(key, code)
+    assert cache.get(key) == code
+
+    assert cache.make_key(b"a = 1") == key
+    assert cache.make_key(b"a = 1", "a=2") != key
+    assert cache.make_key(b"a = 2") != key
+
+    cache.clear()
+    assert cache.get(key) is None
+
+
+def test_code_cache_corrupted_entry(dirname):
+    cache = CodeCache(dirname)
+    key = cache.make_key(b"a = 1")
+    cache.put(key, compile("a = 1", "<string>", "exec"))
+
+    (dirname / "code" / f"{key}.bin").write_bytes(b"corrupted")
+    assert cache.get(key) is None
+    assert not (dirname / "code" / f"{key}.bin").exists()
+
+
+def test_code_cache_eviction(dirname):
+    code = compile("a = 1", "<string>", "exec")
+    entry_size = len(marshal.dumps(code))
+    cache = CodeCache(dirname, max_size=3 * entry_size)
+
+    keys = [cache.make_key(b"a = 1", str(i)) for i in range(5)]
+    for key in keys:
+        cache.put(key, code)
+
+    assert len(list((dirname / "code").glob("*.bin"))) == 3
+    assert cache.get(keys[-1]) is not None
+
+
+def test_get_code_cache(dirname, monkeypatch):
+    monkeypatch.delenv("PY_CONFIG_RUNNER_CACHE_DIR", raising=False)
+    assert get_code_cache() is None
+
+    monkeypatch.setenv("PY_CONFIG_RUNNER_CACHE_DIR", dirname.as_posix())
+    monkeypatch.setenv("PY_CONFIG_RUNNER_CACHE_MAX_SIZE", "1000")
+    cache = get_code_cache()
+    assert isinstance(cache, CodeCache)
+    assert cache.cache_dir == dirname
+    assert cache.max_size == 1000
+    assert cache.validation == "timestamp"
+
+    monkeypatch.setenv("PY_CONFIG_RUNNER_CACHE_VALIDATION", "hash")
+    assert get_code_cache().validation == "hash"
+
+    monkeypatch.setenv("PY_CONFIG_RUNNER_CACHE_VALIDATION", "abc")
+    with pytest.raises(ValueError, match=r"Argument validation should be 'timestamp' or 'hash'"):
+        get_code_cache()
+
+
+@pytest.mark.parametrize("validation", ["timestamp", "hash"])
+def test_load_module_cached(dirname, monkeypatch, validation):
+    import os
+
+    cache_dir = dirname / "cache"
+    monkeypatch.setenv("PY_CONFIG_RUNNER_CACHE_DIR", cache_dir.as_posix())
+    monkeypatch.setenv("PY_CONFIG_RUNNER_CACHE_VALIDATION", validation)
+
+    filepath = dirname / "cached_module.py"
+    filepath.write_text("value = 1\n")
+    module = load_module(filepath)
+    assert module.value == 1
+    assert module.__file__ == filepath.as_posix()
+    assert len(list((cache_dir / "code").glob("*.bin"))) == 1
+
+    def fail_compile(*args, **kwargs):
+        raise AssertionError("Module should not be compiled")
+
+    monkeypatch.setattr("builtins.compile", fail_compile)
+    assert load_module(filepath).value == 1
+    monkeypatch.undo()
+    monkeypatch.setenv("PY_CONFIG_RUNNER_CACHE_DIR", cache_dir.as_posix())
+    monkeypatch.setenv("PY_CONFIG_RUNNER_CACHE_VALIDATION", validation)
+
+    # Content is modified, but the modification time and the size are kept
+    st = os.stat(filepath)
+    filepath.write_text("value = 2\n")
+    os.utime(filepath, ns=(st.st_atime_ns, st.st_mtime_ns))
+    assert load_module(filepath).value == (1 if validation == "timestamp" else 2)
+
+    # Modified file is compiled again
+    filepath.write_text("value = 30\n")
+    assert load_module(filepath).value == 30
+    assert len(list((cache_dir / "code").glob("*.bin"))) == (2 if validation == "timestamp" else 3)
+
+
+def test_config_object_mutations_cached(dirname, config_filepath, monkeypatch):
+    cache_dir = dirname / "cache"
+    monkeypatch.setenv("PY_CONFIG_RUNNER_CACHE_DIR", cache_dir.as_posix())
+
+    config = ConfigObject(config_filepath, mutations={"a": 10})
+    assert config.a == 10
+    entries = list((cache_dir / "code").glob("*.bin"))
+    assert len(entries) == 1
+
+    from py_config_runner.utils import _ConstMutator
+
+    def fail_visit(*args, **kwargs):
+        raise AssertionError("Config should not be mutated")
+
+    monkeypatch.setattr(_ConstMutator, "visit", fail_visit)
+    config = ConfigObject(config_filepath, mutations={"a": 10})
+    assert config.a == 10
+    assert config.b == 2
+
+    with pytest.raises(AssertionError, match=r"should not be mutated"):
+        ConfigObject(config_filepath, mutations={"a": 11}).a
+
+
+def test_run_cache(dirname):
+    cache = RunCache(dirname / "cache")
+    assert cache.get("abc") is None
+
+    output_path = dirname / "output"
+    (output_path / "sub").mkdir(parents=True)
+    (output_path / "sub" / "model.pt").write_bytes(b"1234")
+
+    record = cache.put("abc", [1, 2, 3], artifacts_dir=output_path)
+    assert not record.cached
+    assert record.manifest["files"] == [{"path": "sub/model.pt", "size": 4}]
+
+    # Records are stored on disk
+    record = RunCache(dirname / "cache").get("abc")
+    assert record.cached
+    assert record.result == [1, 2, 3]
+    assert record.manifest["root"] == output_path.resolve().as_posix()
+    assert cache.keys() == ["abc"]
+
+    (output_path / "sub" / "model.pt").unlink()
+    assert cache.get("abc") is None
+
+    with pytest.warns(UserWarning, match=r"can not be pickled"):
+        cache.put("def", lambda x: x)
+    assert cache.get("def").result is None
+
+    cache.remove("def")
+    assert cache.keys() == ["abc"]
+
+
+def test_run_cache_closes_connections(dirname, monkeypatch):
+    import sqlite3
+
+    connections = []
+
+    def _connect(*args, **kwargs):
+        connections.append(sqlite3_connect(*args, **kwargs))
+        return connections[-1]
+
+    sqlite3_connect = sqlite3.connect
+    monkeypatch.setattr(sqlite3, "connect", _connect)
+    cache = RunCache(dirname / "cache")
+    cache.put("abc", 1)
+    assert cache.get("abc").result == 1
+    assert cache.keys() == ["abc"]
+    cache.remove("abc")
+    assert len(connections) == 5
+    for conn in connections:
+        with pytest.raises(sqlite3.ProgrammingError, match=r"closed"):
+            conn.execute("SELECT 1")
+
+
+def test_module_cache(dirname):
+    import os
+
+    cache = ModuleCache(max_size=10 * 1024 * 1024)
+    paths = []
+    for i in range(3):
+        path = dirname / f"module_{i}.py"
+        path.write_text(f"import numpy as np\nvalue = {i}\ndata = np.zeros(500 * 1024, dtype='uint8')\n")
+        paths.append(path)
+
+    module = load_module(paths[0], cache=cache)
+    assert load_module(paths[0], cache=cache) is module
+    assert len(cache) == 1
+    assert 500 * 1024 <= cache.size < 600 * 1024
+
+    # Modified file is loaded again
+    paths[0].write_text("value = 10\n")
+    st = os.stat(paths[0])
+    os.utime(paths[0], ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    module2 = load_module(paths[0], cache=cache)
+    assert module2 is not module
+    assert module2.value == 10
+    assert cache.size < 1024
+
+    # Least recently used modules are evicted
+    cache.max_size = 700 * 1024
+    load_module(paths[1], cache=cache)
+    load_module(paths[0], cache=cache)
+    load_module(paths[2], cache=cache)
+    assert cache.get(paths[0]) is module2
+    assert cache.get(paths[1]) is None
+    assert cache.get(paths[2]).value == 2
+
+    # Module larger than the cache is not stored
+    cache.max_size = 1024
+    cache.clear()
+    load_module(paths[1], cache=cache)
+    assert len(cache) == 0 and cache.size == 0
+    assert "module_1" not in sys.modules
+
+    # Evicted module is unregistered
+    cache.max_size = 700 * 1024
+    module = load_module(paths[1], cache=cache)
+    assert sys.modules["module_1"] is module
+    module = load_module(paths[2], cache=cache)
+    assert cache.get(paths[1]) is None
+    assert "module_1" not in sys.modules
+    assert sys.modules["module_2"] is module
+    cache.clear()
+    assert "module_2" not in sys.modules
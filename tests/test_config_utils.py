@@ -97,3 +97,118 @@ def test_get_params_training(config_filepath):
     assert params.get("model", None) in str(config["model"])
     assert params.get("criterion", None) in str(config["criterion"])
     assert params.get("optimizer", None) == config["optimizer"]
+
+
+def test_import_does_not_import_torch(dirname):
+    import os
+    import subprocess
+    import sys
+    from pathlib import Path
+
+    # stub package, so that torch is found even if it is not installed
+    (dirname / "torch").mkdir()
+    (dirname / "torch" / "__init__.py").write_text("")
+    root = Path(__file__).resolve().parents[1]
+    python_path = [dirname.as_posix(), root.as_posix(), os.environ.get("PYTHONPATH", "")]
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(p for p in python_path if p))
+
+    code = "import sys; import py_config_runner; assert 'torch' not in sys.modules, 'torch is imported'"
+    subprocess.run([sys.executable, "-c", code], check=True, env=env)
+    code = "import importlib.util; assert importlib.util.find_spec('torch') is not None"
+    subprocess.run([sys.executable, "-c", code], check=True, env=env)
+
+
+@pytest.mark.skipif(not has_torch, reason="No torch installed")
+def test_lazy_torch_schemas():
+    import py_config_runner
+    from py_config_runner import config_utils
+
+    assert py_config_runner.TrainConfigSchema is config_utils.TrainConfigSchema
+    assert issubclass(config_utils.TrainvalConfigSchema, config_utils.TorchModelConfigSchema)
+    assert config_utils.TrainConfigSchema.__qualname__ == "TrainConfigSchema"
+    assert "InferenceConfigSchema" in dir(config_utils)
+
+
+def test_unknown_attribute():
+    import py_config_runner
+    from py_config_runner import config_utils
+
+    with pytest.raises(AttributeError, match=r"has no attribute 'UnknownSchema'"):
+        py_config_runner.UnknownSchema
+
+    with pytest.raises(AttributeError, match=r"has no attribute 'UnknownSchema'"):
+        config_utils.UnknownSchema
+
+
+def test_get_params_cached(config_filepath, monkeypatch):
+    config = setup_config(config_filepath)
+    config.hp = {"a": [1, 2, 3], "b": {"c": 1}}
+
+    class MySchema(BaseConfigSchema):
+        hp: Any
+
+    def fail_dict(*args, **kwargs):
+        raise AssertionError("Validated values should not be copied")
+
+    monkeypatch.setattr(MySchema, "dict", fail_dict)
+
+    params = get_params(config, MySchema)
+    assert params == {"seed": 12, "debug": True, "hp": 2}
+
+    # result is cached
+    params["seed"] = 0
+    monkeypatch.setattr(MySchema, "validate", fail_dict)
+    assert get_params(config, MySchema)["seed"] == 12
+    # other keys do not invalidate the cache
+    config.other = 1
+    assert get_params(config, MySchema)["seed"] == 12
+
+    # schema fields invalidate the cache
+    monkeypatch.undo()
+    config.seed = 10
+    assert get_params(config, MySchema)["seed"] == 10
+    del config["hp"]
+    assert get_params(config, MySchema)["hp"] == "NoneType"
+
+
+def test_schema_validate_only_declared_fields(dirname):
+    filepath = dirname / "lazy_config.py"
+
+    s = """
+seed = 12
+
+def build_data():
+    raise RuntimeError("data should not be built")
+
+data = build_data()
+    """
+
+    with filepath.open("w") as h:
+        h.write(s)
+
+    config = ConfigObject(filepath, lazy=True)
+    result = BaseConfigSchema.validate(config)
+    assert result.seed == 12
+    assert result.debug is False
+
+
+def test_schema_validate_cached(config_filepath):
+    config = setup_config(config_filepath)
+
+    result = BaseConfigSchema.validate(config)
+    assert BaseConfigSchema.validate(config) is result
+
+    config.other = 1
+    assert BaseConfigSchema.validate(config) is result
+
+    config.seed = 13
+    new_result = BaseConfigSchema.validate(config)
+    assert new_result is not result
+    assert new_result.seed == 13
+
+    config.seed = "abc"
+    with pytest.raises(Exception, match=r"value is not a valid integer"):
+        BaseConfigSchema.validate(config)
+
+    # validation of a mapping
+    assert BaseConfigSchema.validate({"seed": 1}).seed == 1
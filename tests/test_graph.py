@@ -0,0 +1,234 @@
+import ast
+
+import pytest
+
+from py_config_runner.graph import StatementExecutor, StatementGraph
+
+
+def make_graph(source):
+    return StatementGraph(ast.parse(source))
+
+
+def test_statement_names():
+    graph = make_graph("""
+import numpy as np
+from os import path as p
+a = 1
+b, c = a, 2
+d += b
+e.x = c
+f[0] = 1
+
+def func(x, y=c):
+    z = x + g
+    return z
+
+class A(Base):
+    attr = 1
+
+out = [i for i in range(a)]
+    """)
+    s = graph.statements
+    assert s[0].defines == {"np"}
+    assert s[1].defines == {"p"}
+    assert s[2].defines == {"a"}
+    assert s[3].defines == {"b", "c"} and s[3].uses == {"a"}
+    assert s[4].defines == {"d"} and s[4].uses == {"d", "b"}
+    assert s[5].defines == {"e"} and s[5].uses == {"e", "c"}
+    assert s[6].defines == {"f"}
+    assert s[7].defines == {"func"} and s[7].uses == {"c"}
+    assert {"x", "g"} <= s[7].deferred_uses
+    assert s[8].defines == {"A"} and s[8].uses == {"Base"}
+    assert s[9].defines == {"out"} and "i" not in s[9].defines
+    assert not any(stmt.is_barrier for stmt in s)
+    assert graph.is_sliceable
+
+
+def test_slice():
+    graph = make_graph("""
+seed = 12
+lr = 0.01
+data = load(seed)
+
+def build(n):
+    return n * scale
+
+scale = 2
+model = build(3)
+optimizer = make(model, lr)
+    """)
+    assert graph.slice(["seed"]) == [0]
+    assert graph.slice(["lr"]) == [1]
+    assert graph.slice(["data"]) == [0, 2]
+    assert graph.slice(["model"]) == [3, 4, 5]
+    assert graph.slice(["optimizer"]) == [1, 3, 4, 5, 6]
+    assert graph.slice(["seed", "lr"]) == [0, 1]
+    assert graph.slice(["unknown"]) is None
+
+
+def test_slice_rebinding():
+    graph = make_graph("""
+a = 1
+c = a
+a = 2
+a.x = 3
+    """)
+    # rebinding a is executed after reading it
+    assert graph.slice(["a"]) == [0, 1, 2, 3]
+    assert graph.slice(["c"]) == [0, 1]
+
+
+def test_barriers():
+    graph = make_graph("""
+seed = 12
+debug = False
+set_seed(seed)
+model = Model()
+    """)
+    assert graph.statements[2].is_barrier
+    assert graph.slice(["debug"]) == [1]
+    assert graph.slice(["model"]) == [0, 1, 2, 3]
+
+    graph = make_graph("""
+a = 1
+from os.path import *
+b = 2
+    """)
+    assert graph.slice(["a"]) == [0]
+    assert graph.slice(["b"]) == [0, 1, 2]
+    assert graph.binds("join")
+
+
+def test_barriers_mutations():
+    graph = make_graph("""
+lr = 0.01
+items = [1, 2]
+
+def add(value):
+    items.append(value)
+
+items.append(3)
+add(4)
+total = sum(items)
+    """)
+    assert graph.statements[3].defines == {"items"}
+    assert graph.statements[4].defines == {"add", "items"}
+    assert graph.producer("items") == 4
+    assert graph.slice(["items"]) == [0, 1, 2, 3, 4]
+    assert graph.slice(["total"]) == [0, 1, 2, 3, 4, 5]
+    assert graph.producer("lr") == 0
+
+
+def test_barriers_state():
+    graph = make_graph("""
+import random
+
+random.seed(0)
+
+def make(n):
+    return [random.random() for _ in range(n)]
+
+a = make(2)
+b = make(2)
+c = 1
+    """)
+    assert graph.dependencies[3] == {1, 2}
+    # b is computed after a
+    assert graph.dependencies[4] == {1, 2, 3}
+    assert graph.dependencies[5] == {1}
+    assert graph.slice(["b"]) == [0, 1, 2, 3, 4]
+
+
+def test_barriers_affected():
+    graph = make_graph("""
+import random
+
+lr = 0.1
+seed = 0
+random.seed(seed)
+dataset = [random.random() for _ in range(3)]
+optimizer = {"lr": lr}
+    """)
+    # barrier is executed after all previous statements, but only reads seed and random
+    assert graph.dependencies[3] == {0, 1, 2}
+    assert graph.data_dependencies[3] == {0, 2}
+    assert graph.dependencies[5] == {1, 3}
+    assert graph.data_dependencies[5] == {1}
+    assert graph.affected([1]) == [1, 5]
+    assert graph.affected([2]) == [2, 3, 4]
+
+
+def test_unsafe_module():
+    graph = make_graph("""
+a = 1
+
+def f():
+    global b
+    b = 2
+
+c = 3
+    """)
+    assert not graph.is_sliceable
+    assert graph.slice(["c"]) == [0, 1, 2]
+
+
+def test_statement_executor():
+    graph = make_graph("""
+a = 1
+b = a + 1
+c = 3
+    """)
+    namespace = {}
+    executor = StatementExecutor(graph, namespace)
+    assert executor.run_for(["b"]) == [0, 1]
+    assert namespace["b"] == 2 and "c" not in namespace
+    assert executor.run_for(["b"]) == []
+    assert not executor.done
+    assert executor.run_all() == [2]
+    assert executor.done
+    assert namespace["c"] == 3
+
+
+def test_statement_executor_parallel():
+    import time
+
+    graph = make_graph(
+        """
+import time
+
+def slow(value):
+    time.sleep(0.25)
+    return value
+
+c = slow(3)
+a = slow(1)
+b = slow(2)
+d = slow(4)
+total = a + b + c + d
+    """
+    )
+    namespace = {}
+    executor = StatementExecutor(graph, namespace, parallel=True, max_workers=4)
+    start = time.time()
+    executor.run_all()
+    elapsed = time.time() - start
+    assert elapsed < 0.75, elapsed
+    assert namespace["total"] == 10
+    assert [k for k in namespace if k != "__builtins__"] == ["time", "slow", "c", "a", "b", "d", "total"]
+
+
+def test_statement_executor_parallel_error():
+    graph = make_graph(
+        """
+a = 1
+b = 1 / 0
+c = b + 1
+d = 2
+    """
+    )
+    namespace = {}
+    executor = StatementExecutor(graph, namespace, parallel=True)
+    with pytest.raises(ZeroDivisionError):
+        executor.run_all()
+    assert 2 not in executor.executed
+    assert namespace["a"] == 1
@@ -0,0 +1,53 @@
+import importlib
+import multiprocessing.spawn
+import sys
+
+from py_config_runner.importer import LocalModuleFinder, local_modules
+
+
+def test_local_module_finder(dirname):
+    (dirname / "local_module_a.py").write_text("value = 'a'\n")
+    (dirname / "local_package_a").mkdir()
+    (dirname / "local_package_a" / "__init__.py").write_text("")
+    (dirname / "local_package_a" / "sub.py").write_text("value = 'sub'\n")
+    # namespace package with the name of an installed module
+    (dirname / "json").mkdir()
+
+    finder = LocalModuleFinder([dirname, dirname / "missing"])
+    assert finder.search_paths == [dirname.resolve().as_posix(), (dirname / "missing").resolve().as_posix()]
+    assert finder.find_spec("local_module_a").origin == (dirname / "local_module_a.py").resolve().as_posix()
+    assert finder.find_spec("local_package_a").submodule_search_locations is not None
+    assert finder.find_spec("local_package_a.sub", path=[dirname.as_posix()]) is None
+    assert finder.find_spec("numpy") is None
+    assert finder.find_spec("json") is None
+
+    assert finder.find_spec("local_module_b") is None
+    (dirname / "local_module_b.py").write_text("value = 'b'\n")
+    assert finder.find_spec("local_module_b") is None
+    finder.invalidate_caches()
+    assert finder.find_spec("local_module_b") is not None
+
+
+def test_local_modules(dirname):
+    (dirname / "local_module_c.py").write_text("value = 'c'\n")
+    sys_path = list(sys.path)
+    meta_path = list(sys.meta_path)
+    get_preparation_data = multiprocessing.spawn.get_preparation_data
+    try:
+        with local_modules([dirname]) as finder:
+            assert sys.meta_path.index(finder) == sys.meta_path.index(importlib.machinery.PathFinder) - 1
+            module = importlib.import_module("local_module_c")
+            assert module.value == "c"
+            data = multiprocessing.spawn.get_preparation_data("test")
+            assert data["sys_path"][0] == dirname.resolve().as_posix()
+            with local_modules([dirname / "other"]):
+                data = multiprocessing.spawn.get_preparation_data("test")
+                assert data["sys_path"][:2] == [dirname.resolve().as_posix(), (dirname / "other").resolve().as_posix()]
+            assert multiprocessing.spawn.get_preparation_data is not get_preparation_data
+    finally:
+        sys.modules.pop("local_module_c", None)
+
+    assert sys.path == sys_path
+    assert sys.meta_path == meta_path
+    assert multiprocessing.spawn.get_preparation_data is get_preparation_data
+    assert importlib.util.find_spec("local_module_c") is None
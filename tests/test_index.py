@@ -0,0 +1,130 @@
+import os
+
+import pytest
+from click.testing import CliRunner
+
+from py_config_runner.__main__ import command
+from py_config_runner.index import DEFAULT_INDEX_FILENAME, ConfigIndex, parse_config_file
+
+
+@pytest.fixture
+def configs_dir(dirname):
+    path = dirname / "configs"
+    (path / "sub").mkdir(parents=True)
+
+    (path / "baseline.py").write_text("""
+import torch
+from torchvision.models import resnet50
+
+seed = 12
+learning_rate = 0.1
+optimizer: str = "sgd"
+model = resnet50(pretrained=False)
+learning_rate = 0.2
+raise RuntimeError("never executed")
+        """)
+    (path / "sub" / "small.py").write_text("""
+from .. import utils
+from torchvision.models import mobilenet_v2
+
+learning_rate = 0.01
+optimizer = "adam"
+model = mobilenet_v2()
+        """)
+    (path / "broken.py").write_text("a = (\n")
+    (path / "__pycache__").mkdir()
+    (path / "__pycache__" / "baseline.py").write_text("learning_rate = 10.0")
+    yield path
+
+
+def test_parse_config_file(configs_dir):
+    info = parse_config_file(configs_dir / "baseline.py")
+    assert list(info["assignments"]) == ["seed", "optimizer", "model", "learning_rate"]
+    assert info["assignments"]["learning_rate"] == {"lineno": 9, "source": "0.2", "value": 0.2}
+    assert info["assignments"]["model"] == {"lineno": 8, "source": "resnet50(pretrained=False)"}
+    assert info["assignments"]["optimizer"]["value"] == "sgd"
+    assert info["imports"] == [("torch", None), ("torchvision.models", "resnet50")]
+
+    info = parse_config_file(configs_dir / "sub" / "small.py")
+    assert info["imports"][0] == ("..", "utils")
+
+
+def test_config_index(dirname, configs_dir):
+    index = ConfigIndex(dirname / "index.sqlite")
+    assert index.update(configs_dir) == {"added": 3, "updated": 0, "removed": 0, "unchanged": 0}
+    baseline = (configs_dir / "baseline.py").resolve().as_posix()
+    small = (configs_dir / "sub" / "small.py").resolve().as_posix()
+    broken = (configs_dir / "broken.py").resolve().as_posix()
+    assert index.paths() == [baseline, broken, small]
+
+    assert index.query("learning_rate >= 0.1") == [baseline]
+    assert index.query("learning_rate<0.1") == [small]
+    assert index.query("learning_rate != 0.2") == [small]
+    assert index.query("optimizer == 'adam'") == [small]
+    assert index.query("optimizer == sgd") == [baseline]
+    assert index.query("resnet") == [baseline]
+    assert index.query("torchvision") == [baseline, small]
+    assert index.query("torchvision", "learning_rate >= 0.1") == [baseline]
+    assert index.query("seed > 100") == []
+    assert index.query() == [baseline, broken, small]
+
+    with pytest.raises(ValueError, match=r"Operator '>' requires a number"):
+        index.query("optimizer > 'a'")
+
+    info = index.get(configs_dir / "baseline.py")
+    assert info["assignments"]["learning_rate"]["value"] == 0.2
+    assert "value" not in info["assignments"]["model"]
+    assert info["error"] is None
+    assert index.get(broken)["error"].startswith("SyntaxError")
+    with pytest.raises(ValueError, match=r"is not indexed"):
+        index.get(dirname / "abc.py")
+
+    # Index is persistent and updated incrementally
+    index = ConfigIndex(dirname / "index.sqlite")
+    assert index.update(configs_dir) == {"added": 0, "updated": 0, "removed": 0, "unchanged": 3}
+
+    (configs_dir / "broken.py").unlink()
+    (configs_dir / "sub" / "small.py").write_text("learning_rate = 0.5\n")
+    st = os.stat(configs_dir / "baseline.py")
+    os.utime(configs_dir / "baseline.py", ns=(st.st_atime_ns, st.st_mtime_ns))
+    (configs_dir / "new.py").write_text("learning_rate = 0.3\n")
+    assert index.update(configs_dir) == {"added": 1, "updated": 1, "removed": 1, "unchanged": 1}
+    assert index.query("learning_rate >= 0.3") == [(configs_dir / "new.py").resolve().as_posix(), small]
+
+    with pytest.raises(ValueError, match=r"should be a directory"):
+        index.update(configs_dir / "new.py")
+
+
+def test_config_index_closes_connections(dirname, configs_dir, monkeypatch):
+    import sqlite3
+
+    connections = []
+
+    def _connect(*args, **kwargs):
+        connections.append(sqlite3_connect(*args, **kwargs))
+        return connections[-1]
+
+    sqlite3_connect = sqlite3.connect
+    monkeypatch.setattr(sqlite3, "connect", _connect)
+    index = ConfigIndex(dirname / "index.sqlite")
+    index.update(configs_dir)
+    paths = index.paths()
+    index.get(paths[0])
+    index.query("learning_rate >= 0.1")
+    assert len(connections) == 5
+    for conn in connections:
+        with pytest.raises(sqlite3.ProgrammingError, match=r"closed"):
+            conn.execute("SELECT 1")
+
+
+def test_index_command(configs_dir):
+    runner = CliRunner()
+    result = runner.invoke(command, ["index", configs_dir.as_posix(), "-q", "learning_rate>=0.1", "-q", "resnet"])
+    assert result.exit_code == 0, repr(result) + "\n" + result.output
+    assert "3 added" in result.output
+    assert (configs_dir / "baseline.py").resolve().as_posix() in result.output
+    assert (configs_dir / DEFAULT_INDEX_FILENAME).exists()
+
+    result = runner.invoke(command, ["index", configs_dir.as_posix(), "-q", "optimizer>abc"])
+    assert result.exit_code == 2, repr(result) + "\n" + result.output
+    assert "3 unchanged" in result.output
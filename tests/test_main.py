@@ -51,3 +51,59 @@ def test_run_executable_as_script(example_path, example_scripts_training, exampl
     process = subprocess.Popen(cmd, env=current_env)
     process.wait()
     assert process.returncode == 0, subprocess.CalledProcessError(returncode=process.returncode, cmd=cmd)
+
+
+def test_command_run(runner, script_filepath, config_filepath):  # noqa: F811
+    cmd = ["run", script_filepath.as_posix(), config_filepath.as_posix()]
+    result = runner.invoke(command, cmd)
+    assert result.exit_code == 0, repr(result) + "\n" + result.output
+
+
+def test_command_run_cache_dir(runner, dirname, script_filepath, config_filepath):  # noqa: F811
+    cmd = ["run", script_filepath.as_posix(), config_filepath.as_posix(), "--cache-dir", (dirname / "cache").as_posix()]
+    result = runner.invoke(command, cmd)
+    assert result.exit_code == 0, repr(result) + "\n" + result.output
+    assert "skipped" not in result.output
+
+    result = runner.invoke(command, cmd)
+    assert result.exit_code == 0, repr(result) + "\n" + result.output
+    assert "has already finished, skipped" in result.output
+
+
+def test_command_run_prefetch_config(runner, dirname, script_filepath, config_filepath):  # noqa: F811
+    cmd = ["run", script_filepath.as_posix(), config_filepath.as_posix(), "--prefetch-config"]
+    result = runner.invoke(command, cmd)
+    assert result.exit_code == 0, repr(result) + "\n" + result.output
+
+    result = runner.invoke(command, cmd + ["--profile-config", (dirname / "profile.json").as_posix()])
+    assert result.exit_code == 2
+    assert "can not be used with --profile-config" in result.output
+
+
+def test_command_sweep(runner, dirname, script_filepath, config_filepath):  # noqa: F811
+    output_dir = dirname / "output"
+    cmd = [
+        "sweep",
+        script_filepath.as_posix(),
+        config_filepath.as_posix(),
+        "-p",
+        "a=1",
+        "-p",
+        "b=2,3",
+        "-j",
+        "2",
+        "--executor",
+        "thread",
+        "-o",
+        output_dir.as_posix(),
+    ]
+    result = runner.invoke(command, cmd)
+    # script asserts that b == 2
+    assert result.exit_code == 1, repr(result) + "\n" + result.output
+    assert "2 runs, 1 failed" in result.output
+    assert (output_dir / "sweep.json").exists()
+
+    cmd = ["sweep", script_filepath.as_posix(), config_filepath.as_posix(), "-p", "a=1:0", "--mode", "random"]
+    result = runner.invoke(command, cmd)
+    assert result.exit_code == 2, repr(result) + "\n" + result.output
+    assert "Lower bound should be smaller" in result.output
@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+
+from py_config_runner import ConfigObject
+from py_config_runner.memory import memory_report
+
+
+class _Dataset:
+    def __init__(self, data):
+        self.data = data
+
+    def __len__(self):
+        return len(self.data)
+
+
+def test_memory_report():
+    arr = np.zeros((100, 1000))
+    values = {
+        "arr": arr,
+        "view": arr[10:20],
+        "dataset": _Dataset(arr),
+        "other": np.ones(1000, dtype="uint8"),
+        "items": [[1, 2, 3] for _ in range(100)],
+        "seed": 12,
+        "name": "abc",
+        "fn": len,
+    }
+    records = memory_report(values)
+    assert {r["key"] for r in records[:3]} == {"arr", "view", "dataset"}
+    records = {r["key"]: r for r in records}
+
+    # data of views and shared arrays is counted once
+    for key in ["arr", "view", "dataset"]:
+        assert arr.nbytes <= records[key]["size"] < arr.nbytes + 1000
+        assert records[key]["exclusive_size"] < 1000
+    assert records["view"]["shared_with"] == ["arr", "dataset"]
+    assert records["dataset"]["length"] == 100
+    assert records["dataset"]["type"].endswith("_Dataset")
+
+    assert records["other"]["exclusive_size"] >= 1000
+    assert records["other"]["shared_with"] == []
+    assert records["items"]["length"] == 100
+    assert records["items"]["size"] > 100 * 3 * 8
+    assert records["items"]["shared_with"] == []
+    # small ints and strings are not reported as shared
+    assert records["seed"]["shared_with"] == []
+    assert records["name"]["length"] is None
+
+
+def test_memory_report_torch():
+    torch = pytest.importorskip("torch")
+
+    model = torch.nn.Linear(100, 100)
+    values = {
+        "model": model,
+        "optimizer": torch.optim.SGD(model.parameters(), lr=0.1),
+        "tensor": torch.zeros(1000),
+    }
+    records = {r["key"]: r for r in memory_report(values)}
+    params_size = sum(p.numel() * p.element_size() for p in model.parameters())
+    assert records["model"]["size"] >= params_size
+    assert "optimizer" in records["model"]["shared_with"]
+    assert records["optimizer"]["size"] >= params_size
+    assert records["tensor"]["size"] >= 4000
+    assert records["tensor"]["shared_with"] == []
+
+
+def test_config_object_memory_report(dirname):
+    config_fp = dirname / "config_memory.py"
+
+    s = """
+import numpy as np
+
+data = np.zeros((100, 1000))
+train_data = data[:80]
+batch_size = 32
+    """
+
+    with config_fp.open("w") as h:
+        h.write(s)
+
+    config = ConfigObject(config_fp)
+    records = config.memory_report()
+    assert [r["key"] for r in records][:2] in (["data", "train_data"], ["train_data", "data"])
+    records = {r["key"]: r for r in records}
+    assert set(records) == {"config_filepath", "data", "train_data", "batch_size"}
+    assert records["train_data"]["shared_with"] == ["data"]
@@ -0,0 +1,120 @@
+import json
+import pickle
+
+import pytest
+
+from py_config_runner import ConfigObject
+from py_config_runner.graph import StatementExecutor, StatementGraph
+from py_config_runner.profiler import StatementProfiler
+from py_config_runner.runner import run_script
+
+
+@pytest.fixture
+def profiled_config_filepath(dirname):
+    config_fp = dirname / "profiled_config.py"
+
+    s = """
+import time
+import json
+
+a = 1
+time.sleep(0.05)
+data = [0] * 200000
+b = a + 1
+    """
+
+    with config_fp.open("w") as h:
+        h.write(s)
+
+    yield config_fp
+
+
+def test_statement_profiler(profiled_config_filepath):
+    import ast
+
+    source = profiled_config_filepath.read_text()
+    graph = StatementGraph(ast.parse(source), profiled_config_filepath.as_posix())
+    profiler = StatementProfiler()
+    executor = StatementExecutor(graph, {}, profiler=profiler)
+    executor.run_all()
+
+    report = profiler.report()
+    assert len(report) == len(graph)
+    assert report[0]["statement"] == "time.sleep(0.05)"
+    assert report[0]["wall_time"] >= 0.05
+
+    report = profiler.report(sort_by="memory_delta")
+    assert report[0]["names"] == ["data"]
+    assert report[0]["memory_delta"] >= 200000 * 8
+    assert report[0]["memory_peak"] >= report[0]["memory_delta"]
+
+    records = {r["lineno"]: r for r in profiler.records}
+    assert records[2]["names"] == ["time"]
+    assert records[2]["import_time"] > 0.0
+    assert records[5]["import_time"] == 0.0
+
+    with pytest.raises(ValueError, match=r"Argument sort_by should be one of"):
+        profiler.report(sort_by="abc")
+
+    with pytest.raises(ValueError, match=r"can not be profiled in parallel mode"):
+        StatementExecutor(graph, {}, parallel=True, profiler=profiler)
+
+
+def test_statement_profiler_no_memory_and_error(dirname):
+    import ast
+
+    profiler = StatementProfiler(trace_memory=False)
+    graph = StatementGraph(ast.parse("a = 1\nb = 1 / 0\n"), "<string>")
+    with pytest.raises(ZeroDivisionError):
+        StatementExecutor(graph, {}, profiler=profiler).run_all()
+
+    records = profiler.report(sort_by="index")
+    assert records[0]["index"] == 1
+    assert records[0]["error"] == "ZeroDivisionError: division by zero"
+    assert records[0]["memory_delta"] is None
+    assert records[1]["error"] is None
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_config_object_profile(lazy, dirname, profiled_config_filepath):
+    output_fp = dirname / "profile.json"
+    config = ConfigObject(profiled_config_filepath, profile=output_fp, lazy=lazy, mutations={"a": 10})
+    assert config.b == 11
+    if lazy:
+        assert not output_fp.exists()
+        # statements preceding the expression statement are executed, data is not computed
+        assert {r["lineno"] for r in config.profile_report()} == {2, 3, 5, 6, 8}
+        assert len(config) > 0
+
+    assert len(config.profile_report()) == 6
+    output = json.loads(output_fp.read_text())
+    assert output["config_filepath"] == profiled_config_filepath.as_posix()
+    assert output["total_time"] >= 0.05
+    assert output["statements"][0]["statement"] == "time.sleep(0.05)"
+
+    with pytest.raises(ValueError, match=r"profile and parallel can not be used together"):
+        ConfigObject(profiled_config_filepath, profile=True, parallel=True)
+
+    with pytest.raises(RuntimeError, match=r"Configuration is not profiled"):
+        ConfigObject(profiled_config_filepath).profile_report()
+
+
+def test_config_object_profile_pickle_recipe(profiled_config_filepath):
+    config = ConfigObject(profiled_config_filepath, profile=True, pickle_mode="recipe")
+    assert config.b == 2
+    config2 = pickle.loads(pickle.dumps(config))
+    assert config2.profile_report() == []
+    assert config2.b == 2
+    assert len(config2.profile_report()) == 6
+
+
+def test_run_script_profile_config(dirname, script_filepath, config_filepath):
+    output_fp = dirname / "profile.json"
+    run_script(script_filepath, config_filepath, profile_config=output_fp)
+    output = json.loads(output_fp.read_text())
+    assert [r["names"] for r in sorted(output["statements"], key=lambda r: r["index"])] == [
+        ["a"],
+        ["b"],
+        ["_data"],
+        ["data"],
+    ]
@@ -1,5 +1,7 @@
+import asyncio
 from pathlib import Path
-from py_config_runner.runner import run_script, _check_script
+from py_config_runner.cache import RunCache
+from py_config_runner.runner import run_script, run_script_async, run_scripts_concurrently, _check_script
 
 import pytest
 
@@ -142,3 +144,231 @@ def run(config, **kwargs):
         h.write(s)
 
     run_script(script_fp, config_filepath)
+
+
+def test_run_script_cache(dirname, config_filepath):  # noqa: F811
+    script_fp = dirname / "script_cached.py"
+
+    s = """
+def run(config, output_path=None, **kwargs):
+    with (output_path / "counter.txt").open("a") as h:
+        h.write("1")
+    return {"value": config.a + config.b}
+    """
+
+    with script_fp.open("w") as h:
+        h.write(s)
+
+    cache_dir = dirname / "cache"
+    output_path = dirname / "output"
+    output_path.mkdir()
+
+    record = run_script(script_fp, config_filepath, cache=cache_dir, output_path=output_path)
+    assert not record.cached
+    assert record.result == {"value": 3}
+    assert record.manifest["files"] == [{"path": "counter.txt", "size": 1}]
+
+    record = run_script(script_fp, config_filepath, cache=cache_dir, output_path=output_path)
+    assert record.cached
+    assert record.result == {"value": 3}
+    assert (output_path / "counter.txt").read_text() == "1"
+
+    # Mutations, kwargs and script changes invalidate the cache
+    record = run_script(script_fp, config_filepath, mutations={"a": 10}, cache=cache_dir, output_path=output_path)
+    assert not record.cached and record.result == {"value": 12}
+    record = run_script(script_fp, config_filepath, cache=cache_dir, output_path=output_path, seed=1)
+    assert not record.cached
+
+    with script_fp.open("a") as h:
+        h.write("\n# comment\n")
+    record = run_script(script_fp, config_filepath, cache=cache_dir, output_path=output_path)
+    assert not record.cached
+
+    # Missing artifact invalidates the cache
+    (output_path / "counter.txt").unlink()
+    record = run_script(script_fp, config_filepath, cache=cache_dir, output_path=output_path)
+    assert not record.cached
+    assert (output_path / "counter.txt").read_text() == "1"
+
+
+def test_run_script_cache_failed_run_not_recorded(dirname, config_filepath):  # noqa: F811
+    script_fp = dirname / "script_failing.py"
+
+    s = """
+def run(config, **kwargs):
+    raise RuntimeError("STOP")
+    """
+
+    with script_fp.open("w") as h:
+        h.write(s)
+
+    cache = RunCache(dirname / "cache")
+    with pytest.raises(RuntimeError, match=r"STOP"):
+        run_script(script_fp, config_filepath, cache=cache)
+    assert cache.keys() == []
+
+
+def test_run_script_async_run(dirname, config_filepath):  # noqa: F811
+    script_fp = dirname / "script_async.py"
+    script_fp.write_text(
+        """
+import asyncio
+
+async def run(config, **kwargs):
+    await asyncio.sleep(0.01)
+    return config.a + kwargs["value"]
+"""
+    )
+    assert run_script(script_fp, config_filepath, value=10) == 11
+
+    record = run_script(script_fp, config_filepath, cache=dirname / "cache", value=10)
+    assert record.result == 11
+
+
+def test_run_script_prefetch_config(dirname):  # noqa: F811
+    config_fp = dirname / "prefetch_config.py"
+    config_fp.write_text("import threading\nloader_thread = threading.current_thread().name\n")
+    script_fp = dirname / "script_prefetch.py"
+    script_fp.write_text("import threading\n\ndef run(config, **kwargs):\n    return config.loader_thread\n")
+
+    import threading
+
+    assert run_script(script_fp, config_fp) == threading.current_thread().name
+    assert run_script(script_fp, config_fp, prefetch_config=True) != threading.current_thread().name
+
+    with pytest.raises(ValueError, match=r"prefetch_config and profile_config can not be used together"):
+        run_script(script_fp, config_fp, prefetch_config=True, profile_config=dirname / "profile.json")
+
+
+def test_run_script_local_modules(dirname):  # noqa: F811
+    import sys
+
+    (dirname / "configs").mkdir()
+    (dirname / "scripts").mkdir()
+    (dirname / "configs" / "config_helpers.py").write_text("def get_value():\n    return 12\n")
+    config_fp = dirname / "configs" / "config_local.py"
+    config_fp.write_text("from config_helpers import get_value\n\nvalue = get_value()\n")
+    (dirname / "scripts" / "script_helpers.py").write_text("def double(x):\n    return 2 * x\n")
+    script_fp = dirname / "scripts" / "script_local_spawn.py"
+    script_fp.write_text(
+        """
+import multiprocessing as mp
+
+from script_helpers import double
+
+
+def worker(queue, value):
+    queue.put(double(value))
+
+
+def run(config, **kwargs):
+    ctx = mp.get_context("spawn")
+    queue = ctx.Queue()
+    p = ctx.Process(target=worker, args=(queue, config.value))
+    p.start()
+    output = queue.get(timeout=60)
+    p.join()
+    return output
+"""
+    )
+    sys_path = list(sys.path)
+    meta_path = list(sys.meta_path)
+    try:
+        assert run_script(script_fp, config_fp) == 24
+        assert run_script(script_fp, config_fp) == 24
+    finally:
+        sys.modules.pop("script_helpers", None)
+        sys.modules.pop("config_helpers", None)
+    assert sys.path == sys_path
+    assert sys.meta_path == meta_path
+
+
+def test_run_script_spawn_config_function(dirname):  # noqa: F811
+    import sys
+
+    config_fp = dirname / "cfg_fn.py"
+    config_fp.write_text("def func(x):\n    return x + 1\n\nvalue = 1\n")
+    script_fp = dirname / "script_spawn_config.py"
+    script_fp.write_text(
+        """
+import multiprocessing as mp
+
+
+def worker(queue, config):
+    queue.put(config.func(config.value))
+
+
+def run(config, **kwargs):
+    # configuration is loaded before being sent
+    assert config.value == 1
+    ctx = mp.get_context("spawn")
+    queue = ctx.Queue()
+    p = ctx.Process(target=worker, args=(queue, config))
+    p.start()
+    output = queue.get(timeout=60)
+    p.join()
+    return output
+"""
+    )
+    try:
+        assert run_script(script_fp, config_fp) == 2
+    finally:
+        sys.modules.pop("cfg_fn", None)
+
+
+def test_run_scripts_concurrently(dirname):  # noqa: F811
+    import time
+
+    config_fps = []
+    for i in range(5):
+        config_fp = dirname / f"config_{i}.py"
+        config_fp.write_text(f"value = {i}\n")
+        config_fps.append(config_fp)
+
+    script_fp = dirname / "script_async_sleep.py"
+    script_fp.write_text(
+        """
+import asyncio
+
+async def run(config, **kwargs):
+    await asyncio.sleep(0.3)
+    if config.value == kwargs.get("fail_value"):
+        raise ValueError("failed run")
+    return config.value * 10
+"""
+    )
+    start = time.perf_counter()
+    outputs = run_scripts_concurrently(script_fp, config_fps)
+    assert time.perf_counter() - start < 1.2
+    assert outputs == [0, 10, 20, 30, 40]
+
+    outputs = run_scripts_concurrently(script_fp, config_fps, mutations={"value": 2})
+    assert outputs == [20] * 5
+
+    with pytest.raises(ValueError, match=r"failed run"):
+        run_scripts_concurrently(script_fp, config_fps, fail_value=3)
+
+    outputs = run_scripts_concurrently(script_fp, config_fps, return_exceptions=True, fail_value=3)
+    assert outputs[:3] == [0, 10, 20] and isinstance(outputs[3], ValueError)
+
+    # Synchronous run is executed in threads
+    sync_script_fp = dirname / "script_sync_sleep.py"
+    sync_script_fp.write_text(
+        """
+import time
+
+def run(config, **kwargs):
+    time.sleep(0.3)
+    return config.value
+"""
+    )
+    start = time.perf_counter()
+    assert run_scripts_concurrently(sync_script_fp, config_fps) == [0, 1, 2, 3, 4]
+    assert time.perf_counter() - start < 1.2
+
+    async def main():
+        return await asyncio.gather(
+            run_script_async(script_fp, config_fps[0]), run_script_async(sync_script_fp, config_fps[1])
+        )
+
+    assert asyncio.run(main()) == [0, 1]
@@ -0,0 +1,68 @@
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from py_config_runner.server import run_on_server
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="Fork server requires fork")
+
+
+@pytest.fixture
+def server_socket(dirname):
+    socket_path = dirname / "server.sock"
+    cmd = [sys.executable, "-m", "py_config_runner", "serve", "--socket", socket_path.as_posix(), "--preload", "json"]
+    process = subprocess.Popen(cmd)
+    for _ in range(100):
+        if socket_path.exists():
+            break
+        time.sleep(0.05)
+    assert socket_path.exists()
+    yield socket_path
+    process.terminate()
+    process.wait(timeout=10)
+    assert not socket_path.exists()
+
+
+def test_run_on_server(dirname, server_socket, script_filepath, config_filepath):
+    output_fp = dirname / "output.txt"
+    with output_fp.open("w") as h:
+        returncode = run_on_server(server_socket, script_filepath, config_filepath, fds=(0, h.fileno(), h.fileno()))
+
+    assert returncode == 0
+    assert "Run\n1\n2\n{}\n{}".format(config_filepath, script_filepath) in output_fp.read_text()
+
+
+def test_run_on_server_error(dirname, server_socket, config_filepath):
+    script_fp = dirname / "bad_script.py"
+
+    s = """
+def run(config, **kwargs):
+    raise RuntimeError("STOP")
+    """
+
+    with script_fp.open("w") as h:
+        h.write(s)
+
+    output_fp = dirname / "output.txt"
+    with output_fp.open("w") as h:
+        returncode = run_on_server(server_socket, script_fp, config_filepath, fds=(0, h.fileno(), h.fileno()))
+
+    assert returncode == 1
+    assert "RuntimeError: STOP" in output_fp.read_text()
+
+
+def test_command_with_server(server_socket, script_filepath, config_filepath):
+    cmd = [
+        sys.executable,
+        "-m",
+        "py_config_runner",
+        "--server",
+        server_socket.as_posix(),
+        script_filepath.as_posix(),
+        config_filepath.as_posix(),
+    ]
+    output = subprocess.check_output(cmd)
+    assert b"Run\n1\n2" in output
@@ -0,0 +1,106 @@
+import multiprocessing as mp
+import pickle
+
+import numpy as np
+import pytest
+
+from py_config_runner import ConfigObject
+from py_config_runner.sharing import SharedBuffers, load_shared
+
+
+def test_shared_buffers():
+    arr = np.random.rand(1000, 100)
+    shared = SharedBuffers({"arr": arr, "small": np.arange(3), "view": arr[:10]})
+    assert shared.segment is not None
+    assert shared.data["segments"] == [(shared.segment.name, shared.segment.size)]
+    assert shared.segment.size >= arr.nbytes
+    assert len(pickle.dumps(shared.data)) < arr.nbytes
+    # shared arrays can not be modified
+    assert not arr.flags.writeable
+
+    output = load_shared(pickle.loads(pickle.dumps(shared.data)))
+    np.testing.assert_array_equal(output["arr"], arr)
+    np.testing.assert_array_equal(output["small"], np.arange(3))
+    assert not output["arr"].flags.owndata
+    # mapping is copy-on-write
+    output["arr"][0, 0] = -1.0
+    np.testing.assert_array_equal(load_shared(shared.data)["arr"], arr)
+
+    # only new arrays are copied
+    other = np.random.rand(100, 100)
+    new_shared = SharedBuffers({"arr": arr, "other": other}, previous=shared)
+    assert new_shared.segment is not None and new_shared.segment.size < arr.nbytes
+    assert len(new_shared.data["segments"]) == 2
+    new_output = load_shared(new_shared.data)
+    np.testing.assert_array_equal(new_output["arr"], arr)
+    np.testing.assert_array_equal(new_output["other"], other)
+
+    # arrays are writable once released
+    new_shared.release()
+    assert arr.flags.writeable and other.flags.writeable
+    shared.release()
+    assert shared.segment is None
+    # loaded values outlive the segment
+    assert output["arr"][0, 0] == -1.0
+    with pytest.raises(FileNotFoundError):
+        load_shared(shared.data)
+
+    shared = SharedBuffers({"a": 1})
+    assert shared.segment is None
+    assert load_shared(shared.data) == {"a": 1}
+
+
+def worker_shared_config_checker(config, queue):
+    queue.put((config.a, float(config.arr.sum()), config.arr.flags.owndata, config.extra))
+    config.arr[:] = 0.0
+
+
+@pytest.fixture
+def shared_config_filepath(dirname):
+    config_filepath = dirname / "shared_config.py"
+    config_filepath.write_text("import numpy as np\n\na = 1\narr = np.ones((1000, 100))\n")
+    return config_filepath
+
+
+def test_config_object_shared_memory(shared_config_filepath):
+    config = ConfigObject(shared_config_filepath, pickle_mode="shared_memory")
+    # not loaded configuration is pickled with its state
+    assert pickle.loads(pickle.dumps(config)).a == 1
+
+    config.extra = [1, 2]
+    data = pickle.dumps(config)
+    assert len(data) < config.arr.nbytes
+    segment = config.__dict__["_shared_buffers"].segment
+    # arrays are copied once
+    pickle.dumps(config)
+    assert config.__dict__["_shared_buffers"].segment is None
+    assert config.__dict__["_stale_shared_buffers"][0].segment is segment
+
+    ctx = mp.get_context("spawn")
+    queue = ctx.Queue()
+    p = ctx.Process(target=worker_shared_config_checker, args=(config, queue))
+    p.start()
+    assert queue.get(timeout=60) == (1, 100000.0, False, [1, 2])
+    p.join()
+    assert p.exitcode == 0
+    assert config.arr.sum() == 100000.0
+
+    # shared arrays can not be modified in place, values modified in place are pickled again
+    with pytest.raises(ValueError, match=r"read-only"):
+        config.arr[:] = 5.0
+    config.extra.append(3)
+    assert pickle.loads(pickle.dumps(config)).extra == [1, 2, 3]
+
+    # only new arrays are copied into a new segment
+    config.other = np.zeros((100, 100))
+    new_config = pickle.loads(pickle.dumps(config))
+    assert config.__dict__["_shared_buffers"].segment.size < config.arr.nbytes
+    np.testing.assert_array_equal(new_config.arr, config.arr)
+    np.testing.assert_array_equal(new_config.other, config.other)
+
+    shared_data = [config.__dict__["_shared_buffers"].data]
+    config.release_shared_memory()
+    with pytest.raises(FileNotFoundError):
+        load_shared(shared_data[0])
+    assert new_config.arr.sum() == 100000.0
+    assert config.arr.flags.writeable and config.other.flags.writeable
@@ -0,0 +1,216 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from py_config_runner import ConfigObject
+from py_config_runner.config_utils import has_torch
+from py_config_runner.snapshot import dump_snapshot, dumps, load_snapshot
+
+
+def test_dumps_out_of_band_buffers():
+    arr = np.arange(10000, dtype="float64")
+    data, buffers = dumps({"arr": arr, "small": np.arange(3), "view": arr[:10]})
+    assert len(buffers) == 1
+    assert len(data) < arr.nbytes
+    output = pickle.loads(data, buffers=buffers)
+    np.testing.assert_array_equal(output["arr"], arr)
+    np.testing.assert_array_equal(output["small"], np.arange(3))
+
+    data, buffers = dumps(arr, min_buffer_size=10**9)
+    assert len(buffers) == 0
+
+
+def test_dump_load_snapshot(dirname):
+    arr = np.random.rand(100, 100)
+    shared = [1, 2, 3]
+    values = {"arr": arr, "a": shared, "b": shared, "func": lambda x: x}
+    snapshot_fp = dirname / "values.snapshot"
+    skipped = dump_snapshot(snapshot_fp, values, state={"key": "value"})
+    assert skipped == ["func"]
+    assert (dirname / "values.snapshot.buffers").exists()
+
+    snapshot = load_snapshot(snapshot_fp)
+    assert snapshot["state"] == {"key": "value"}
+    assert snapshot["skipped"] == ["func"]
+    output = snapshot["values"]
+    assert set(output) == {"arr", "a", "b"}
+    assert output["a"] is output["b"]
+    np.testing.assert_array_equal(output["arr"], arr)
+    # arrays are memory-mapped copy-on-write
+    assert not output["arr"].flags.owndata
+    output["arr"][0, 0] = -1.0
+    np.testing.assert_array_equal(load_snapshot(snapshot_fp)["values"]["arr"], arr)
+
+    (dirname / "values.snapshot.buffers").write_bytes(b"")
+    with pytest.raises(ValueError, match=r"does not match the snapshot"):
+        load_snapshot(snapshot_fp)
+
+    (dirname / "other.snapshot").write_bytes(pickle.dumps({"a": 1}))
+    with pytest.raises(ValueError, match=r"is not a snapshot of version"):
+        load_snapshot(dirname / "other.snapshot")
+
+
+@pytest.fixture
+def snapshot_config_filepath(dirname):
+    config_filepath = dirname / "snapshot_config.py"
+    config_filepath.write_text(f"""
+import numpy as np
+
+from pathlib import Path
+
+counter_path = Path("{(dirname / 'counter.txt').as_posix()}")
+num_chars = counter_path.write_text(counter_path.read_text() + "x" if counter_path.exists() else "x")
+
+size = 100
+data = np.arange(size * 1000, dtype="float32")
+
+
+def get_mean():
+    return float(data.mean())
+
+
+class Model:
+    def __init__(self, data):
+        self.data = data
+
+
+model = Model(data)
+model_size = model.data.size
+""")
+    return config_filepath
+
+
+def test_config_object_snapshot(dirname, snapshot_config_filepath):
+    counter_path = dirname / "counter.txt"
+    config = ConfigObject(snapshot_config_filepath, mutations={"size": 50}, script_filepath=dirname / "script.py")
+    config.extra = [1, 2]
+    snapshot_fp = dirname / "config.snapshot"
+    skipped = config.snapshot(snapshot_fp)
+    assert sorted(skipped) == ["Model", "get_mean", "model"]
+    assert counter_path.read_text() == "x"
+
+    new_config = ConfigObject.from_snapshot(snapshot_fp)
+    assert new_config.__dict__["_is_loaded"]
+    # statements defining data are not executed
+    assert counter_path.read_text() == "x"
+    assert new_config.size == 50
+    np.testing.assert_array_equal(new_config.data, config.data)
+    assert not new_config.data.flags.owndata
+    assert new_config.model.data is new_config.data
+    assert new_config.get_mean() == config.get_mean()
+    assert new_config.model_size == 50000
+    assert new_config.extra == [1, 2]
+    assert new_config.script_filepath == dirname / "script.py"
+    assert new_config.config_filepath == snapshot_config_filepath
+    assert sorted(new_config.keys()) == sorted(config.keys())
+
+    # Derived configuration and recipe pickling use the same mutations and overrides
+    derived = new_config.derive({"size": 10})
+    assert derived.data.size == 10000
+    assert derived.extra == [1, 2]
+
+    snapshot_config_filepath.write_text(snapshot_config_filepath.read_text() + "\nvalue = 1\n")
+    with pytest.warns(UserWarning, match=r"was modified since the snapshot"):
+        ConfigObject.from_snapshot(snapshot_fp)
+
+
+def test_config_object_snapshot_barriers(dirname):
+    config_fp = dirname / "snapshot_barriers_config.py"
+    config_fp.write_text("""
+lr = 0.01
+items = [1, 2]
+items.append(3)
+total = sum(items)
+
+
+# function defined in the configuration file is not stored and is computed again
+def scale(x):
+    return x * lr
+
+
+scaled = scale(10)
+""")
+    config = ConfigObject(config_fp)
+    assert config.snapshot(dirname / "barriers.snapshot") == ["scale"]
+    new_config = ConfigObject.from_snapshot(dirname / "barriers.snapshot")
+    # expression statement is not executed again on stored values
+    assert new_config["items"] == [1, 2, 3] and new_config.total == 6
+    assert new_config.scale(1) == 0.01 and new_config.scaled == 0.1
+
+
+def test_config_object_snapshot_other_process(dirname):
+    import os
+    import subprocess
+    import sys
+    from pathlib import Path
+
+    config_fp = dirname / "snapshot_definitions_config.py"
+    config_fp.write_text("""
+import numpy as np
+
+data = np.arange(10000, dtype="float32")
+
+
+def scale(x):
+    return 2 * x
+
+
+class Net:
+    def __init__(self, data):
+        self.data = data
+
+
+net = Net(data)
+nets = {"net": net}
+""")
+    config = ConfigObject(config_fp)
+    snapshot_fp = dirname / "definitions.snapshot"
+    try:
+        assert sorted(config.snapshot(snapshot_fp)) == ["Net", "net", "nets", "scale"]
+    finally:
+        sys.modules.pop("snapshot_definitions_config", None)
+
+    # configuration module can not be imported by a new interpreter
+    code = f"""
+from py_config_runner import ConfigObject
+
+config = ConfigObject.from_snapshot("{snapshot_fp.as_posix()}")
+assert config.scale(2) == 4
+assert config.net.data is config.data and config.nets["net"] is config.net
+assert type(config.net) is config.Net
+"""
+    root = Path(__file__).resolve().parents[1]
+    python_path = [root.as_posix(), os.environ.get("PYTHONPATH", "")]
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(p for p in python_path if p))
+    subprocess.run([sys.executable, "-c", code], check=True, env=env, cwd=root.as_posix())
+
+
+def test_config_object_snapshot_picklable(dirname, config_filepath):
+    config = ConfigObject(config_filepath)
+    del config["data"]
+    snapshot_fp = dirname / "config.snapshot"
+    assert config.snapshot(snapshot_fp) == []
+    config_filepath.write_text("raise RuntimeError('config is not executed')\n")
+
+    new_config = ConfigObject.from_snapshot(snapshot_fp)
+    assert (new_config.a, new_config.b) == (1, 2)
+    assert "data" not in new_config
+
+
+@pytest.mark.skipif(not has_torch, reason="Skip if no PyTorch")
+def test_snapshot_tensors(dirname):
+    import torch
+
+    model = torch.nn.Linear(100, 100)
+    tensor = torch.rand(1000, 20)
+    values = {"model": model, "tensor": tensor, "view": tensor[10:, 5], "half": torch.rand(100, dtype=torch.bfloat16)}
+    dump_snapshot(dirname / "tensors.snapshot", values)
+    output = load_snapshot(dirname / "tensors.snapshot")["values"]
+    assert isinstance(output["model"].weight, torch.nn.Parameter)
+    assert output["model"].weight.requires_grad
+    assert torch.equal(output["model"].weight, model.weight)
+    assert torch.equal(output["tensor"], tensor)
+    assert torch.equal(output["view"], tensor[10:, 5])
+    assert output["view"].untyped_storage().data_ptr() == output["tensor"].untyped_storage().data_ptr()
+    assert torch.equal(output["half"], values["half"])
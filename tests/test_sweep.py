@@ -0,0 +1,156 @@
+import json
+
+import pytest
+
+from py_config_runner.sweep import (
+    Choice,
+    IntUniform,
+    LogUniform,
+    Uniform,
+    grid_points,
+    parse_param_spec,
+    random_points,
+    run_sweep,
+    sobol_points,
+)
+
+try:
+    import scipy  # noqa: F401
+
+    has_scipy = True
+except ImportError:
+    has_scipy = False
+
+
+@pytest.fixture
+def sweep_script_filepath(dirname):
+    script_fp = dirname / "sweep_script.py"
+
+    s = """
+def run(config, output_path=None, **kwargs):
+    if config.a < 0:
+        raise ValueError("a should be positive")
+    if output_path is not None:
+        with (output_path / "out.txt").open("w") as h:
+            h.write(str(config.a + config.b))
+    return config.a + config.b
+    """
+
+    with script_fp.open("w") as h:
+        h.write(s)
+
+    yield script_fp
+
+
+def test_grid_points():
+    points = grid_points({"a": [1, 2], "b": Choice(["x", "y", "z"])})
+    assert len(points) == 6
+    assert points[0] == {"a": 1, "b": "x"}
+    assert points[-1] == {"a": 2, "b": "z"}
+
+    with pytest.raises(ValueError, match=r"Grid search supports only sequences of values"):
+        grid_points({"a": Uniform(0.0, 1.0)})
+
+    with pytest.raises(TypeError, match=r"should be a sequence of values"):
+        grid_points({"a": 1})
+
+
+def test_random_points():
+    space = {"a": Uniform(0.0, 1.0), "b": LogUniform(1e-4, 1e-1), "c": IntUniform(2, 8), "d": [1, 2]}
+    points = random_points(space, num_samples=50, seed=12)
+    assert len(points) == 50
+    for p in points:
+        assert 0.0 <= p["a"] < 1.0
+        assert 1e-4 <= p["b"] <= 1e-1
+        assert 2 <= p["c"] <= 8 and isinstance(p["c"], int)
+        assert p["d"] in [1, 2]
+    assert points == random_points(space, num_samples=50, seed=12)
+
+
+@pytest.mark.skipif(not has_scipy, reason="No scipy installed")
+def test_sobol_points():
+    points = sobol_points({"a": Uniform(0.0, 1.0), "b": [1, 2]}, num_samples=8)
+    assert len(points) == 8
+    assert sorted(p["a"] for p in points) == [i / 8 for i in range(8)]
+
+
+def test_distributions_wrong_args():
+    with pytest.raises(ValueError, match=r"should not be empty"):
+        Choice([])
+    with pytest.raises(ValueError, match=r"Lower bound should be smaller"):
+        Uniform(1.0, 0.0)
+    with pytest.raises(ValueError, match=r"Lower bound should be positive"):
+        LogUniform(0.0, 1.0)
+
+
+def test_parse_param_spec():
+    assert parse_param_spec("lr=0.1,0.01") == ("lr", [0.1, 0.01])
+    assert parse_param_spec("model=resnet,'vgg'") == ("model", ["resnet", "vgg"])
+    key, dist = parse_param_spec("momentum=0.8:0.99")
+    assert key == "momentum" and isinstance(dist, Uniform) and (dist.low, dist.high) == (0.8, 0.99)
+    key, dist = parse_param_spec("lr=log:1e-4:1e-1")
+    assert isinstance(dist, LogUniform)
+    key, dist = parse_param_spec("depth=int:2:8")
+    assert isinstance(dist, IntUniform)
+
+    # values with colons
+    assert parse_param_spec("device=cuda:0,cuda:1") == ("device", ["cuda:0", "cuda:1"])
+    assert parse_param_spec("device=cuda:0") == ("device", ["cuda:0"])
+    assert parse_param_spec("path=a:b:c") == ("path", ["a:b:c"])
+
+    with pytest.raises(ValueError, match=r"should be KEY=VALUES"):
+        parse_param_spec("lr")
+
+
+@pytest.mark.parametrize("executor", ["process", "thread"])
+def test_run_sweep(executor, dirname, sweep_script_filepath, config_filepath):
+    output_dir = dirname / "output"
+    points = grid_points({"a": [1, -1, 3], "b": [10]})
+    records = run_sweep(
+        sweep_script_filepath, config_filepath, points, jobs=2, executor=executor, output_dir=output_dir
+    )
+
+    assert [r["status"] for r in records] == ["success", "failed", "success"]
+    assert "a should be positive" in records[1]["error"]
+    assert (output_dir / "run_0000" / "out.txt").read_text() == "11"
+    assert (output_dir / "run_0001" / "error.txt").exists()
+    assert json.loads((output_dir / "run_0002" / "params.json").read_text()) == {"a": 3, "b": 10}
+    assert len(json.loads((output_dir / "sweep.json").read_text())) == 3
+
+
+@pytest.mark.parametrize("executor", ["process", "thread"])
+def test_run_sweep_exit(executor, dirname, config_filepath):
+    script_fp = dirname / "sweep_exit_script.py"
+    script_fp.write_text("""
+import sys
+
+
+def run(config, **kwargs):
+    if config.a == 0:
+        sys.exit(3)
+    return config.a
+""")
+    points = grid_points({"a": [1, 0, 2]})
+    records = run_sweep(script_fp, config_filepath, points, jobs=2, executor=executor)
+    assert [r["status"] for r in records] == ["success", "failed", "success"]
+    assert "exited with code 3" in records[1]["error"]
+
+
+def test_run_sweep_cache(dirname, sweep_script_filepath, config_filepath):
+    output_dir = dirname / "output"
+    cache_dir = dirname / "cache"
+    points = grid_points({"a": [1, -1], "b": [10]})
+    records = run_sweep(sweep_script_filepath, config_filepath, points, output_dir=output_dir, cache=cache_dir)
+    assert [r["status"] for r in records] == ["success", "failed"]
+
+    points = grid_points({"a": [1, -1, 3], "b": [10]})
+    records = run_sweep(sweep_script_filepath, config_filepath, points, output_dir=output_dir, cache=cache_dir)
+    assert [r["status"] for r in records] == ["cached", "failed", "success"]
+
+
+def test_run_sweep_wrong_args(sweep_script_filepath, config_filepath):
+    with pytest.raises(ValueError, match=r"Argument executor should be one of"):
+        run_sweep(sweep_script_filepath, config_filepath, [], executor="abc")
+
+    with pytest.raises(ValueError, match=r"Argument jobs should be positive"):
+        run_sweep(sweep_script_filepath, config_filepath, [], jobs=0)
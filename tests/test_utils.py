@@ -1,5 +1,6 @@
 import inspect
 import os
+import pickle
 import pytest
 import multiprocessing as mp
 from pathlib import Path
@@ -250,6 +251,97 @@ b = np.array([1, 2, 3])
     np.testing.assert_allclose(custom_module.b, np.array([1, 2, 3]))
 
 
+def test_load_module_isolated(dirname):
+    import sys
+
+    for name in ["a", "b"]:
+        (dirname / name).mkdir()
+        (dirname / name / "baseline_isolated.py").write_text(f"value = '{name}'\n")
+
+    num_modules = len(sys.modules)
+    module_a = load_module(dirname / "a" / "baseline_isolated.py", register=False)
+    module_b = load_module(dirname / "b" / "baseline_isolated.py", register=False)
+    assert module_a.value == "a"
+    assert module_b.value == "b"
+    assert module_a.__name__ == "baseline_isolated"
+    assert module_a.__file__ == (dirname / "a" / "baseline_isolated.py").as_posix()
+    assert len(sys.modules) == num_modules
+    assert "baseline_isolated" not in sys.modules
+
+    try:
+        module = load_module(dirname / "a" / "baseline_isolated.py")
+        assert sys.modules["baseline_isolated"] is module
+        # registered module is restored after loading an isolated module with the same name
+        assert load_module(dirname / "b" / "baseline_isolated.py", register=False).value == "b"
+        assert sys.modules["baseline_isolated"] is module
+    finally:
+        sys.modules.pop("baseline_isolated", None)
+
+    (dirname / "broken_module.py").write_text("raise RuntimeError('broken')\n")
+    with pytest.raises(RuntimeError, match=r"broken"):
+        load_module(dirname / "broken_module.py")
+    assert "broken_module" not in sys.modules
+
+
+def test_config_object_isolated(dirname):
+    import sys
+
+    from py_config_runner.cache import ModuleCache
+
+    for name in ["a", "b"]:
+        (dirname / name).mkdir()
+        source = f"value = '{name}'\n\n\ndef get_value():\n    return value\n"
+        (dirname / name / "baseline_same_name.py").write_text(source)
+
+    num_modules = len(sys.modules)
+    config_a = ConfigObject(dirname / "a" / "baseline_same_name.py", isolated=True)
+    config_b = ConfigObject(dirname / "b" / "baseline_same_name.py", isolated=True)
+    assert config_a.value == "a" and config_b.value == "b"
+    assert config_a.get_value() == "a" and config_b.get_value() == "b"
+    assert config_a.derive({"value": "c"}).get_value() == "c"
+    assert len(sys.modules) == num_modules
+
+    cache = ModuleCache()
+    try:
+        config = ConfigObject(dirname / "a" / "baseline_same_name.py", module_cache=cache)
+        assert config.value == "a"
+        assert sys.modules["baseline_same_name"].get_value is config.get_value
+        new_config = ConfigObject(dirname / "a" / "baseline_same_name.py", module_cache=cache)
+        assert new_config.get_value is config.get_value
+        # evicted module is unregistered
+        cache.clear()
+        assert "baseline_same_name" not in sys.modules
+    finally:
+        sys.modules.pop("baseline_same_name", None)
+
+
+@pytest.mark.parametrize("register", [True, False])
+def test_load_module_dataclass(register, dirname):
+    import sys
+
+    filepath = dirname / "config_dataclass.py"
+    filepath.write_text("""
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+
+@dataclass
+class Params:
+    lr: float = 0.1
+
+
+params = Params()
+""")
+    try:
+        module = load_module(filepath, register=register)
+        assert module.params.lr == 0.1
+        assert ("config_dataclass" in sys.modules) == register
+        assert ConfigObject(filepath).params.lr == 0.1
+    finally:
+        sys.modules.pop("config_dataclass", None)
+
+
 def test_load_module_wrong_args():
     with pytest.raises(ValueError, match=r"is not found"):
         load_module("/tmp/abcdef")
@@ -291,3 +383,501 @@ def test_mp_config2(method, config_filepath2):
     p = ctx.Process(target=worker_config_checker, args=(config,))
     p.start()
     p.join()
+
+
+def test_config_object_lazy(dirname):
+    filepath = dirname / "lazy_config.py"
+
+    s = """
+import numpy as np
+
+seed = 12
+learning_rate = 0.01
+
+def build_data():
+    raise RuntimeError("data should not be built")
+
+data = build_data()
+
+class Model:
+    def __init__(self, scale):
+        self.scale = scale
+
+model = Model(learning_rate)
+    """
+
+    with filepath.open("w") as h:
+        h.write(s)
+
+    config = ConfigObject(filepath, lazy=True, another_data=123)
+    assert config.seed == 12
+    assert config["learning_rate"] == 0.01
+    assert config.get("seed") == 12
+    assert config.another_data == 123
+    assert isinstance(config.config_filepath, Path)
+    assert config.model.scale == 0.01
+    assert "np" not in config.__internal_config_object_data_dict__
+
+    with pytest.raises(RuntimeError, match=r"data should not be built"):
+        config.data
+
+    with pytest.raises(RuntimeError, match=r"data should not be built"):
+        len(config)
+
+
+def test_config_object_lazy_mutations(dirname):
+    filepath = dirname / "lazy_config.py"
+
+    s = """
+a = 123
+
+def func(x):
+    return x + a
+
+out = func(10)
+b = 1
+raise RuntimeError("error")
+    """
+
+    with filepath.open("w") as h:
+        h.write(s)
+
+    config = ConfigObject(filepath, mutations={"a": 333}, lazy=True)
+    assert config.a == 333
+    assert config.out == 333 + 10
+    assert config.b == 1
+
+    with pytest.raises(RuntimeError, match=r"error"):
+        "a" in config
+
+    config = ConfigObject(filepath, mutations={"c": 333}, lazy=True)
+    with pytest.raises(RuntimeError, match=r"Following mutations were not applied"):
+        config.a
+
+
+def test_config_object_lazy_barriers(dirname):
+    config_fp = dirname / "lazy_barriers_config.py"
+    config_fp.write_text("items = [1, 2]\nitems.append(3)\nother = 1\n")
+    config = ConfigObject(config_fp, lazy=True)
+    assert config["items"] == [1, 2, 3]
+    assert "other" not in config.__internal_config_object_data_dict__
+
+
+@pytest.mark.parametrize("kwargs", [{}, {"lazy": True}, {"parallel": 2}, {"profile": True}])
+def test_config_object_future_annotations(kwargs, dirname):
+    config_fp = dirname / "future_config.py"
+    config_fp.write_text(
+        "from __future__ import annotations\n\nlr = 0.1\nx: LaterType = lr\n\n\ndef f(a: LaterType): ...\n"
+    )
+    config = ConfigObject(config_fp, **kwargs)
+    assert config["x"] == 0.1
+    assert config.f.__annotations__ == {"a": "LaterType"}
+    assert config.derive({"lr": 0.2})["x"] == 0.2
+
+
+@pytest.mark.parametrize("mutations", [None, {"a": [1, 2, 3]}])
+def test_config_object_lazy_full_load(mutations, config_filepath2):
+    lazy_config = ConfigObject(config_filepath2, mutations=mutations, lazy=True)
+    config = ConfigObject(config_filepath2, mutations=mutations)
+
+    assert lazy_config.out == 12
+    assert len(lazy_config) == len(config)
+    assert set(lazy_config) == set(config)
+    assert lazy_config.__dict__["_is_loaded"]
+    for k, v in lazy_config.items():
+        assert not inspect.ismodule(v), f"{k}: {v}"
+
+
+def worker_lazy_config_checker(config):
+    assert config.a == 1
+    assert config.out == 12
+
+
+@pytest.mark.parametrize("method", ["fork", "spawn"])
+def test_mp_config_lazy(method, config_filepath2):
+    config = ConfigObject(config_filepath2, lazy=True)
+    assert config.b == 2
+    ctx = mp.get_context(method)
+    p = ctx.Process(target=worker_lazy_config_checker, args=(config,))
+    p.start()
+    p.join()
+    assert p.exitcode == 0
+
+
+@pytest.mark.parametrize("parallel", [True, 2])
+@pytest.mark.parametrize("lazy", [False, True])
+def test_config_object_parallel(parallel, lazy, config_filepath2):
+    config = ConfigObject(config_filepath2, parallel=parallel, lazy=lazy)
+    expected_config = ConfigObject(config_filepath2)
+
+    assert config.out == 12
+    if lazy:
+        # order of keys depends on the order of access
+        assert set(config) == set(expected_config)
+    else:
+        assert list(config) == list(expected_config)
+    assert config.__dict__["_is_loaded"]
+
+
+def test_config_object_parallel_random_state(dirname):
+    config_fp = dirname / "parallel_random_config.py"
+    config_fp.write_text("""
+import random
+import time
+
+random.seed(0)
+
+
+def make(n):
+    output = []
+    for _ in range(n):
+        time.sleep(0.001)
+        output.append(random.random())
+    return output
+
+
+a = make(20)
+b = make(20)
+c = make(20)
+""")
+    expected = ConfigObject(config_fp)
+    for _ in range(5):
+        config = ConfigObject(config_fp, parallel=3)
+        assert (config.a, config.b, config.c) == (expected.a, expected.b, expected.c)
+    assert ConfigObject(config_fp, lazy=True)["b"] == expected.b
+
+
+def test_config_object_pickle_recipe(dirname):
+    import pickle
+
+    filepath = dirname / "recipe_config.py"
+
+    s = """
+a = 1
+data = list(range(100000))
+out = a + len(data)
+    """
+
+    with filepath.open("w") as h:
+        h.write(s)
+
+    config = ConfigObject(filepath, mutations={"a": 10}, pickle_mode="recipe", another_data=123)
+    state_config = ConfigObject(filepath, mutations={"a": 10}, another_data=123)
+    for c in [config, state_config]:
+        assert c.out == 100010
+        c.c = 3
+        del c["a"]
+
+    assert len(pickle.dumps(config)) * 100 < len(pickle.dumps(state_config))
+
+    new_config = pickle.loads(pickle.dumps(config))
+    assert not new_config.__dict__["_is_loaded"]
+    assert new_config.out == 100010
+    assert new_config.another_data == 123
+    assert new_config.c == 3
+    assert "a" not in new_config
+    assert list(new_config.items()) == list(state_config.items())
+
+    with pytest.raises(ValueError, match=r"Argument pickle_mode should be"):
+        ConfigObject(filepath, pickle_mode="abc")
+
+
+def worker_recipe_config_checker(config):
+    assert not config.__dict__["_is_loaded"]
+    assert config.a == 1
+    assert config.out == 12
+    assert config.c == 3
+
+
+@pytest.mark.parametrize("method", ["fork", "spawn"])
+def test_mp_config_recipe(method, config_filepath2):
+    config = ConfigObject(config_filepath2, pickle_mode="recipe")
+    config.c = 3
+    ctx = mp.get_context(method)
+    p = ctx.Process(target=worker_recipe_config_checker, args=(config,))
+    p.start()
+    p.join()
+    if method == "spawn":
+        assert p.exitcode == 0
+
+
+def test_find_local_imports(dirname):
+    from py_config_runner.utils import find_local_imports
+
+    (dirname / "pkg").mkdir()
+    (dirname / "pkg" / "__init__.py").write_text("from . import helpers\n")
+    (dirname / "pkg" / "helpers.py").write_text("from .sub import x\n")
+    (dirname / "pkg" / "sub.py").write_text("x = 1\n")
+    (dirname / "local_utils.py").write_text("import os\nimport pkg\n")
+    (dirname / "unused.py").write_text("")
+    config_fp = dirname / "config.py"
+    config_fp.write_text("import numpy as np\nfrom local_utils import *\n")
+
+    paths = find_local_imports(config_fp, [dirname])
+    expected = [
+        dirname / "local_utils.py",
+        dirname / "pkg" / "__init__.py",
+        dirname / "pkg" / "helpers.py",
+        dirname / "pkg" / "sub.py",
+    ]
+    assert paths == sorted(p.resolve() for p in expected)
+    assert find_local_imports(config_fp, []) == []
+
+
+def test_config_object_fingerprint(dirname, monkeypatch):
+    monkeypatch.syspath_prepend(dirname.as_posix())
+    config_fp = dirname / "config.py"
+    config_fp.write_text("from local_utils import foo\na = foo()\n")
+    utils_fp = dirname / "local_utils.py"
+    utils_fp.write_text("def foo():\n    return 1\n")
+
+    fingerprint = ConfigObject(config_fp).fingerprint()
+    assert isinstance(fingerprint, str) and len(fingerprint) == 64
+    assert ConfigObject(config_fp).fingerprint() == fingerprint
+
+    config = ConfigObject(config_fp)
+    assert config.a == 1
+    config.b = 2
+    assert config.fingerprint() == fingerprint
+
+    assert ConfigObject(config_fp, mutations={"a": 2}).fingerprint() != fingerprint
+    assert ConfigObject(config_fp, another_data=123).fingerprint() != fingerprint
+
+    utils_fp.write_text("def foo():\n    return 2\n")
+    assert ConfigObject(config_fp).fingerprint() != fingerprint
+
+
+@pytest.fixture
+def derive_config_filepath(dirname):
+    config_fp = dirname / "derive_config.py"
+
+    s = """
+import numpy as np
+
+seed = 12
+learning_rate = 0.1
+dataset = np.arange(100)
+batch_size = 16
+loader = [dataset[i : i + batch_size] for i in range(0, len(dataset), batch_size)]
+model = {"weights": np.ones(10)}
+optimizer = {"params": model["weights"], "lr": learning_rate}
+
+
+def get_scheduler():
+    return {"lr": learning_rate * 0.5}
+
+
+scheduler = get_scheduler()
+x = 1
+y = x + learning_rate
+x = 5
+    """
+
+    with config_fp.open("w") as h:
+        h.write(s)
+
+    yield config_fp
+
+
+@pytest.mark.parametrize("lazy, parallel", [(False, False), (True, False), (False, 2)])
+def test_config_object_derive(lazy, parallel, derive_config_filepath):
+    config = ConfigObject(derive_config_filepath, lazy=lazy, parallel=parallel, another_data=123)
+    new_config = config.derive({"learning_rate": 0.05})
+
+    assert new_config.learning_rate == 0.05
+    assert new_config.optimizer["lr"] == 0.05
+    assert new_config.optimizer is not config.optimizer
+    assert new_config.optimizer["params"] is config.model["weights"]
+    assert new_config.model is config.model
+    assert new_config.dataset is config.dataset
+    assert new_config.loader is config.loader
+    # functions reading mutated names are defined again
+    assert new_config.scheduler == {"lr": 0.025}
+    assert new_config.get_scheduler() == {"lr": 0.025}
+    assert config.get_scheduler() == {"lr": 0.05}
+    # x = 1 is executed again to compute y
+    assert new_config.y == 1.05
+    assert new_config.x == 5
+    assert new_config.another_data == 123
+    assert list(new_config.keys()) == list(config.keys())
+
+    new_config2 = new_config.derive({"batch_size": 32})
+    assert new_config2.learning_rate == 0.05
+    assert len(new_config2.loader) == 4
+    assert new_config2.loader is not config.loader
+    assert new_config2.dataset is config.dataset
+    assert new_config2.optimizer is new_config.optimizer
+
+    with pytest.raises(RuntimeError, match=r"Following mutations were not applied"):
+        config.derive({"abc": 1})
+
+    with pytest.raises(TypeError, match=r"Argument mutations should be a mapping"):
+        config.derive([1, 2])
+
+
+def test_config_object_derive_overrides(derive_config_filepath):
+    config = ConfigObject(derive_config_filepath)
+    config.model = {"weights": [0] * 10}
+    del config["seed"]
+
+    new_config = config.derive({"learning_rate": 0.05})
+    assert new_config.model is config.model
+    assert "seed" not in new_config
+    # optimizer is computed from the configuration file values
+    assert new_config.optimizer["params"].sum() == 10
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_config_object_derive_barriers(lazy, dirname):
+    config_fp = dirname / "derive_barriers_config.py"
+    config_fp.write_text("""
+lr = 0.01
+items = [1, 2]
+weights = [0]
+alias = weights
+items.append(3)
+alias.append(1)
+total = sum(items)
+
+
+def scale(x):
+    return x * lr
+
+
+scaled = scale(10)
+""")
+    config = ConfigObject(config_fp, lazy=lazy)
+    new_config = config.derive({"lr": 1.0})
+    assert new_config.scaled == 10.0
+    # expression statements are not executed again on values of the parent configuration
+    assert config["items"] == [1, 2, 3] and config.weights == [0, 1] and config.total == 6
+    assert new_config["items"] == [1, 2, 3] and new_config.weights == [0, 1] and new_config.total == 6
+    # barriers do not read lr: their values are shared
+    assert new_config["items"] is config["items"]
+
+    new_config = config.derive({"items": [5]})
+    assert new_config["items"] == [5, 3] and new_config.total == 8 and new_config.weights == [0, 1]
+    assert config["items"] == [1, 2, 3] and config.total == 6
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_config_object_derive_above_seed(lazy, dirname):
+    config_fp = dirname / "derive_seed_config.py"
+    config_fp.write_text("""
+import random
+
+lr = 0.1
+seed = 0
+size = 3
+random.seed(seed)
+dataset = [random.random() for _ in range(size)]
+optimizer = {"lr": lr}
+""")
+    config = ConfigObject(config_fp, lazy=lazy)
+    new_config = config.derive({"lr": 0.2})
+    assert new_config.optimizer == {"lr": 0.2}
+    # seeding does not read lr: dataset is not computed again
+    assert new_config.dataset is config.dataset
+
+    new_config = config.derive({"seed": 1})
+    assert new_config.dataset == ConfigObject(config_fp, mutations={"seed": 1}).dataset
+    assert new_config.dataset != config.dataset
+    assert new_config.optimizer is config.optimizer
+
+    # seeding is executed again for statements drawing random numbers
+    new_config = config.derive({"size": 4})
+    assert new_config.dataset == ConfigObject(config_fp, mutations={"size": 4}).dataset
+
+
+def test_config_object_derive_not_sliceable(dirname):
+    config_fp = dirname / "derive_config_exec.py"
+    config_fp.write_text("a = 1\nb = [a]\nexec('c = b[0] + 1')\n")
+    config = ConfigObject(config_fp)
+    new_config = config.derive({"a": 2})
+    assert new_config.c == 3
+    assert config.c == 2
+
+
+def test_config_object_prefetch(dirname):
+    import threading
+    import time
+
+    config_fp = dirname / "prefetch_config.py"
+    config_fp.write_text("""
+import threading
+import time
+
+time.sleep(0.3)
+loader_thread = threading.current_thread().name
+value = 10
+""")
+    config = ConfigObject(config_fp)
+    start = time.perf_counter()
+    config.prefetch()
+    assert time.perf_counter() - start < 0.2
+    # prefetching twice is a no-op
+    config.prefetch()
+    assert config.value == 10
+    assert config.loader_thread != threading.current_thread().name
+    assert config.__dict__["_prefetch"] is None
+
+    # loaded configuration is not prefetched again
+    config.prefetch()
+    assert config.__dict__["_prefetch"] is None
+
+    config = ConfigObject(config_fp, lazy=True)
+    config.prefetch()
+    assert config["value"] == 10
+    assert "loader_thread" in config
+
+    config = ConfigObject(config_fp)
+    config.prefetch()
+    config2 = pickle.loads(pickle.dumps(config))
+    assert config2.value == 10
+
+    broken_fp = dirname / "prefetch_broken_config.py"
+    broken_fp.write_text("value = 1\nraise RuntimeError('broken config')\n")
+    config = ConfigObject(broken_fp)
+    config.prefetch()
+    with pytest.raises(RuntimeError, match=r"broken config"):
+        config.value
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_config_object_loaded_attributes(lazy, dirname):
+    config_fp = dirname / "loaded_attributes_config.py"
+    config_fp.write_text("a = 1\nb = a + 1\nkeys = [a, b]\n_lazy = 'value'\n")
+    config = ConfigObject(config_fp, lazy=lazy, c=3)
+    assert config.b == 2
+    if lazy:
+        assert "a" not in config.__dict__
+        config._load_if_not()
+    # values are instance attributes once loaded
+    assert config.__dict__["a"] == 1 and config.__dict__["c"] == 3
+    # methods and internal attributes are not shadowed
+    assert config["keys"] == [1, 2] and list(config.keys()) == ["config_filepath", "c", "a", "b", "keys", "_lazy"]
+    assert config._lazy is lazy and config["_lazy"] == "value"
+
+    config.a = 10
+    config["d"] = 4
+    assert config.a == 10 and config["a"] == 10 and config.d == 4
+    del config["b"]
+    assert "b" not in config.__dict__
+    with pytest.raises(KeyError):
+        config.b
+    config.b = 5
+    assert config.b == 5
+
+    new_config = pickle.loads(pickle.dumps(config))
+    assert new_config.a == 10 and new_config.b == 5 and new_config.d == 4
+    assert new_config.__dict__["_promoted"] == {"a", "b", "c", "d", "config_filepath"}
+
+    derived = config.derive({"a": 7})
+    assert derived.a == 10 and derived.__dict__["b"] == 5
+
+    # values are not pickled with "recipe" mode
+    config = ConfigObject(config_fp, lazy=lazy, pickle_mode="recipe")
+    config.b = 5
+    new_config = pickle.loads(pickle.dumps(config))
+    assert "a" not in new_config.__dict__ and "b" not in new_config.__dict__
+    assert new_config.b == 5 and new_config.a == 1
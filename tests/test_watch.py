@@ -0,0 +1,190 @@
+import ast
+import threading
+import time
+
+import pytest
+from click.testing import CliRunner
+
+from py_config_runner.__main__ import command
+from py_config_runner.graph import StatementGraph
+from py_config_runner.watch import ConfigWatcher, diff_statements, watch
+
+
+def _graph(source):
+    return StatementGraph(ast.parse(source))
+
+
+def test_diff_statements():
+    old = _graph("a = 1\nb = 2\nc = a + b\nd = c\n")
+    # formatting and comments are ignored, statement inserted
+    new = _graph("a = 1\n# comment\nb = 2\ne = 5\nc = a+b\nd = c\n")
+    assert diff_statements(old, new) == {0: 0, 1: 1, 3: 2, 4: 3}
+
+    # c reads modified b
+    new = _graph("a = 1\nb = 3\nc = a + b\nd = c\n")
+    assert diff_statements(old, new) == {0: 0, 3: 3}
+
+    # c reads a bound by another statement
+    old = _graph("a = 1\na = 2\nc = a\n")
+    new = _graph("a = 1\nc = a\n")
+    assert diff_statements(old, new) == {0: 0}
+
+
+@pytest.fixture
+def watched_config_filepath(dirname):
+    config_fp = dirname / "watched_config.py"
+
+    s = """
+import numpy as np
+
+learning_rate = 0.1
+dataset = np.arange(100)
+model = {"weights": np.ones(10)}
+optimizer = {"params": model["weights"], "lr": learning_rate}
+    """
+
+    with config_fp.open("w") as h:
+        h.write(s)
+
+    yield config_fp
+
+
+def test_config_watcher(watched_config_filepath):
+    watcher = ConfigWatcher(watched_config_filepath, another_data=123)
+    config = watcher.config
+    dataset = config.dataset
+    assert not watcher.changed()
+
+    source = watched_config_filepath.read_text()
+    watched_config_filepath.write_text(source.replace('"lr": learning_rate}', '"lr": learning_rate, "momentum": 0.9}'))
+    assert watcher.changed()
+    assert watcher.reload() == ["optimizer"]
+    assert not watcher.changed()
+    assert watcher.config.optimizer["momentum"] == 0.9
+    assert watcher.config.dataset is dataset
+    assert watcher.config.optimizer["params"] is config.model["weights"]
+    assert watcher.config.another_data == 123
+
+    source = watched_config_filepath.read_text()
+    watched_config_filepath.write_text(source.replace("learning_rate = 0.1", "learning_rate = 0.2\nbatch_size = 4"))
+    assert watcher.reload() == ["learning_rate", "batch_size", "optimizer"]
+    assert watcher.config.optimizer["lr"] == 0.2
+    assert watcher.config.batch_size == 4
+    assert watcher.config.dataset is dataset
+
+    # Removed statement
+    source = watched_config_filepath.read_text().replace("batch_size = 4", "")
+    watched_config_filepath.write_text(source)
+    assert watcher.reload() == []
+    assert "batch_size" not in watcher.config
+
+    # Broken configuration is not loaded
+    config = watcher.config
+    watched_config_filepath.write_text(source + "\nx = 1 / 0\n")
+    with pytest.raises(ZeroDivisionError):
+        watcher.reload()
+    assert watcher.config is config
+    assert not watcher.changed()
+
+    watched_config_filepath.write_text(source + "\nx = 1 / 2\n")
+    assert watcher.changed()
+    assert watcher.reload() == ["x"]
+    assert watcher.config.x == 0.5
+    assert watcher.config.dataset is dataset
+
+
+def test_config_watcher_barriers(dirname):
+    config_fp = dirname / "watched_barriers_config.py"
+    source = """
+lr = 0.01
+items = [1, 2]
+items.append(3)
+total = sum(items)
+
+
+def scale(x):
+    return x * lr
+
+
+scaled = scale(10)
+"""
+    config_fp.write_text(source)
+    watcher = ConfigWatcher(config_fp)
+    config = watcher.config
+    assert config.total == 6
+
+    config_fp.write_text(source.replace("lr = 0.01", "lr = 0.02"))
+    watcher.reload()
+    assert watcher.config.scaled == 0.2
+    # expression statement is not executed again on the previous list
+    assert watcher.config["items"] == [1, 2, 3] and watcher.config.total == 6
+    assert config["items"] == [1, 2, 3]
+
+
+def test_config_watcher_above_seed(dirname):
+    config_fp = dirname / "watched_seed_config.py"
+    source = """
+import random
+
+lr = 0.1
+seed = 0
+random.seed(seed)
+dataset = [random.random() for _ in range(3)]
+optimizer = {"lr": lr}
+"""
+    config_fp.write_text(source)
+    watcher = ConfigWatcher(config_fp)
+    dataset = watcher.config.dataset
+
+    config_fp.write_text(source.replace("lr = 0.1", "lr = 0.2"))
+    assert watcher.reload() == ["lr", "optimizer"]
+    assert watcher.config.optimizer == {"lr": 0.2}
+    assert watcher.config.dataset is dataset
+
+
+def test_watch(dirname, watched_config_filepath):
+    script_fp = dirname / "watched_script.py"
+    output_fp = dirname / "output.txt"
+
+    s = f"""
+def run(config, **kwargs):
+    with open("{output_fp.as_posix()}", "a") as h:
+        h.write(f"{{config.optimizer['lr']}},{{id(config.dataset)}}\\n")
+    """
+
+    with script_fp.open("w") as h:
+        h.write(s)
+
+    thread = threading.Thread(
+        target=watch, args=(script_fp, watched_config_filepath), kwargs={"poll_interval": 0.01, "max_runs": 2}
+    )
+    thread.start()
+    try:
+        for _ in range(500):
+            if output_fp.exists():
+                break
+            time.sleep(0.01)
+        source = watched_config_filepath.read_text()
+        watched_config_filepath.write_text(source.replace("learning_rate = 0.1", "learning_rate = 0.5"))
+    finally:
+        thread.join(timeout=10)
+    assert not thread.is_alive()
+
+    lines = output_fp.read_text().splitlines()
+    assert len(lines) == 2
+    assert lines[0].split(",")[0] == "0.1"
+    assert lines[1].split(",")[0] == "0.5"
+    assert lines[0].split(",")[1] == lines[1].split(",")[1]
+
+
+def test_command_watch_wrong_options(dirname, script_filepath, config_filepath):  # noqa: F811
+    cmd = [
+        "--watch",
+        script_filepath.as_posix(),
+        config_filepath.as_posix(),
+        "--cache-dir",
+        (dirname / "cache").as_posix(),
+    ]
+    result = CliRunner().invoke(command, cmd)
+    assert result.exit_code == 2, repr(result) + "\n" + result.output
+    assert "can not be used with" in result.output